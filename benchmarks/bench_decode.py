@@ -0,0 +1,74 @@
+"""Compare util.parse with the compiled Decoder on lala.cgi payloads.
+
+Usage: python benchmarks/bench_decode.py [payload.json ...]
+
+Without arguments every payload in benchmarks/payloads is used. Payloads are raw
+lala.cgi responses as returned by the device, before any decoding.
+"""
+import json
+import sys
+import timeit
+from pathlib import Path
+
+HERE = Path(__file__).parent
+sys.path.insert(0, str(HERE.parent / "custom_components" / "senec"))
+
+from mypysenec.decoder import Decoder, _float_array, _float_list  # noqa: E402
+from mypysenec.util import parse, parse_value  # noqa: E402
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def best_of(func, number: int, repeat: int = 5) -> float:
+    """Best time per call in microseconds."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+
+
+def bench(path: Path, number: int = 1000, repeat: int = 5):
+    text = path.read_text()
+    decoder = Decoder()
+    if decoder.decode(json.loads(text)) != parse(json.loads(text)):
+        raise AssertionError(f"{path.name}: Decoder result differs from util.parse")
+
+    # parse() rewrites its input, so it gets a freshly loaded payload on every call
+    copies = iter([json.loads(text) for _ in range(number * repeat)])
+    old = best_of(lambda: parse(next(copies)), number, repeat)
+    payload = json.loads(text)
+    new = best_of(lambda: decoder.decode(payload), number, repeat)
+    values = text.count('"') // 2
+    print(
+        f"{path.name:32} ~{values:4} values  parse {old:8.1f} us  "
+        f"decoder {new:8.1f} us  speedup {old / new:4.2f}x"
+    )
+    if numpy is not None:
+        decoder = Decoder(float_arrays="numpy")
+        decoder.decode(payload)
+        new = best_of(lambda: decoder.decode(payload), number, repeat)
+        print(f"{'':32} {'':11} {'':20} numpy   {new:8.1f} us  speedup {old / new:4.2f}x")
+
+
+def bench_array(count: int, number: int = 20000):
+    """Decoding one float array element by element and in bulk."""
+    values = ["fl_%08X" % (0x45500000 + i) for i in range(count)]
+    old = best_of(lambda: [parse_value(value) for value in values], number)
+    bulk = best_of(lambda: _float_list(values), number)
+    line = f"fl_ array of {count:3}  parse_value {old:6.2f} us  bulk {bulk:6.2f} us"
+    if numpy is not None:
+        convert = _float_array(numpy)
+        line += f"  numpy {best_of(lambda: convert(values), number):6.2f} us"
+    print(line)
+
+
+def main():
+    paths = [Path(arg) for arg in sys.argv[1:]] or sorted((HERE / "payloads").glob("*.json"))
+    for path in paths:
+        bench(path)
+    for count in (3, 6, 14, 56):
+        bench_array(count)
+
+
+if __name__ == "__main__":
+    main()
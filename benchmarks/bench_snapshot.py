@@ -0,0 +1,65 @@
+"""Memory and access time of decoded responses kept as dicts versus SenecSnapshot.
+
+Usage: python benchmarks/bench_snapshot.py [payload.json ...]
+
+Every payload is decoded once and kept `COUNT` times, once as the nested dict the
+Decoder returns and once as a SenecSnapshot, as a history of polls would keep them.
+Snapshots start from the one a new Senec client holds, so they are measured as the
+client creates them.
+"""
+import json
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+HERE = Path(__file__).parent
+sys.path.insert(0, str(HERE.parent / "custom_components" / "senec"))
+
+from mypysenec import Senec  # noqa: E402
+from mypysenec.decoder import Decoder  # noqa: E402
+from mypysenec.registers import LAYOUT, REGISTERS, flatten  # noqa: E402
+
+COUNT = 1000
+
+
+def allocated(build) -> int:
+    """Bytes still allocated after calling `build`, which must return what it keeps."""
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def bench(path: Path):
+    text = path.read_text()
+    decoder = Decoder()
+    snapshot = Senec("bench").snapshot.merge(decoder.decode(json.loads(text)))
+
+    raw_size = allocated(lambda: [decoder.decode(json.loads(text)) for _ in range(COUNT)])
+    values = flatten(decoder.decode(json.loads(text)))
+    list_size = allocated(lambda: [flatten(decoder.decode(json.loads(text))) for _ in range(COUNT)])
+    # Merged onto a previous snapshot, as in polling: the int slot set is shared
+    snap_size = allocated(
+        lambda: [snapshot.merge(decoder.decode(json.loads(text))) for _ in range(COUNT)]
+    )
+    print(f"{path.name:32} {len(LAYOUT)} slots, {sum(v is not None for v in values)} set")
+    for name, size in (("dict", raw_size), ("slot list", list_size), ("snapshot", snap_size)):
+        print(f"  {name:10} {size / COUNT:8.0f} bytes per poll")
+    print(f"  snapshot.nbytes {snapshot.nbytes} bytes")
+
+    keys = [register.key for register in REGISTERS]
+    per_key = timeit.timeit(lambda: [getattr(snapshot, key) for key in keys], number=2000)
+    print(f"  read all {len(keys)} properties {per_key / 2000 * 1e6:6.1f} us")
+
+
+def main():
+    paths = [Path(arg) for arg in sys.argv[1:]] or sorted((HERE / "payloads").glob("*.json"))
+    for path in paths:
+        bench(path)
+
+
+if __name__ == "__main__":
+    main()
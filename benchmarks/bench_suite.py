@@ -0,0 +1,206 @@
+"""Benchmark suite for the hot paths of the Senec client.
+
+Usage:
+    python benchmarks/bench_suite.py                       # print results
+    python benchmarks/bench_suite.py --save baseline.json  # record a baseline
+    python benchmarks/bench_suite.py --compare benchmarks/baseline.json
+
+Results are microseconds per call. With --compare every result is shown next to the
+baseline, and the exit status is 1 if one got slower than --threshold (default 50%).
+Only compare baselines recorded on the same machine and Python version.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).parent
+sys.path.insert(0, str(HERE.parent / "custom_components" / "senec"))
+
+from bench_decode import best_of  # noqa: E402
+from mypysenec import Senec  # noqa: E402
+from mypysenec.bms import bms_analytics  # noqa: E402
+from mypysenec.decoder import Decoder  # noqa: E402
+from mypysenec.limiter import RateLimiter  # noqa: E402
+from mypysenec.registers import REGISTERS  # noqa: E402
+from mypysenec.scheduler import DEFAULT_TIERS, POWER_TIER, build_form  # noqa: E402
+from mypysenec.simulator import DayModel, SenecSimulator, respond  # noqa: E402
+from mypysenec.snapshot import SenecSnapshot  # noqa: E402
+from mypysenec.transport import SenecTransport  # noqa: E402
+from mypysenec.util import parse, parse_value  # noqa: E402
+
+VALUES = {
+    "u8": "u8_0E",
+    "u1": "u1_0307",
+    "u3": "u3_00000848",
+    "i3": "i3_FFFFFC18",
+    "fl": "fl_C4B51B12",
+    "st": "st_S10012345",
+    "not_found": "VARIABLE_NOT_FOUND",
+}
+PAYLOADS = ("read_senec_v21", "read_senec_v21_all")
+
+
+def bench_parse_value(results: dict):
+    for prefix, value in VALUES.items():
+        results[f"parse_value/{prefix}"] = best_of(lambda: parse_value(value), 100000)
+
+
+def bench_payloads(results: dict, number: int = 1000, repeat: int = 5):
+    for name in PAYLOADS:
+        text = (HERE / "payloads" / f"{name}.json").read_text()
+        # parse() rewrites its input, so it gets a freshly loaded payload on every call
+        copies = iter([json.loads(text) for _ in range(number * repeat)])
+        results[f"parse/{name}"] = best_of(lambda: parse(next(copies)), number, repeat)
+        payload = json.loads(text)
+        decoder = Decoder()
+        decoder.decode(payload)
+        results[f"decode/{name}"] = best_of(lambda: decoder.decode(payload), number, repeat)
+        decoded = decoder.decode(payload)
+        snapshot = Senec("bench").snapshot
+        results[f"merge/{name}"] = best_of(lambda: snapshot.merge(decoded), number, repeat)
+
+
+def bench_properties(results: dict):
+    text = (HERE / "payloads" / "read_senec_v21.json").read_text()
+    senec = Senec("bench")
+    senec._snapshot = senec.snapshot.merge(Decoder().decode(json.loads(text)))
+    keys = [register.key for register in REGISTERS]
+
+    def read_all(target):
+        for key in keys:
+            getattr(target, key)
+
+    results["properties/senec"] = best_of(lambda: read_all(senec), 2000)
+    results["properties/snapshot"] = best_of(lambda: read_all(senec.snapshot), 2000)
+
+
+def bench_states(results: dict):
+    """Entity states of one poll, one entity per register table key
+
+    The poll reads the power tier 10 s after a read of all tiers, from the simulator
+    model, so only the power values changed.
+    """
+    decoder = Decoder()
+    model = DayModel(seed=1)
+    model.advance(43200)
+    registers = model.registers()
+    before = SenecSnapshot().merge(decoder.decode(respond(build_form(DEFAULT_TIERS), registers)))
+    model.advance(43210)
+    power = respond(build_form([POWER_TIER]), model.registers())
+    snapshot = before.merge(decoder.decode(power))
+    keys = [register.key for register in REGISTERS]
+    previous = (before, before.states(keys))
+
+    def per_entity():
+        # Every entity rounding its property and rebuilding its metadata on each write
+        for key in keys:
+            value = getattr(snapshot, key)
+            try:
+                round(float(value), 2)
+            except (TypeError, ValueError):
+                pass
+            f"senec_{key}"
+            {"identifiers": {("senec", "senec")}, "name": "Senec Home Battery"}
+
+    def table():
+        states = snapshot.states(keys, previous=previous)
+        for key in keys:
+            states.get(key)
+
+    results["states/per_entity"] = best_of(per_entity, 2000)
+    results["states/table"] = best_of(table, 2000)
+
+
+def bench_bms(results: dict):
+    """Cell analytics of a snapshot with all cell values, skipped without numpy."""
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return
+    text = (HERE / "payloads" / "read_senec_v21_all.json").read_text()
+    snapshot = SenecSnapshot().merge(Decoder().decode(json.loads(text)))
+    results["bms/analytics"] = best_of(lambda: bms_analytics(snapshot), 2000)
+
+
+async def _bench_update(number: int) -> float:
+    async with SenecSimulator(latency=0, jitter=0, capacity=1e9) as simulator:
+        transport = SenecTransport("bench", url=simulator.url)
+        limiter = RateLimiter(1e9, 1e12)
+        async with Senec("bench", transport=transport, limiter=limiter) as senec:
+            await senec.read_senec_v21()
+            best = None
+            for _ in range(5):
+                start = time.perf_counter()
+                for _ in range(number):
+                    await senec.read_senec_v21()
+                elapsed = (time.perf_counter() - start) / number * 1e6
+                best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_update(results: dict):
+    """Full poll against the in-process simulator, server time included."""
+    results["update/simulator"] = asyncio.run(_bench_update(50))
+
+
+def run() -> dict:
+    results = {}
+    bench_parse_value(results)
+    bench_payloads(results)
+    bench_properties(results)
+    bench_states(results)
+    bench_bms(results)
+    bench_update(results)
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> bool:
+    """Print results next to the baseline, True if none regressed beyond threshold."""
+    ok = True
+    for name, value in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:32} {value:10.2f} us  (new)")
+            continue
+        ratio = value / before
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            ok = False
+        print(f"{name:32} {value:10.2f} us  baseline {before:10.2f} us  {ratio:5.2f}x{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Senec client benchmarks")
+    parser.add_argument("--save", type=Path, help="Write results to a baseline file")
+    parser.add_argument("--compare", type=Path, help="Compare results with a baseline file")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Allowed slowdown")
+    args = parser.parse_args()
+
+    results = run()
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        ok = compare(results, baseline["results"], args.threshold)
+    else:
+        for name, value in results.items():
+            print(f"{name:32} {value:10.2f} us")
+        ok = True
+    if args.save:
+        data = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "unit": "us",
+            "results": {name: round(value, 3) for name, value in results.items()},
+        }
+        args.save.write_text(json.dumps(data, indent=2) + "\n")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
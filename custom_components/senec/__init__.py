@@ -2,19 +2,46 @@
 import asyncio
 import logging
 from datetime import timedelta
+from time import monotonic, time
 
 import async_timeout
 import voluptuous as vol
+from homeassistant.components.sensor import SensorDeviceClass
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_NAME, CONF_SCAN_INTERVAL
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.entity import Entity, EntityDescription
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from .mypysenec import Senec
-
-from .const import DEFAULT_HOST, DEFAULT_NAME, DOMAIN, SCAN_INTERVAL
+from .mypysenec.deadband import StateFilter
+from .mypysenec.registers import registers_for
+from .mypysenec.scheduler import ADAPTIVE_KEYS, AdaptiveInterval, AlignedTicks
+
+from .const import (
+    CELL_ARRAY_TYPES,
+    CELL_ARRAYS,
+    CONF_CELL_ARRAYS,
+    CONF_HEARTBEAT,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_POWER_DEADBAND,
+    CONF_VOLTAGE_DEADBAND,
+    DEFAULT_CELL_ARRAYS,
+    DEFAULT_HEARTBEAT,
+    DEFAULT_HOST,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_POWER_DEADBAND,
+    DEFAULT_VOLTAGE_DEADBAND,
+    DEFAULT_NAME,
+    DOMAIN,
+    SCAN_INTERVAL,
+    SENSOR_TYPES,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -33,6 +60,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     session = async_get_clientsession(hass)
 
     coordinator = SenecDataUpdateCoordinator(hass, session, entry)
+    coordinator.async_update_registers()
+    entry.async_on_unload(
+        hass.bus.async_listen(er.EVENT_ENTITY_REGISTRY_UPDATED, coordinator.async_update_registers)
+    )
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    entry.async_on_unload(coordinator.async_cancel_tick)
 
     await coordinator.async_refresh()
 
@@ -48,6 +81,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Reload senec when its options changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 class SenecDataUpdateCoordinator(DataUpdateCoordinator):
     """Define an object to hold Senec data."""
 
@@ -57,14 +95,118 @@ class SenecDataUpdateCoordinator(DataUpdateCoordinator):
         self.senec = Senec(self._host, websession=session)
         self.name = entry.title
         self._entry = entry
+        # One sensor per battery module instead of one per cell
+        self.cell_arrays = entry.options.get(CONF_CELL_ARRAYS, DEFAULT_CELL_ARRAYS)
+        # Scan interval adapted to the activity of the system within the option bounds
+        floor = entry.options.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL)
+        ceiling = entry.options.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL)
+        self.adaptive_interval = AdaptiveInterval(
+            floor, ceiling, active_ceiling=SCAN_INTERVAL.total_seconds()
+        )
+        # Polls aligned to the wall clock, counters shared with the client stats
+        self.ticks = AlignedTicks(stats=self.senec.stats)
+        # Entity states of the last refresh by key, built once per poll
+        self._state_keys = [description.key for description in SENSOR_TYPES]
+        self.states = {}
+        self._states_of = None
+        # Keys whose state is written after the last refresh, see SenecEntity
+        self.state_filter = StateFilter(
+            _deadbands(entry.options),
+            entry.options.get(CONF_HEARTBEAT, DEFAULT_HEARTBEAT),
+            stats=self.senec.stats,
+        )
+        self.changed = set()
+
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=timedelta(seconds=self.adaptive_interval.interval),
+        )
 
-        super().__init__(hass, _LOGGER, name=DOMAIN, update_interval=SCAN_INTERVAL)
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next refresh on a wall clock boundary of the update interval."""
+        if self.update_interval is None or self._entry.pref_disable_polling:
+            return
+        self.async_cancel_tick()
+
+        # Started early by the smoothed request latency, so the sample lands on the tick
+        now = time()
+        when = self.ticks.next(
+            now, self.update_interval.total_seconds(), self.senec.limiter.latency or 0
+        )
+        # Kept as _unsub_refresh, so the coordinator cancels it when the last listener
+        # is removed or on shutdown
+        self._unsub_refresh = async_call_later(self.hass, max(0, when - now), self._async_tick)
+
+    async def _async_tick(self, _now) -> None:
+        """Refresh on a scheduled tick, the refresh schedules the next one."""
+        self._unsub_refresh = None
+        await self.async_refresh()
+
+    @callback
+    def async_cancel_tick(self) -> None:
+        """Cancel the scheduled refresh."""
+        if self._unsub_refresh:
+            self._unsub_refresh()
+            self._unsub_refresh = None
+
+    @callback
+    def async_update_registers(self, event=None):
+        """Only request the registers backing entities that are not disabled."""
+        registry = er.async_get(self.hass)
+        disabled = {
+            entity.unique_id
+            for entity in er.async_entries_for_config_entry(registry, self._entry.entry_id)
+            if entity.disabled
+        }
+        # Unique ids start with the entry title, self.name is the coordinator's name
+        title = self._entry.title
+        descriptions = SENSOR_TYPES
+        if self.cell_arrays:
+            # Cells are read for the module sensors that are not disabled
+            cells = {cell for cells in CELL_ARRAYS.values() for cell in cells}
+            descriptions = [
+                description for description in SENSOR_TYPES if description.key not in cells
+            ] + CELL_ARRAY_TYPES
+        keys = [
+            description.key
+            for description in descriptions
+            if f"{title}_{description.key}" not in disabled
+        ]
+        # Write statistics only of the states shown by an enabled entity
+        self.state_filter.counted = frozenset(keys)
+        # The adaptive interval reads its registers even with their entities disabled
+        keys.extend(ADAPTIVE_KEYS)
+        self.senec.set_registers(registers_for(keys))
 
     async def _async_update_data(self):
         """Update data via library."""
+        self.changed = set()
         with async_timeout.timeout(20):
             await self.senec.update()
-        return self.senec
+        snapshot = self.senec.snapshot
+        self.ticks.sampled(snapshot.timestamp)
+        self.states = snapshot.states(self._state_keys, previous=self._states_of)
+        self._states_of = (snapshot, self.states)
+        self.changed = self.state_filter.changed(self.states, monotonic())
+        # Applies from the next refresh, which is scheduled after this update returns
+        self.update_interval = timedelta(seconds=self.adaptive_interval.update(snapshot))
+        return snapshot
+
+
+def _deadbands(options) -> dict:
+    """(absolute, relative) write deadbands of the power and voltage sensors."""
+    power = options.get(CONF_POWER_DEADBAND, DEFAULT_POWER_DEADBAND)
+    voltage = options.get(CONF_VOLTAGE_DEADBAND, DEFAULT_VOLTAGE_DEADBAND) / 100
+    deadbands = {}
+    for description in SENSOR_TYPES:
+        if description.device_class == SensorDeviceClass.POWER:
+            deadbands[description.key] = (power, 0)
+        elif description.device_class == SensorDeviceClass.VOLTAGE:
+            deadbands[description.key] = (0, voltage)
+    return deadbands
 
 
 async def async_unload_entry(hass, entry):
@@ -96,13 +238,11 @@ class SenecEntity(Entity):
         self._state = None
 
         self.entity_description = description
-
-    @property
-    def device_info(self) -> dict:
-        """Return info for device registry."""
-        device = self._name
-        return {
-            "identifiers": {(DOMAIN, device)},
+        # Static metadata is built once, the state is a lookup in the coordinator's table
+        self._key = description.key
+        self._attr_unique_id = f"{self._name}_{self._key}"
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, self._name)},
             "name": "Senec Home Battery",
             "model": "Senec",
             "sw_version": None,
@@ -112,28 +252,26 @@ class SenecEntity(Entity):
     @property
     def state(self):
         """Return the current state."""
-        sensor = self.entity_description.key
-        value = getattr(self.coordinator.senec, sensor)
-        try:
-            rounded_value = round(float(value), 2)
-            return rounded_value
-        except ValueError:
-            return value
+        # Built from the snapshot published with the last refresh, never a partial update
+        return self.coordinator.states.get(self._key)
 
     @property
     def available(self):
         """Return True if entity is available."""
         return self.coordinator.last_update_success
 
-    @property
-    def unique_id(self):
-        """Return a unique ID to use for this entity."""
-        sensor = self.entity_description.key
-        return f"{self._name}_{sensor}"
-
     async def async_added_to_hass(self):
         """Connect to dispatcher listening for entity data notifications."""
-        self.async_on_remove(self.coordinator.async_add_listener(self.async_write_ha_state))
+        self._available = self.available
+        self.async_on_remove(self.coordinator.async_add_listener(self._handle_coordinator_update))
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Write the state if it changed beyond its deadband or availability changed."""
+        available = self.available
+        if self._key in self.coordinator.changed or available != self._available:
+            self._available = available
+            self.async_write_ha_state()
 
     async def async_update(self):
         """Update entity."""
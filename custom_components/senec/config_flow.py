@@ -11,7 +11,22 @@ from pysenec import Senec
 from requests.exceptions import HTTPError, Timeout
 
 from .const import DOMAIN  # pylint:disable=unused-import
-from .const import DEFAULT_HOST, DEFAULT_NAME
+from .const import (
+    CONF_CELL_ARRAYS,
+    CONF_HEARTBEAT,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_POWER_DEADBAND,
+    CONF_VOLTAGE_DEADBAND,
+    DEFAULT_CELL_ARRAYS,
+    DEFAULT_HEARTBEAT,
+    DEFAULT_HOST,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_NAME,
+    DEFAULT_POWER_DEADBAND,
+    DEFAULT_VOLTAGE_DEADBAND,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,6 +43,12 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
     CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_POLL
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Return the options flow."""
+        return OptionsFlowHandler(config_entry)
+
     def _host_in_configuration_exists(self, host) -> bool:
         """Return True if host exists in configuration."""
         if host in senec_entries(self.hass):
@@ -85,3 +106,55 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if self._host_in_configuration_exists(host_entry):
             return self.async_abort(reason="already_configured")
         return await self.async_step_user(user_input)
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle the polling, state write and cell sensor options of a senec entry."""
+
+    def __init__(self, config_entry):
+        """Initialize options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        """Manage the bounds of the adaptive scan interval and the write deadbands."""
+        errors = {}
+        if user_input is not None:
+            if user_input[CONF_MIN_SCAN_INTERVAL] > user_input[CONF_MAX_SCAN_INTERVAL]:
+                errors["base"] = "invalid_scan_interval"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        seconds = vol.All(vol.Coerce(int), vol.Range(min=5, max=3600))
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_MIN_SCAN_INTERVAL,
+                        default=options.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL),
+                    ): seconds,
+                    vol.Required(
+                        CONF_MAX_SCAN_INTERVAL,
+                        default=options.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL),
+                    ): seconds,
+                    vol.Required(
+                        CONF_POWER_DEADBAND,
+                        default=options.get(CONF_POWER_DEADBAND, DEFAULT_POWER_DEADBAND),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                    vol.Required(
+                        CONF_VOLTAGE_DEADBAND,
+                        default=options.get(CONF_VOLTAGE_DEADBAND, DEFAULT_VOLTAGE_DEADBAND),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=100)),
+                    vol.Required(
+                        CONF_HEARTBEAT,
+                        default=options.get(CONF_HEARTBEAT, DEFAULT_HEARTBEAT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Required(
+                        CONF_CELL_ARRAYS,
+                        default=options.get(CONF_CELL_ARRAYS, DEFAULT_CELL_ARRAYS),
+                    ): bool,
+                }
+            ),
+            errors=errors,
+        )
@@ -8,7 +8,10 @@ from homeassistant.components.sensor import (
     SensorEntityDescription,
     SensorStateClass,
 )
-from homeassistant.const import ENERGY_KILO_WATT_HOUR, PERCENTAGE, POWER_WATT, ELECTRIC_POTENTIAL_VOLT, ELECTRIC_POTENTIAL_MILLIVOLT, TEMP_CELSIUS, ELECTRIC_CURRENT_AMPERE
+from homeassistant.const import ENERGY_KILO_WATT_HOUR, PERCENTAGE, POWER_WATT, ELECTRIC_POTENTIAL_VOLT, ELECTRIC_POTENTIAL_MILLIVOLT, TEMP_CELSIUS, ELECTRIC_CURRENT_AMPERE, TIME_SECONDS
+
+from .mypysenec.registers import CELL_ARRAYS, MODULES, REGISTERS
+from .mypysenec.scheduler import POWER_TIER
 
 DOMAIN = "senec"
 
@@ -20,6 +23,35 @@ DEFAULT_NAME = "senec"
 """Fixed constants."""
 SCAN_INTERVAL = timedelta(seconds=60)
 
+"""Options: bounds of the adaptive scan interval in seconds."""
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+DEFAULT_MIN_SCAN_INTERVAL = POWER_TIER.interval
+DEFAULT_MAX_SCAN_INTERVAL = 300
+
+"""Options: deadbands of state writes, power in W, voltage in % and heartbeat in seconds."""
+CONF_POWER_DEADBAND = "power_deadband"
+CONF_VOLTAGE_DEADBAND = "voltage_deadband"
+CONF_HEARTBEAT = "heartbeat"
+DEFAULT_POWER_DEADBAND = 10
+DEFAULT_VOLTAGE_DEADBAND = 0.1
+# Three idle polls at the maximum scan interval, so latency jitter around a single
+# interval does not rewrite every state on every other idle poll
+DEFAULT_HEARTBEAT = 900
+
+"""Options: one sensor per battery module for its cells instead of one per cell."""
+CONF_CELL_ARRAYS = "cell_arrays"
+DEFAULT_CELL_ARRAYS = False
+
+"""Diagnostic sensor of the effective scan interval."""
+SCAN_INTERVAL_SENSOR = SensorEntityDescription(
+    key="scan_interval",
+    name="Scan Interval",
+    native_unit_of_measurement=TIME_SECONDS,
+    icon="mdi:timer-outline",
+    entity_registry_enabled_default=False,
+)
+
 """Supported sensor types."""
 
 SENSOR_TYPES = [
@@ -195,759 +227,110 @@ SENSOR_TYPES = [
         native_unit_of_measurement=TEMP_CELSIUS,
         icon="mdi:thermometer",
     ),
-    SensorEntityDescription(
-        key="bms_cell_temp_A1",
-        name="Cell Temperature Module A1",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_A2",
-        name="Cell Temperature Module A2",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_A3",
-        name="Cell Temperature Module A3",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_A4",
-        name="Cell Temperature Module A4",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_A5",
-        name="Cell Temperature Module A5",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_A6",
-        name="Cell Temperature Module A6",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_B1",
-        name="Cell Temperature Module B1",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_B2",
-        name="Cell Temperature Module B2",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_B3",
-        name="Cell Temperature Module B3",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_B4",
-        name="Cell Temperature Module B4",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_B5",
-        name="Cell Temperature Module B5",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_B6",
-        name="Cell Temperature Module B6",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_C1",
-        name="Cell Temperature Module C1",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_C2",
-        name="Cell Temperature Module C2",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_C3",
-        name="Cell Temperature Module C3",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_C4",
-        name="Cell Temperature Module C4",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_C5",
-        name="Cell Temperature Module C5",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_C6",
-        name="Cell Temperature Module C6",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_D1",
-        name="Cell Temperature Module D1",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_D2",
-        name="Cell Temperature Module D2",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_D3",
-        name="Cell Temperature Module D3",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_D4",
-        name="Cell Temperature Module D4",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_D5",
-        name="Cell Temperature Module D5",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_temp_D6",
-        name="Cell Temperature Module D6",
+]
+
+
+def _register_sensors(prefix: str, name: str, **kwargs) -> list:
+    """Descriptions for a family of Senec registers, e.g. one per battery cell."""
+    return [
+        SensorEntityDescription(
+            key=register.key, name=name.format(register.key[len(prefix) :]), **kwargs
+        )
+        for register in REGISTERS
+        if register.key.startswith(prefix)
+    ]
+
+
+SENSOR_TYPES += (
+    _register_sensors(
+        "bms_cell_temp_",
+        "Cell Temperature Module {}",
         native_unit_of_measurement=TEMP_CELSIUS,
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_A1",
-        name="Cell Voltage Module A1",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_A2",
-        name="Cell Voltage Module A2",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_A3",
-        name="Cell Voltage Module A3",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_A4",
-        name="Cell Voltage Module A4",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_A5",
-        name="Cell Voltage Module A5",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_A6",
-        name="Cell Voltage Module A6",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_A7",
-        name="Cell Voltage Module A7",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_A8",
-        name="Cell Voltage Module A8",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_A9",
-        name="Cell Voltage Module A9",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_A10",
-        name="Cell Voltage Module A10",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_A11",
-        name="Cell Voltage Module A11",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_A12",
-        name="Cell Voltage Module A12",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_A13",
-        name="Cell Voltage Module A13",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_A14",
-        name="Cell Voltage Module A14",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_B1",
-        name="Cell Voltage Module B1",
+    )
+    + _register_sensors(
+        "bms_cell_volt_",
+        "Cell Voltage Module {}",
         native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
         device_class=SensorDeviceClass.VOLTAGE,
         state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_B2",
-        name="Cell Voltage Module B2",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
+    )
+    + _register_sensors(
+        "bms_voltage_",
+        "Voltage Module {}",
+        native_unit_of_measurement=ELECTRIC_POTENTIAL_VOLT,
         device_class=SensorDeviceClass.VOLTAGE,
         state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_B3",
-        name="Cell Voltage Module B3",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
+    )
+    + _register_sensors(
+        "bms_current_",
+        "Current Module {}",
+        native_unit_of_measurement=ELECTRIC_CURRENT_AMPERE,
+        device_class=SensorDeviceClass.CURRENT,
         state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_B4",
-        name="Cell Voltage Module B4",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
+    )
+    + _register_sensors(
+        "bms_charge_limit_",
+        "Charge Limit Module {}",
+        native_unit_of_measurement=ELECTRIC_CURRENT_AMPERE,
+        device_class=SensorDeviceClass.CURRENT,
         state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_B5",
-        name="Cell Voltage Module B5",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
+    )
+    + _register_sensors(
+        "bms_soc_",
+        "SOC Module {}",
+        native_unit_of_measurement=PERCENTAGE,
         state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_B6",
-        name="Cell Voltage Module B6",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
+    )
+    + _register_sensors(
+        "mpp_power_",
+        "MPP Power {}",
+        native_unit_of_measurement=POWER_WATT,
+        icon="mdi:solar-power",
+        device_class=SensorDeviceClass.POWER,
         state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_B7",
-        name="Cell Voltage Module B7",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
+    )
+    + _register_sensors(
+        "ac_spannung_l",
+        "Spannung L{}",
+        native_unit_of_measurement=ELECTRIC_POTENTIAL_VOLT,
         device_class=SensorDeviceClass.VOLTAGE,
         state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_B8",
-        name="Cell Voltage Module B8",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
+    )
+    + _register_sensors(
+        "ac_strom_l",
+        "Strom L{}",
+        native_unit_of_measurement=ELECTRIC_CURRENT_AMPERE,
+        device_class=SensorDeviceClass.CURRENT,
         state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_B9",
-        name="Cell Voltage Module B9",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
+    )
+    + _register_sensors(
+        "ac_leistung_l",
+        "Leistung L{}",
+        native_unit_of_measurement=POWER_WATT,
+        device_class=SensorDeviceClass.POWER,
         state_class=SensorStateClass.MEASUREMENT,
-    ),
+    )
+)
+
+"""Cell sensors of the cell_arrays option, one per key of CELL_ARRAYS."""
+CELL_ARRAY_TYPES = [
     SensorEntityDescription(
-        key="bms_cell_volt_B10",
-        name="Cell Voltage Module B10",
+        key=f"bms_cell_volt_{module}",
+        name=f"Cell Voltages Module {module}",
         native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
+        icon="mdi:battery-sync",
         state_class=SensorStateClass.MEASUREMENT,
-    ),
+    )
+    for module in MODULES
+] + [
     SensorEntityDescription(
-        key="bms_cell_volt_B11",
-        name="Cell Voltage Module B11",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
+        key=f"bms_cell_temp_{module}",
+        name=f"Cell Temperatures Module {module}",
+        native_unit_of_measurement=TEMP_CELSIUS,
+        device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_B12",
-        name="Cell Voltage Module B12",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_B13",
-        name="Cell Voltage Module B13",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_B14",
-        name="Cell Voltage Module B14",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_C1",
-        name="Cell Voltage Module C1",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_C2",
-        name="Cell Voltage Module C2",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_C3",
-        name="Cell Voltage Module C3",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_C4",
-        name="Cell Voltage Module C4",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_C5",
-        name="Cell Voltage Module C5",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_C6",
-        name="Cell Voltage Module C6",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_C7",
-        name="Cell Voltage Module C7",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_C8",
-        name="Cell Voltage Module C8",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_C9",
-        name="Cell Voltage Module C9",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_C10",
-        name="Cell Voltage Module C10",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_C11",
-        name="Cell Voltage Module C11",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_C12",
-        name="Cell Voltage Module C12",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_C13",
-        name="Cell Voltage Module C13",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_C14",
-        name="Cell Voltage Module C14",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_D1",
-        name="Cell Voltage Module D1",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_D2",
-        name="Cell Voltage Module D2",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_D3",
-        name="Cell Voltage Module D3",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_D4",
-        name="Cell Voltage Module D4",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_D5",
-        name="Cell Voltage Module D5",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_D6",
-        name="Cell Voltage Module D6",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_D7",
-        name="Cell Voltage Module D7",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_D8",
-        name="Cell Voltage Module D8",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_D9",
-        name="Cell Voltage Module D9",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_D10",
-        name="Cell Voltage Module D10",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_D11",
-        name="Cell Voltage Module D11",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_D12",
-        name="Cell Voltage Module D12",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_D13",
-        name="Cell Voltage Module D13",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_cell_volt_D14",
-        name="Cell Voltage Module D14",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_MILLIVOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_voltage_A",
-        name="Voltage Module A",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_VOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_voltage_B",
-        name="Voltage Module B",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_VOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_voltage_C",
-        name="Voltage Module C",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_VOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_voltage_D",
-        name="Voltage Module D",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_VOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_current_A",
-        name="Current Module A",
-        native_unit_of_measurement=ELECTRIC_CURRENT_AMPERE,
-        device_class=SensorDeviceClass.CURRENT,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_current_B",
-        name="Current Module B",
-        native_unit_of_measurement=ELECTRIC_CURRENT_AMPERE,
-        device_class=SensorDeviceClass.CURRENT,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_current_C",
-        name="Current Module C",
-        native_unit_of_measurement=ELECTRIC_CURRENT_AMPERE,
-        device_class=SensorDeviceClass.CURRENT,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_current_D",
-        name="Current Module D",
-        native_unit_of_measurement=ELECTRIC_CURRENT_AMPERE,
-        device_class=SensorDeviceClass.CURRENT,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_charge_limit_A",
-        name="Charge Limit Module A",
-        native_unit_of_measurement=ELECTRIC_CURRENT_AMPERE,
-        device_class=SensorDeviceClass.CURRENT,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_charge_limit_B",
-        name="Charge Limit Module B",
-        native_unit_of_measurement=ELECTRIC_CURRENT_AMPERE,
-        device_class=SensorDeviceClass.CURRENT,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_charge_limit_C",
-        name="Charge Limit Module C",
-        native_unit_of_measurement=ELECTRIC_CURRENT_AMPERE,
-        device_class=SensorDeviceClass.CURRENT,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_charge_limit_D",
-        name="Charge Limit Module D",
-        native_unit_of_measurement=ELECTRIC_CURRENT_AMPERE,
-        device_class=SensorDeviceClass.CURRENT,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_soc_A",
-        name="SOC Module A",
-        native_unit_of_measurement=PERCENTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_soc_B",
-        name="SOC Module B",
-        native_unit_of_measurement=PERCENTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_soc_C",
-        name="SOC Module C",
-        native_unit_of_measurement=PERCENTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="bms_soc_D",
-        name="SOC Module D",
-        native_unit_of_measurement=PERCENTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-SensorEntityDescription(
-        key="mpp_power_0",
-        name="MPP Power 0",
-        native_unit_of_measurement=POWER_WATT,
-        icon="mdi:solar-power",
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="mpp_power_1",
-        name="MPP Power 1",
-        native_unit_of_measurement=POWER_WATT,
-        icon="mdi:solar-power",
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="mpp_power_2",
-        name="MPP Power 2",
-        native_unit_of_measurement=POWER_WATT,
-        icon="mdi:solar-power",
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="ac_spannung_l1",
-        name="Spannung L1",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_VOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="ac_spannung_l2",
-        name="Spannung L2",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_VOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="ac_spannung_l3",
-        name="Spannung L3",
-        native_unit_of_measurement=ELECTRIC_POTENTIAL_VOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="ac_strom_l1",
-        name="Strom L1",
-        native_unit_of_measurement=ELECTRIC_CURRENT_AMPERE,
-        device_class=SensorDeviceClass.CURRENT,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="ac_strom_l2",
-        name="Strom L2",
-        native_unit_of_measurement=ELECTRIC_CURRENT_AMPERE,
-        device_class=SensorDeviceClass.CURRENT,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="ac_strom_l3",
-        name="Strom L3",
-        native_unit_of_measurement=ELECTRIC_CURRENT_AMPERE,
-        device_class=SensorDeviceClass.CURRENT,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="ac_leistung_l1",
-        name="Leistung L1",
-        native_unit_of_measurement=POWER_WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="ac_leistung_l2",
-        name="Leistung L2",
-        native_unit_of_measurement=POWER_WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    SensorEntityDescription(
-        key="ac_leistung_l3",
-        name="Leistung L3",
-        native_unit_of_measurement=POWER_WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
+    )
+    for module in MODULES
 ]
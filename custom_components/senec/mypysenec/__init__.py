@@ -1,674 +1,251 @@
+import asyncio
+import json
+from time import monotonic, time
+
 import aiohttp
 
-from .constants import SYSTEM_STATE_NAME
-from .util import parse
+from .burst import BurstSampler
+from .decoder import Decoder
+from .limiter import RateLimiter, Throttled, request_cost
+from .registers import REGISTERS
+from .ringbuffer import RingBuffer
+from .scheduler import PollScheduler, build_form, covers, form_registers
+from .snapshot import SenecSnapshot
+from .transport import SessionTransport
 
 
 class Senec:
-    """Senec Home Battery Sensor"""
-
-    def __init__(self, host, websession):
+    """Senec Home Battery Sensor
+
+    Requests go through `transport`, by default posting with `websession`. Pass a
+    `SenecTransport` instead to keep a dedicated connection to the device, and use the
+    Senec as an async context manager (or call `close`) to release it.
+    """
+
+    def __init__(
+        self,
+        host,
+        websession=None,
+        scheduler: PollScheduler = None,
+        decoder: Decoder = None,
+        limiter: RateLimiter = None,
+        transport=None,
+        capture=None,
+        history: int = 0,
+        store=None,
+    ):
         self.host = host
         self.websession: aiohttp.websession = websession
         self.url = f"https://{host}/lala.cgi"
-
-    @property
-    def system_state(self) -> str:
-        """
-        Textual descritpion of energy status
-
-        """
-        value = self._raw["ENERGY"]["STAT_STATE"]
-        return SYSTEM_STATE_NAME[value]
+        self.transport = transport or SessionTransport(self.url, websession)
+        # Optional CaptureWriter recording every raw response
+        self.capture = capture
+        # Optional RingBuffer of the last `history` snapshots for windowed aggregates
+        self.history = RingBuffer(history) if history else None
+        # Optional HistoryStore every snapshot is appended to
+        self.store = store
+        self.scheduler = scheduler or PollScheduler()
+        self._snapshot = SenecSnapshot()
+        # Latest decoded response per requested register set, most recent last. The
+        # raw_status dict is merged from them when asked for, not on every poll.
+        self._responses = {}
+        self._raw = None
+        self._decoder = decoder or Decoder()
+        self._registers = None
+        # Serialized request bodies and their registers per combination of due tiers
+        self._bodies = {}
+        # Reads in flight as [(registers, task)], joined by callers needing no more
+        self._inflight = []
+        # Shared by every read, so no combination of callers exceeds the device budget
+        self.limiter = limiter or RateLimiter()
+        # Read, request and throttling counters, shared with the limiter
+        self.stats = self.limiter.stats
+        # Poll intervals of the running streams and the poll task serving them
+        self._streams = []
+        self._poller = None
+        # Resolved with the next published snapshot, created on demand
+        self._published = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        """Close the transport and capture, a session passed as websession stays open."""
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+        await self.transport.close()
+        if self.capture is not None:
+            self.capture.close()
+        if self.store is not None:
+            self.store.close()
+
+    def set_registers(self, registers=None):
+        """Only request the given (section, register) pairs from now on
+
+        None requests every register known to the scheduler again.
+        """
+        if registers is not None:
+            registers = frozenset(registers)
+        if registers == self._registers:
+            return
+        self._registers = registers
+        self.scheduler.select(registers)
+        self._bodies.clear()
+
+    def _body(self, tiers) -> tuple:
+        key = tuple(tier.name for tier in tiers)
+        body = self._bodies.get(key)
+        if body is None:
+            form = build_form(tiers)
+            body = self._bodies[key] = (json.dumps(form).encode(), form_registers(form))
+        return body
 
     @property
     def raw_status(self) -> dict:
         """
         Raw dict with all information
 
+        Built on access from the latest response of every kind of request.
         """
+        if self._raw is None:
+            raw = {}
+            for response in self._responses.values():
+                raw = _merge_raw(raw, response)
+            self._raw = raw
         return self._raw
 
     @property
-    def house_power(self) -> float:
-        """
-        Current power consumption (W)
-
-        """
-        return self._raw["ENERGY"]["GUI_HOUSE_POW"]
-
-    @property
-    def house_total_consumption(self) -> float:
-        """
-        Total energy used by house (kWh)
-
-        Does not include Wallbox.
-        """
-        return self._raw["STATISTIC"]["LIVE_HOUSE_CONS"]
-
-    @property
-    def solar_generated_power(self) -> float:
-        """
-        Current power generated by solar panels (W)
-
-        """
-        return abs(self._raw["ENERGY"]["GUI_INVERTER_POWER"])
-
-    @property
-    def solar_total_generated(self) -> float:
-        """
-        Total energy generated by solar panels (kWh)
-
-        """
-        return self._raw["STATISTIC"]["LIVE_PV_GEN"]
-
-    @property
-    def battery_charge_percent(self) -> float:
-        """
-        Current battery charge value (%)
-
-        """
-        return self._raw["ENERGY"]["GUI_BAT_DATA_FUEL_CHARGE"]
-
-    @property
-    def battery_charge_power(self) -> float:
-        """
-        Current battery charging power (W)
-
-        """
-        value = self._raw["ENERGY"]["GUI_BAT_DATA_POWER"]
-        if value > 0:
-            return value
-        return 0
-
-    @property
-    def battery_discharge_power(self) -> float:
-        """
-        Current battery discharging power (W)
-
-        """
-        value = self._raw["ENERGY"]["GUI_BAT_DATA_POWER"]
-        if value < 0:
-            return abs(value)
-        return 0
-    
-    @property
-    def mpp_power_0(self) -> float:
-        return self._raw["PV1"]["MPP_POWER"][0] 
-    @property
-    def mpp_power_1(self) -> float:
-        return self._raw["PV1"]["MPP_POWER"][1] 
-    @property
-    def mpp_power_2(self) -> float:
-        return self._raw["PV1"]["MPP_POWER"][2] 
-    
-    @property
-    def ac_spannung_l1(self) -> float:
-        return self._raw["PM1OBJ1"]["U_AC"][0]
-    @property
-    def ac_spannung_l2(self) -> float:
-        return self._raw["PM1OBJ1"]["U_AC"][1]
-    @property
-    def ac_spannung_l3(self) -> float:
-        return self._raw["PM1OBJ1"]["U_AC"][2]
-    
-    @property
-    def ac_strom_l1(self) -> float:
-        return self._raw["PM1OBJ1"]["I_AC"][0]
-    @property
-    def ac_strom_l2(self) -> float:
-        return self._raw["PM1OBJ1"]["I_AC"][1]
-    @property
-    def ac_strom_l3(self) -> float:
-        return self._raw["PM1OBJ1"]["I_AC"][2]
-    
-    @property
-    def ac_leistung_l1(self) -> float:
-        return self._raw["PM1OBJ1"]["P_AC"][0]
-    @property
-    def ac_leistung_l2(self) -> float:
-        return self._raw["PM1OBJ1"]["P_AC"][1]
-    @property
-    def ac_leistung_l3(self) -> float:
-        return self._raw["PM1OBJ1"]["P_AC"][2]
-
-    @property
-    def battery_state_power(self) -> float:
-        """
-        Battery charging power (W)
-
-        Value is positive when battery is charging
-        Value is negative when battery is discharging.
-        """
-        return self._raw["ENERGY"]["GUI_BAT_DATA_POWER"]
-
-    @property
-    def battery_total_charged(self) -> float:
-        """
-        Total energy charged to battery (kWh)
-
-        """
-        return self._raw["STATISTIC"]["LIVE_BAT_CHARGE"]
-
-    @property
-    def battery_total_discharged(self) -> float:
-        """
-        Total energy discharged from battery (kWh)
-
-        """
-        return self._raw["STATISTIC"]["LIVE_BAT_DISCHARGE"]
-
-    @property
-    def grid_imported_power(self) -> float:
-        """
-        Current power imported from grid (W)
-
-        """
-        value = self._raw["ENERGY"]["GUI_GRID_POW"]
-        if value > 0:
-            return value
-        return 0
-
-    @property
-    def grid_exported_power(self) -> float:
-        """
-        Current power exported to grid (W)
-
-        """
-        value = self._raw["ENERGY"]["GUI_GRID_POW"]
-        if value < 0:
-            return abs(value)
-        return 0
-
-    @property
-    def grid_state_power(self) -> float:
-        """
-        Grid exchange power (W)
-
-        Value is positive when power is imported from grid.
-        Value is negative when power is exported to grid.
-        """
-        return self._raw["ENERGY"]["GUI_GRID_POW"]
-
-    @property
-    def grid_total_export(self) -> float:
-        """
-        Total energy exported to grid export (kWh)
-
-        """
-        return self._raw["STATISTIC"]["LIVE_GRID_EXPORT"]
-
-    @property
-    def grid_total_import(self) -> float:
-        """
-        Total energy imported from grid (kWh)
-
-        """
-        return self._raw["STATISTIC"]["LIVE_GRID_IMPORT"]
-
-    @property
-    def wallbox_power(self) -> float:
-        """
-        Wallbox Total Charging Power (W)
-        Derived from the 3 phase voltages multiplied with the phase currents from the wallbox
-
-        """
-        return self._raw["WALLBOX"]["APPARENT_CHARGING_POWER"][0]
+    def bms(self):
+        """BmsAnalytics of the current snapshot's cells, see SenecSnapshot.bms."""
+        return self._snapshot.bms
 
     @property
-    def wallbox_ev_connected(self) -> bool:
-        """
-        Wallbox EV Connected
-
-        """
-        return self._raw["WALLBOX"]["EV_CONNECTED"][0]
-
-    @property
-    def wallbox_energy(self) -> float:
-        """
-        Wallbox Total Energy
-
-        """
-        return self._raw["STATISTIC"]["LIVE_WB_ENERGY"][0] / 1000.0
+    def snapshot(self) -> SenecSnapshot:
+        """Immutable snapshot of all values in the register table
 
-    @property
-    def battery_temp(self) -> float:
-        """
-        Current battery temperature
-        """
-        return self._raw["TEMPMEASURE"]["BATTERY_TEMP"]
-    @property
-    def case_temp(self) -> float:
-        """
-        Current case temperature
-        """
-        return self._raw["TEMPMEASURE"]["CASE_TEMP"]
-    @property
-    def mcu_temp(self) -> float:
-        """
-        Current controller temperature
+        Replaced as a whole after every read, so values taken from one snapshot always
+        belong together.
         """
-        return self._raw["TEMPMEASURE"]["MCU_TEMP"]
-    
-    @property
-    def bms_cell_temp_A1(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_A"][0] 
-    @property
-    def bms_cell_temp_A2(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_A"][1] 
-    @property
-    def bms_cell_temp_A3(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_A"][2] 
-    @property
-    def bms_cell_temp_A4(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_A"][3] 
-    @property
-    def bms_cell_temp_A5(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_A"][4] 
-    @property
-    def bms_cell_temp_A6(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_A"][5] 
-
-    @property
-    def bms_cell_temp_B1(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_B"][0] 
-    @property
-    def bms_cell_temp_B2(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_B"][1] 
-    @property
-    def bms_cell_temp_B3(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_B"][2] 
-    @property
-    def bms_cell_temp_B4(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_B"][3] 
-    @property
-    def bms_cell_temp_B5(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_B"][4] 
-    @property
-    def bms_cell_temp_B6(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_B"][5] 
-
-    @property
-    def bms_cell_temp_C1(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_C"][0] 
-    @property
-    def bms_cell_temp_C2(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_C"][1] 
-    @property
-    def bms_cell_temp_C3(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_C"][2] 
-    @property
-    def bms_cell_temp_C4(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_C"][3] 
-    @property
-    def bms_cell_temp_C5(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_C"][4] 
-    @property
-    def bms_cell_temp_C6(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_C"][5] 
-
-    @property
-    def bms_cell_temp_D1(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_D"][0] 
-    @property
-    def bms_cell_temp_D2(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_D"][1] 
-    @property
-    def bms_cell_temp_D3(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_D"][2] 
-    @property
-    def bms_cell_temp_D4(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_D"][3] 
-    @property
-    def bms_cell_temp_D5(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_D"][4] 
-    @property
-    def bms_cell_temp_D6(self) -> float:
-        return self._raw["BMS"]["CELL_TEMPERATURES_MODULE_D"][5] 
-
-
-    @property
-    def bms_cell_volt_A1(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_A"][0] 
-    @property
-    def bms_cell_volt_A2(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_A"][1]  
-    @property
-    def bms_cell_volt_A3(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_A"][2]  
-    @property
-    def bms_cell_volt_A4(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_A"][3]  
-    @property
-    def bms_cell_volt_A5(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_A"][4]  
-    @property
-    def bms_cell_volt_A6(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_A"][5]  
-    @property
-    def bms_cell_volt_A7(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_A"][6]  
-    @property
-    def bms_cell_volt_A8(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_A"][7]  
-    @property
-    def bms_cell_volt_A9(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_A"][8]  
-    @property
-    def bms_cell_volt_A10(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_A"][9]  
-    @property
-    def bms_cell_volt_A11(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_A"][10] 
-    @property
-    def bms_cell_volt_A12(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_A"][11] 
-    @property
-    def bms_cell_volt_A13(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_A"][12] 
-    @property
-    def bms_cell_volt_A14(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_A"][13] 
-    @property
-    def bms_cell_volt_B1(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_B"][0] 
-    @property
-    def bms_cell_volt_B2(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_B"][1]  
-    @property
-    def bms_cell_volt_B3(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_B"][2]  
-    @property
-    def bms_cell_volt_B4(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_B"][3]  
-    @property
-    def bms_cell_volt_B5(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_B"][4]  
-    @property
-    def bms_cell_volt_B6(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_B"][5]  
-    @property
-    def bms_cell_volt_B7(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_B"][6]  
-    @property
-    def bms_cell_volt_B8(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_B"][7]  
-    @property
-    def bms_cell_volt_B9(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_B"][8]  
-    @property
-    def bms_cell_volt_B10(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_B"][9]  
-    @property
-    def bms_cell_volt_B11(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_B"][10] 
-    @property
-    def bms_cell_volt_B12(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_B"][11] 
-    @property
-    def bms_cell_volt_B13(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_B"][12] 
-    @property
-    def bms_cell_volt_B14(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_B"][13] 
-    @property
-    def bms_cell_volt_C1(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_C"][0] 
-    @property
-    def bms_cell_volt_C2(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_C"][1]  
-    @property
-    def bms_cell_volt_C3(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_C"][2]  
-    @property
-    def bms_cell_volt_C4(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_C"][3]  
-    @property
-    def bms_cell_volt_C5(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_C"][4]  
-    @property
-    def bms_cell_volt_C6(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_C"][5]  
-    @property
-    def bms_cell_volt_C7(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_C"][6]  
-    @property
-    def bms_cell_volt_C8(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_C"][7]  
-    @property
-    def bms_cell_volt_C9(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_C"][8]  
-    @property
-    def bms_cell_volt_C10(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_C"][9]  
-    @property
-    def bms_cell_volt_C11(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_C"][10] 
-    @property
-    def bms_cell_volt_C12(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_C"][11] 
-    @property
-    def bms_cell_volt_C13(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_C"][12] 
-    @property
-    def bms_cell_volt_C14(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_C"][13] 
-    @property
-    def bms_cell_volt_D1(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_D"][0] 
-    @property
-    def bms_cell_volt_D2(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_D"][1]  
-    @property
-    def bms_cell_volt_D3(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_D"][2]  
-    @property
-    def bms_cell_volt_D4(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_D"][3]  
-    @property
-    def bms_cell_volt_D5(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_D"][4]  
-    @property
-    def bms_cell_volt_D6(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_D"][5]  
-    @property
-    def bms_cell_volt_D7(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_D"][6]  
-    @property
-    def bms_cell_volt_D8(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_D"][7]  
-    @property
-    def bms_cell_volt_D9(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_D"][8]  
-    @property
-    def bms_cell_volt_D10(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_D"][9]  
-    @property
-    def bms_cell_volt_D11(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_D"][10] 
-    @property
-    def bms_cell_volt_D12(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_D"][11] 
-    @property
-    def bms_cell_volt_D13(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_D"][12] 
-    @property
-    def bms_cell_volt_D14(self) -> float:
-        return self._raw["BMS"]["CELL_VOLTAGES_MODULE_D"][13] 
-
-    @property
-    def bms_soc_A(self) -> float:
-        return self._raw["BMS"]["SOC"][0] 
-    @property
-    def bms_soc_B(self) -> float:
-        return self._raw["BMS"]["SOC"][1] 
-    @property
-    def bms_soc_C(self) -> float:
-        return self._raw["BMS"]["SOC"][2] 
-    @property
-    def bms_soc_D(self) -> float:
-        return self._raw["BMS"]["SOC"][3] 
-
-    @property
-    def bms_soh_A(self) -> float:
-        return self._raw["BMS"]["SOH"][0] 
-    @property
-    def bms_soh_B(self) -> float:
-        return self._raw["BMS"]["SOH"][1] 
-    @property
-    def bms_soh_C(self) -> float:
-        return self._raw["BMS"]["SOH"][2] 
-    @property
-    def bms_soh_D(self) -> float:
-        return self._raw["BMS"]["SOH"][3] 
-
-    @property
-    def bms_voltage_A(self) -> float:
-        return self._raw["BMS"]["VOLTAGE"][0] 
-    @property
-    def bms_voltage_B(self) -> float:
-        return self._raw["BMS"]["VOLTAGE"][1] 
-    @property
-    def bms_voltage_C(self) -> float:
-        return self._raw["BMS"]["VOLTAGE"][2] 
-    @property
-    def bms_voltage_D(self) -> float:
-        return self._raw["BMS"]["VOLTAGE"][3] 
-
-    @property
-    def bms_current_A(self) -> float:
-        return self._raw["BMS"]["CURRENT"][0] 
-    @property
-    def bms_current_B(self) -> float:
-        return self._raw["BMS"]["CURRENT"][1] 
-    @property
-    def bms_current_C(self) -> float:
-        return self._raw["BMS"]["CURRENT"][2] 
-    @property
-    def bms_current_D(self) -> float:
-        return self._raw["BMS"]["CURRENT"][3] 
-
-    @property
-    def bms_cycles_A(self) -> float:
-        return self._raw["BMS"]["CYCLES"][0] 
-    @property
-    def bms_cycles_B(self) -> float:
-        return self._raw["BMS"]["CYCLES"][1] 
-    @property
-    def bms_cycles_C(self) -> float:
-        return self._raw["BMS"]["CYCLES"][2] 
-    @property
-    def bms_cycles_D(self) -> float:
-        return self._raw["BMS"]["CYCLES"][3] 
-
-    @property
-    def bms_charge_limit_A(self) -> float:
-        return self._raw["BMS"]["CHARGE_CURRENT_LIMIT"][0] 
-    @property
-    def bms_charge_limit_B(self) -> float:
-        return self._raw["BMS"]["CHARGE_CURRENT_LIMIT"][1] 
-    @property
-    def bms_charge_limit_C(self) -> float:
-        return self._raw["BMS"]["CHARGE_CURRENT_LIMIT"][2] 
-    @property
-    def bms_charge_limit_D(self) -> float:
-        return self._raw["BMS"]["CHARGE_CURRENT_LIMIT"][3] 
-
-    @property
-    def bms_fw_A(self) -> float:
-        return self._raw["BMS"]["FW"][0] 
-    @property
-    def bms_fw_B(self) -> float:
-        return self._raw["BMS"]["FW"][1] 
-    @property
-    def bms_fw_C(self) -> float:
-        return self._raw["BMS"]["FW"][2] 
-    @property
-    def bms_fw_D(self) -> float:
-        return self._raw["BMS"]["FW"][3] 
-
-    @property
-    def socket_0_state(self) -> float:
-        return self._raw["SOCKETS"]["POWER_ON"][0] 
-    @property
-    def socket_1_state(self) -> float:
-        return self._raw["SOCKETS"]["POWER_ON"][1] 
+        return self._snapshot
 
     async def update(self):
-        await self.read_senec_v21()
+        """Read the register tiers that are due according to the poll scheduler
+
+        Tiers that are not due keep their previous values in the snapshot. A poll over
+        the limiter's budget is skipped, its tiers stay due for the next one.
+        """
+        now = monotonic()
+        tiers = self.scheduler.due(now)
+        if tiers:
+            try:
+                await self._read(*self._body(tiers))
+            except Throttled:
+                return
+            self.scheduler.mark(tiers, now)
+
+    async def stream(self, interval: float = 5, fields=None, changes_only: bool = False):
+        """Yield snapshots about every `interval` seconds
+
+        All streams of a Senec share one poll running at the shortest requested
+        interval. A consumer that falls behind gets the latest snapshot when it asks
+        for the next one, intermediate snapshots are skipped rather than queued, so
+        slow consumers never cause extra requests. Failed polls are counted in
+        `stats["stream_errors"]` and retried at the next interval.
+
+        With `changes_only` a dict of the property keys in `fields` (default: all)
+        whose value changed since the previous yield is produced instead, and polls
+        without changes are skipped.
+        """
+        keys = list(fields) if fields is not None else [register.key for register in REGISTERS]
+        unknown = [key for key in keys if not hasattr(SenecSnapshot, key)]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        self._streams.append(interval)
+        if self._poller is None:
+            self._poller = asyncio.ensure_future(self._poll())
+        try:
+            # The empty snapshot before the first read has seq 0
+            seq = 0
+            values = {}
+            due = monotonic()
+            while True:
+                delay = due - monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                snapshot = self._snapshot
+                while snapshot.seq == seq:
+                    snapshot = await self._next_snapshot()
+                seq = snapshot.seq
+                due = max(due + interval, monotonic())
+                if not changes_only:
+                    yield snapshot
+                    continue
+                changed = {}
+                for key in keys:
+                    value = getattr(snapshot, key)
+                    if key not in values or values[key] != value:
+                        values[key] = changed[key] = value
+                if changed:
+                    yield changed
+        finally:
+            self._streams.remove(interval)
+            if not self._streams and self._poller is not None:
+                self._poller.cancel()
+                self._poller = None
+
+    async def watch(self, sampler: BurstSampler = None):
+        """Yield snapshots of a cheap poll of a few registers, sampled fast after jumps
+
+        Only the registers of `sampler` (default: a BurstSampler of house and grid
+        power sharing `stats`) are requested, at the interval the sampler asks for
+        after each sample. Other registers keep their values until read by `update`.
+        """
+        if sampler is None:
+            sampler = BurstSampler(stats=self.stats)
+        form = {}
+        for section, register in sampler.registers:
+            form.setdefault(section, {})[register] = ""
+        body = (json.dumps(form).encode(), form_registers(form))
+        while True:
+            start = monotonic()
+            try:
+                await self._read(*body)
+            except Throttled:
+                # Over the budget: sample again once the limiter had time to refill
+                await asyncio.sleep(self.limiter.max_wait)
+                continue
+            snapshot = self._snapshot
+            delay = sampler.observe(snapshot, self.limiter.scale)
+            yield snapshot
+            await asyncio.sleep(max(0, start + delay - monotonic()))
+
+    def _next_snapshot(self) -> asyncio.Future:
+        if self._published is None:
+            self._published = asyncio.get_running_loop().create_future()
+        return asyncio.shield(self._published)
+
+    async def _poll(self):
+        """Update for the running streams at the shortest interval they asked for."""
+        while self._streams:
+            start = monotonic()
+            try:
+                await self.update()
+            except Exception:
+                self.stats["stream_errors"] += 1
+            await asyncio.sleep(max(0, start + min(self._streams) - monotonic()))
 
     async def read_senec_v21(self):
         """Read values used by webinterface from Senec Home v2.1
 
         Note: Not all values are "high priority" and reading everything causes problems with Senec device, i.e. no sync with Senec cloud possible.
         """
-        form = {
-            "ENERGY": {
-                "STAT_STATE": "",
-                "GUI_BAT_DATA_POWER": "",
-                "GUI_INVERTER_POWER": "",
-                "GUI_HOUSE_POW": "",
-                "GUI_GRID_POW": "",
-                "GUI_BAT_DATA_FUEL_CHARGE": "",
-                "GUI_CHARGING_INFO": "",
-                "GUI_BOOSTING_INFO": "",
-                "GUI_BAT_DATA_POWER": "",
-                "GUI_BAT_DATA_VOLTAGE": "",
-                "GUI_BAT_DATA_CURRENT": "",
-                "GUI_BAT_DATA_FUEL_CHARGE": "",
-                "GUI_BAT_DATA_OA_CHARGING": "",
-                "STAT_LIMITED_NET_SKEW": "",
-            },
-            "STATISTIC": {
-                "LIVE_BAT_CHARGE": "",
-                "LIVE_BAT_DISCHARGE": "",
-                "LIVE_GRID_EXPORT": "",
-                "LIVE_GRID_IMPORT": "",
-                "LIVE_HOUSE_CONS": "",
-                "LIVE_PV_GEN": "",
-                "LIVE_WB_ENERGY": "",
-            },
-            "PV1": {"POWER_RATIO": "", "MPP_POWER": ""},
-            "PWR_UNIT": {"POWER_L1": "", "POWER_L2": "", "POWER_L3": ""},
-            "PM1OBJ1": {"FREQ": "", "U_AC": "", "I_AC": "", "P_AC": "", "P_TOTAL": ""},
-            "PM1OBJ2": {"FREQ": "", "U_AC": "", "I_AC": "", "P_AC": "", "P_TOTAL": ""},
-            "WALLBOX": {
-                "APPARENT_CHARGING_POWER": "",
-                "L1_CHARGING_CURRENT": "",
-                "L2_CHARGING_CURRENT": "",
-                "L3_CHARGING_CURRENT": "",
-                "EV_CONNECTED": "",
-            },
-            "TEMPMEASURE": {
-                "BATTERY_TEMP": "",
-                "CASE_TEMP": "",
-                "MCU_TEMP": "",
-            },
-            "BMS": {
-                "CELL_TEMPERATURES_MODULE_A": "",
-                "CELL_TEMPERATURES_MODULE_B": "",
-                "CELL_TEMPERATURES_MODULE_C": "",
-                "CELL_TEMPERATURES_MODULE_D": "",
-                "CELL_VOLTAGES_MODULE_A": "",
-                "CELL_VOLTAGES_MODULE_B": "",
-                "CELL_VOLTAGES_MODULE_C": "",
-                "CELL_VOLTAGES_MODULE_D": "",
-                "CHARGE_CURRENT_LIMIT": "",
-                "SOC": "",
-                "SOH": "",
-                "VOLTAGE": "",
-                "CYCLES": "",
-                "CURRENT": "",
-                "FW": "",
-            },
-            "SOCKETS": {
-                "POWER_ON": "",
-            },
-        }
-
-        async with self.websession.post(self.url, json=form) as res:
-            res.raise_for_status()
-            self._raw = parse(await res.json())
+        now = monotonic()
+        await self._read(*self._body(self.scheduler.tiers))
+        self.scheduler.mark(self.scheduler.tiers, now)
 
     async def read_senec_v21_all(self):
         """Read ALL values from Senec Home v2.1
@@ -693,6 +270,86 @@ class Senec:
             "PV1": {},
         }
 
-        async with self.websession.post(self.url, json=form) as res:
-            res.raise_for_status()
-            self._raw = parse(await res.json())
+        await self._read(json.dumps(form).encode(), form_registers(form))
+
+    async def _read(self, body: bytes, registers: frozenset):
+        """Send a request, or join one in flight that already covers `registers`
+
+        Concurrent callers share the outcome of a single POST, including its errors.
+        """
+        self.stats["reads"] += 1
+        for inflight, task in self._inflight:
+            if covers(inflight, registers):
+                self.stats["coalesced"] += 1
+                break
+        else:
+            task = asyncio.ensure_future(self._fetch(body, registers))
+            entry = (registers, task)
+            self._inflight.append(entry)
+            task.add_done_callback(lambda task: self._fetched(entry))
+        # A cancelled caller must not cancel the request other callers wait for
+        await asyncio.shield(task)
+
+    def _fetched(self, entry):
+        self._inflight.remove(entry)
+        task = entry[1]
+        if not task.cancelled():
+            # Retrieved here as well, in case every caller was cancelled meanwhile
+            task.exception()
+
+    async def _fetch(self, body: bytes, registers: frozenset):
+        await self.limiter.acquire(request_cost(registers))
+        self.stats["requests"] += 1
+        start = monotonic()
+        try:
+            payload = await self.transport.request(body)
+        except Exception:
+            self.limiter.record(None)
+            raise
+        self.limiter.record(monotonic() - start)
+        # Transports answering with recorded responses (ReplayTransport) tell their time
+        timestamp = getattr(self.transport, "timestamp", None)
+        if timestamp is None:
+            timestamp = time()
+        if self.capture is not None:
+            self.capture.write(payload, timestamp)
+        raw = self._decoder.decode(payload)
+        # A response replaces the previous one of the same registers entirely
+        self._responses.pop(registers, None)
+        self._responses[registers] = raw
+        self._raw = None
+        # Merge onto the snapshot current at completion, overlapping reads are all kept
+        self._snapshot = self._snapshot.merge(raw, timestamp)
+        if self.history is not None:
+            self.history.append(self._snapshot)
+        if self.store is not None:
+            self.store.append(self._snapshot)
+        if self._published is not None:
+            self._published.set_result(self._snapshot)
+            self._published = None
+
+
+def _merge_raw(previous: dict, raw: dict) -> dict:
+    """Copy of `previous` with the sections of a decoded response merged in."""
+    merged = dict(previous)
+    for section, values in raw.items():
+        before = merged.get(section)
+        if before.__class__ is dict and values.__class__ is dict:
+            values = {**before, **values}
+        merged[section] = values
+    return merged
+
+
+def _accessor(register) -> property:
+    """Read only property returning a value of the current snapshot."""
+    get_value = getattr(SenecSnapshot, register.key).fget
+
+    def get(self):
+        return get_value(self._snapshot)
+
+    get.__name__ = register.key
+    return property(get, doc=register.doc)
+
+
+for _register in REGISTERS:
+    setattr(Senec, _register.key, _accessor(_register))
@@ -0,0 +1,215 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from functools import reduce
+from pathlib import Path
+
+from .capture import capture_files, read_capture_file
+from .decoder import Decoder
+from .registers import KEY_SLOT, MODULES, flatten
+
+# Energy counters of the daily balance, name -> LAYOUT slot of the STATISTIC register
+COUNTERS = {
+    "house_consumption": KEY_SLOT["house_total_consumption"],
+    "solar_generated": KEY_SLOT["solar_total_generated"],
+    "battery_charged": KEY_SLOT["battery_total_charged"],
+    "battery_discharged": KEY_SLOT["battery_total_discharged"],
+    "grid_exported": KEY_SLOT["grid_total_export"],
+    "grid_imported": KEY_SLOT["grid_total_import"],
+}
+VOLTAGE_SLOTS = [
+    KEY_SLOT[f"bms_cell_volt_{module}{cell}"] for module in MODULES for cell in range(1, 15)
+]
+TEMPERATURE_SLOTS = [
+    KEY_SLOT[f"bms_cell_temp_{module}{sensor}"] for module in MODULES for sensor in range(1, 7)
+]
+SOH_SLOTS = [KEY_SLOT[f"bms_soh_{module}"] for module in MODULES]
+
+
+def empty() -> dict:
+    """Partial aggregate of no records, the neutral element of merge()."""
+    return {
+        "files": 0,
+        "records": 0,
+        "start": None,
+        "end": None,
+        # day -> counter -> [first time, first value, last time, last value]
+        "energy": {},
+        # day -> [SOH sum, sample count] per module
+        "soh": {},
+        "voltage": [[math.inf, -math.inf] for _ in VOLTAGE_SLOTS],
+        "temperature": [[math.inf, -math.inf] for _ in TEMPERATURE_SLOTS],
+    }
+
+
+def _number(value) -> bool:
+    return value is not None and value.__class__ is not str and value == value
+
+
+def aggregate_file(file) -> dict:
+    """Partial aggregate of one capture file
+
+    Capture files start with a keyframe, so every file is decoded on its own. Registers
+    of slower tiers keep their last value until they are read again, like in a snapshot.
+    """
+    partial = empty()
+    partial["files"] = 1
+    decoder = Decoder()
+    values = None
+    energy, soh = partial["energy"], partial["soh"]
+    voltage, temperature = partial["voltage"], partial["temperature"]
+    day_end = -math.inf
+    for timestamp, response in read_capture_file(file):
+        values = flatten(decoder.decode(response), values)
+        if timestamp >= day_end:
+            day = datetime.fromtimestamp(timestamp, timezone.utc).date()
+            day_end = _midnight(day + timedelta(days=1))
+            counters = energy.setdefault(str(day), {})
+            health = soh.setdefault(str(day), [[0.0, 0] for _ in SOH_SLOTS])
+        for name, slot in COUNTERS.items():
+            value = values[slot]
+            if _number(value):
+                counter = counters.get(name)
+                if counter is None:
+                    counters[name] = [timestamp, value, timestamp, value]
+                else:
+                    counter[2] = timestamp
+                    counter[3] = value
+        for extremes, slots in ((voltage, VOLTAGE_SLOTS), (temperature, TEMPERATURE_SLOTS)):
+            for extreme, slot in zip(extremes, slots):
+                value = values[slot]
+                if _number(value):
+                    if value < extreme[0]:
+                        extreme[0] = value
+                    if value > extreme[1]:
+                        extreme[1] = value
+        for total, slot in zip(health, SOH_SLOTS):
+            value = values[slot]
+            if _number(value):
+                total[0] += value
+                total[1] += 1
+        if partial["start"] is None:
+            partial["start"] = timestamp
+        partial["end"] = timestamp
+        partial["records"] += 1
+    return partial
+
+
+def merge(first: dict, second: dict) -> dict:
+    """Combine two partial aggregates; merge is associative and commutative."""
+    result = empty()
+    for name in ("files", "records"):
+        result[name] = first[name] + second[name]
+    starts = [part["start"] for part in (first, second) if part["start"] is not None]
+    ends = [part["end"] for part in (first, second) if part["end"] is not None]
+    result["start"] = min(starts, default=None)
+    result["end"] = max(ends, default=None)
+    for part in (first, second):
+        for day, counters in part["energy"].items():
+            merged = result["energy"].setdefault(day, {})
+            for name, counter in counters.items():
+                known = merged.get(name)
+                if known is None:
+                    merged[name] = list(counter)
+                    continue
+                if counter[0] < known[0]:
+                    known[0:2] = counter[0:2]
+                if counter[2] > known[2]:
+                    known[2:4] = counter[2:4]
+        for day, health in part["soh"].items():
+            merged = result["soh"].setdefault(day, [[0.0, 0] for _ in SOH_SLOTS])
+            for total, (value, count) in zip(merged, health):
+                total[0] += value
+                total[1] += count
+        for name in ("voltage", "temperature"):
+            for extreme, (low, high) in zip(result[name], part[name]):
+                extreme[0] = min(extreme[0], low)
+                extreme[1] = max(extreme[1], high)
+    return result
+
+
+def _midnight(day: date) -> float:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp()
+
+
+def _per_module(extremes: list, per_module: int) -> dict:
+    def finite(value):
+        return round(value, 3) if math.isfinite(value) else None
+
+    return {
+        module: {
+            "min": [finite(low) for low, _ in extremes[index : index + per_module]],
+            "max": [finite(high) for _, high in extremes[index : index + per_module]],
+        }
+        for module, index in zip(MODULES, range(0, len(extremes), per_module))
+    }
+
+
+def _slope(points: list) -> float:
+    """Least squares slope of (x, y) points, None for fewer than two x values."""
+    if len({x for x, _ in points}) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / sum(
+        (x - mean_x) ** 2 for x, _ in points
+    )
+
+
+def summarize(partial: dict) -> dict:
+    """Final result of a partial aggregate
+
+    days: energy balance in kWh per UTC day. A day ends at the first record of the next
+    day where that was captured, so consecutive days add up to the counter totals.
+    cells: per module min and max of every cell voltage (mV) and temperature (°C).
+    soh: mean SOH (%) per module and day, and its trend in % per year.
+    """
+    days = {}
+    energy = partial["energy"]
+    for day in sorted(energy):
+        following = energy.get(str(date.fromisoformat(day) + timedelta(days=1)), {})
+        balance = {}
+        for name, (_, first, _, last) in energy[day].items():
+            if name in following:
+                last = following[name][1]
+            balance[name] = round(last - first, 3)
+        days[day] = balance
+    soh = {module: {} for module in MODULES}
+    trend = {}
+    for day in sorted(partial["soh"]):
+        for module, (total, count) in zip(MODULES, partial["soh"][day]):
+            if count:
+                soh[module][day] = round(total / count, 2)
+    for module, means in soh.items():
+        slope = _slope([(date.fromisoformat(day).toordinal(), mean) for day, mean in means.items()])
+        trend[module] = None if slope is None else round(slope * 365, 2)
+    return {
+        "files": partial["files"],
+        "records": partial["records"],
+        "start": partial["start"],
+        "end": partial["end"],
+        "days": days,
+        "cells": {
+            "voltage": _per_module(partial["voltage"], 14),
+            "temperature": _per_module(partial["temperature"], 6),
+        },
+        "soh": {"daily": soh, "trend": trend},
+    }
+
+
+def aggregate(paths, workers: int = None) -> dict:
+    """Decode and aggregate capture archives, one file per worker process
+
+    `paths` are capture files; the rotated files of each are included. Files are
+    decoded in parallel by `workers` processes (default: one per CPU, 1 decodes in
+    this process) and their partial aggregates reduced into one result.
+    """
+    files = list(dict.fromkeys(file for path in paths for file in capture_files(path)))
+    # Largest first, so a big file does not start last and hold up the result
+    files.sort(key=lambda file: Path(file).stat().st_size, reverse=True)
+    if workers == 1 or len(files) < 2:
+        partials = map(aggregate_file, files)
+        return summarize(reduce(merge, partials, empty()))
+    with ProcessPoolExecutor(workers) as pool:
+        partials = pool.map(aggregate_file, files)
+        return summarize(reduce(merge, partials, empty()))
@@ -0,0 +1,162 @@
+from collections import namedtuple
+
+from .registers import CELL_ARRAYS, KEY_SLOT, MODULES
+
+CELLS = 14
+SENSORS = 6
+
+# Slots of the cell voltages (mV) and temperatures (°C), one row per module
+VOLTAGE_SLOTS = [
+    [KEY_SLOT[f"bms_cell_volt_{m}{cell}"] for cell in range(1, CELLS + 1)] for m in MODULES
+]
+TEMPERATURE_SLOTS = [
+    [KEY_SLOT[f"bms_cell_temp_{m}{sensor}"] for sensor in range(1, SENSORS + 1)] for m in MODULES
+]
+
+# min, max, mean and spread (max - min) of a set of values
+Summary = namedtuple("Summary", "min max mean spread")
+
+# Cell analytics of a snapshot. Per module values are tuples in MODULES order, None
+# for modules without values. Modules that are not installed read 0 mV on every cell
+# and have no values, cells reading 0 mV are missing.
+#   voltage, temperature: Summary per module
+#   pack_voltage, pack_temperature: Summary over all cells
+#   weakest: (module, cell) of the lowest cell voltage per module, cells counted from 1
+#   pack_weakest: (module, cell) of the lowest cell voltage of the pack
+#   outliers: ((module, cell, deviation), ...) of cells deviating from their module
+#       median by more than the outlier threshold, in mV
+#   temperature_gradient: per module slope of the temperatures along the sensors, in
+#       K per sensor position
+BmsAnalytics = namedtuple(
+    "BmsAnalytics",
+    "voltage temperature pack_voltage pack_temperature weakest pack_weakest outliers "
+    "temperature_gradient",
+)
+
+
+def summarize(values, digits: int = 2) -> Summary:
+    """Summary of the values that are not None, mean and spread rounded; None without any."""
+    values = [value for value in values if value is not None]
+    if not values:
+        return None
+    low, high = min(values), max(values)
+    return Summary(low, high, round(sum(values) / len(values), digits), round(high - low, digits))
+
+
+def cell_array_summary(states: dict, key: str, digits: int = 2) -> Summary:
+    """Summary of the cells of the CELL_ARRAYS `key` in `states`, see summarize
+
+    Cells reading 0 mV are missing, and a module reading 0 mV on every cell is not
+    installed and has no summary of its voltages or temperatures.
+    """
+    voltages = [states.get(cell) for cell in CELL_ARRAYS[f"bms_cell_volt_{key[-1]}"]]
+    if voltages and all(value == 0 for value in voltages):
+        return None
+    values = (states.get(cell) for cell in CELL_ARRAYS[key])
+    if key.startswith("bms_cell_volt_"):
+        values = (value for value in values if value != 0)
+    return summarize(values, digits)
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("numpy is required for BMS analytics") from None
+    return numpy
+
+
+def _summaries(numpy, values) -> tuple:
+    """Summary per row and over all values of a 2d array with NaN for missing values."""
+    valid = ~numpy.isnan(values)
+    counts = valid.sum(axis=1)
+    low = numpy.where(valid, values, numpy.inf).min(axis=1)
+    high = numpy.where(valid, values, -numpy.inf).max(axis=1)
+    total = numpy.where(valid, values, 0).sum(axis=1)
+    rows = tuple(
+        Summary(lo, hi, sum_ / count, hi - lo) if count else None
+        for lo, hi, sum_, count in zip(low.tolist(), high.tolist(), total.tolist(), counts.tolist())
+    )
+    if not counts.any():
+        return rows, None
+    pack_low, pack_high = low[counts > 0].min(), high[counts > 0].max()
+    pack = Summary(
+        float(pack_low),
+        float(pack_high),
+        float(total.sum() / counts.sum()),
+        float(pack_high - pack_low),
+    )
+    return rows, pack
+
+
+def bms_analytics(snapshot, outlier: float = 20) -> BmsAnalytics:
+    """Cell analytics of a snapshot, in one vectorized pass over its cell slots
+
+    `outlier` is the deviation from the module median, in mV, above which a cell is
+    reported as outlier. Requires numpy.
+    """
+    numpy = _numpy()
+    numbers = numpy.frombuffer(snapshot._numbers, dtype=numpy.float64)
+    voltages = numbers.take(VOLTAGE_SLOTS)
+    temperatures = numbers.take(TEMPERATURE_SLOTS)
+    # Missing modules read 0 mV, drop them (and their temperatures) like missing values
+    absent = (voltages == 0).all(axis=1)
+    voltages = numpy.where(voltages == 0, numpy.nan, voltages)
+    temperatures = numpy.where(absent[:, None], numpy.nan, temperatures)
+
+    voltage, pack_voltage = _summaries(numpy, voltages)
+    temperature, pack_temperature = _summaries(numpy, temperatures)
+
+    valid = ~numpy.isnan(voltages)
+    rows = valid.any(axis=1)
+    lowest = numpy.where(valid, voltages, numpy.inf).argmin(axis=1)
+    weakest = tuple(
+        (module, cell + 1) if has_values else None
+        for module, cell, has_values in zip(MODULES, lowest.tolist(), rows.tolist())
+    )
+    pack_weakest = None
+    if rows.any():
+        flat = int(numpy.where(valid, voltages, numpy.inf).argmin())
+        pack_weakest = (MODULES[flat // CELLS], flat % CELLS + 1)
+
+    outliers = ()
+    if rows.any():
+        # Median per module: NaN sorts last, so it is the middle of the valid values
+        ordered = numpy.sort(voltages, axis=1)
+        counts = valid.sum(axis=1)
+        middle = numpy.stack([(counts - 1) // 2, counts // 2], axis=1).clip(0)
+        medians = numpy.take_along_axis(ordered, middle, axis=1).mean(axis=1)
+        deviations = voltages - medians[:, None]
+        with numpy.errstate(invalid="ignore"):
+            found = numpy.argwhere(numpy.abs(deviations) > outlier)
+        outliers = tuple(
+            (MODULES[module], cell + 1, deviation)
+            for (module, cell), deviation in zip(
+                found.tolist(), deviations[tuple(found.T)].tolist()
+            )
+        )
+
+    # Least squares slope per module, over the sensors with a value
+    valid = ~numpy.isnan(temperatures)
+    positions = numpy.where(valid, numpy.arange(SENSORS, dtype=float), 0)
+    counts = valid.sum(axis=1)
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        mean_x = positions.sum(axis=1) / counts
+        mean_y = numpy.where(valid, temperatures, 0).sum(axis=1) / counts
+        dx = numpy.where(valid, positions - mean_x[:, None], 0)
+        dy = numpy.where(valid, temperatures - mean_y[:, None], 0)
+        slopes = (dx * dy).sum(axis=1) / (dx * dx).sum(axis=1)
+    gradient = tuple(
+        slope if count > 1 else None for slope, count in zip(slopes.tolist(), counts.tolist())
+    )
+
+    return BmsAnalytics(
+        voltage,
+        temperature,
+        pack_voltage,
+        pack_temperature,
+        weakest,
+        pack_weakest,
+        outliers,
+        gradient,
+    )
@@ -0,0 +1,85 @@
+import math
+from collections import Counter
+from time import monotonic
+
+from .registers import LAYOUT
+
+# Registers of the cheap poll: fast moving power values that show load spikes
+WATCH_REGISTERS = (("ENERGY", "GUI_HOUSE_POW"), ("ENERGY", "GUI_GRID_POW"))
+
+
+class BurstSampler:
+    """Sampling interval of a few watched registers, fast for a while after a jump
+
+    The registers are sampled every `interval` seconds. When one of them changes by at
+    least `threshold` between two samples, a burst samples every `burst_interval`
+    seconds for `duration` seconds. Further jumps extend the burst, up to
+    `max_duration` seconds in total, and a new burst starts no earlier than `cooldown`
+    seconds after the previous one ended.
+
+    Bursts are not started while the device is slowed down by the rate limiter
+    (`scale` below 1), and their requests still take from the limiter's budget, so a
+    burst never loads the device more than the limiter allows.
+
+    Counters in `stats`: bursts, burst_samples, bursts_skipped.
+    """
+
+    def __init__(
+        self,
+        registers=WATCH_REGISTERS,
+        threshold: float = 500,
+        interval: float = 10,
+        burst_interval: float = 2,
+        duration: float = 30,
+        max_duration: float = 120,
+        cooldown: float = 60,
+        stats: Counter = None,
+        clock=monotonic,
+    ):
+        self.registers = tuple(registers)
+        self._slots = [LAYOUT.index((section, register, None)) for section, register in registers]
+        self.threshold = threshold
+        self.interval = interval
+        self.burst_interval = burst_interval
+        self.duration = duration
+        self.max_duration = max_duration
+        self.cooldown = cooldown
+        self.stats = Counter() if stats is None else stats
+        self._clock = clock
+        self._previous = [None] * len(self._slots)
+        self._started = None
+        self._until = None
+        self._ended = -math.inf
+
+    @property
+    def bursting(self) -> bool:
+        return self._until is not None
+
+    def observe(self, snapshot, scale: float = 1.0) -> float:
+        """Take a sample of the watched registers, returns seconds until the next one."""
+        now = self._clock()
+        jump = False
+        for index, slot in enumerate(self._slots):
+            value = snapshot[slot]
+            if value is None or value.__class__ is str:
+                continue
+            previous = self._previous[index]
+            if previous is not None and abs(value - previous) >= self.threshold:
+                jump = True
+            self._previous[index] = value
+        if self._until is not None and now >= self._until:
+            self._until = None
+            self._ended = now
+        if jump:
+            if self._until is not None:
+                self._until = min(now + self.duration, self._started + self.max_duration)
+            elif scale < 1.0 or now - self._ended < self.cooldown:
+                self.stats["bursts_skipped"] += 1
+            else:
+                self._started = now
+                self._until = now + min(self.duration, self.max_duration)
+                self.stats["bursts"] += 1
+        if self._until is None:
+            return self.interval
+        self.stats["burst_samples"] += 1
+        return self.burst_interval
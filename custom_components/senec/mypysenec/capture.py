@@ -0,0 +1,243 @@
+import asyncio
+import gzip
+import json
+import os
+import zlib
+from pathlib import Path
+from time import monotonic
+
+# Capture files are gzip compressed JSON lines, one record per lala.cgi response:
+#   {"t": time, "k": 1, "S": shape, "d": registers}   keyframe, full set of registers
+#   {"t": time, "s": id, "S": shape, "d": changes}    new response shape, with its id
+#   {"t": time, "s": id, "d": changes}                known response shape
+# A shape lists the registers of a response as [[section, [register, ...]], ...] and is
+# numbered in order of appearance since the last keyframe (the keyframe's is 0). The
+# values of a response are the registers of its shape after applying the changes, which
+# hold only registers that differ from the previous record.
+
+_SEPARATORS = (",", ":")
+_MISSING = object()
+
+
+def capture_files(path) -> list:
+    """Files of a rolling capture, oldest first."""
+    path = Path(path)
+    rotated = sorted(
+        (int(file.name[len(path.name) + 1 :]), file)
+        for file in path.parent.glob(f"{path.name}.*")
+        if file.name[len(path.name) + 1 :].isdigit()
+    )
+    files = [file for _, file in reversed(rotated)]
+    if path.exists():
+        files.append(path)
+    return files
+
+
+def _shape(response: dict) -> tuple:
+    return tuple(
+        (section, tuple(values) if isinstance(values, dict) else None)
+        for section, values in response.items()
+    )
+
+
+class CaptureWriter:
+    """Records raw lala.cgi responses into a rolling, delta encoded capture file
+
+    Every `keyframe_interval` records, and at the start of each file, a keyframe holds
+    all registers so replay can start there. Once the compressed file exceeds
+    `max_bytes` it is rotated to `path.1`, `path.2` ... keeping `backups` old files.
+    Each record is flushed, so a crash loses at most the record being written.
+    """
+
+    def __init__(
+        self,
+        path,
+        keyframe_interval: int = 720,
+        max_bytes: int = 16 * 1024 * 1024,
+        backups: int = 7,
+    ):
+        self.path = Path(path)
+        self.keyframe_interval = keyframe_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.records = 0
+        self._file = None
+        self._state = {}
+        self._shapes = {}
+        self._since_keyframe = 0
+
+    def write(self, response: dict, timestamp: float):
+        """Append one raw (undecoded) lala.cgi response."""
+        if self._file is None:
+            if self.path.exists() and self.path.stat().st_size:
+                # Appending to a file left without gzip trailer would corrupt it
+                self._rotate()
+            else:
+                self._open()
+        elif self._raw.tell() >= self.max_bytes:
+            self._rotate()
+        shape = _shape(response)
+        if not self._since_keyframe or self._since_keyframe >= self.keyframe_interval:
+            record = self._keyframe(response, shape, timestamp)
+        else:
+            record = self._delta(response, shape, timestamp)
+        self._file.write(json.dumps(record, separators=_SEPARATORS).encode() + b"\n")
+        self._file.flush(zlib.Z_SYNC_FLUSH)
+        self._since_keyframe += 1
+        self.records += 1
+
+    def _keyframe(self, response: dict, shape: tuple, timestamp: float) -> dict:
+        # Later deltas may only refer to registers a reader starting here knows
+        self._state = {
+            section: dict(values) if isinstance(values, dict) else values
+            for section, values in response.items()
+        }
+        self._shapes = {shape: 0}
+        self._since_keyframe = 0
+        return {"t": timestamp, "k": 1, "S": _encode_shape(shape), "d": response}
+
+    def _delta(self, response: dict, shape: tuple, timestamp: float) -> dict:
+        changes = {}
+        state = self._state
+        for section, values in response.items():
+            if not isinstance(values, dict):
+                if state.get(section) != values:
+                    state[section] = changes[section] = values
+                continue
+            known = state.get(section)
+            if not isinstance(known, dict):
+                # A section that was not a dict before is sent whole
+                known = state[section] = {}
+            for register, value in values.items():
+                if known.get(register, _MISSING) != value:
+                    known[register] = value
+                    changes.setdefault(section, {})[register] = value
+        record = {"t": timestamp}
+        shape_id = self._shapes.get(shape)
+        if shape_id is None:
+            shape_id = self._shapes[shape] = len(self._shapes)
+            record["S"] = _encode_shape(shape)
+        record["s"] = shape_id
+        record["d"] = changes
+        return record
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._raw = open(self.path, "ab")
+        self._file = gzip.GzipFile(fileobj=self._raw, mode="ab")
+        self._since_keyframe = 0
+
+    def _rotate(self):
+        self.close()
+        for index in range(self.backups - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}")
+            if source.exists():
+                os.replace(source, self.path.with_name(f"{self.path.name}.{index + 1}"))
+        if self.backups:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+        self._open()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._raw.close()
+            self._file = None
+
+
+def _encode_shape(shape: tuple) -> list:
+    return [
+        [section, list(registers) if registers is not None else None]
+        for section, registers in shape
+    ]
+
+
+def _records(file: Path):
+    with gzip.open(file, "rb") as stream:
+        try:
+            for line in stream:
+                if line.endswith(b"\n"):
+                    yield json.loads(line)
+        except EOFError:
+            # The file of a running capture ends without a gzip trailer
+            return
+
+
+def read_capture(path):
+    """Yield (timestamp, raw response) of every record of a capture, oldest first
+
+    `path` is the capture file, older rotated files are read first.
+    """
+    for file in capture_files(path):
+        yield from read_capture_file(file)
+
+
+def read_capture_file(file):
+    """Yield (timestamp, raw response) of the records of one capture file
+
+    Every file starts with a keyframe, so files can be read independently. Records
+    before the first keyframe, e.g. of a file truncated at its start, are skipped.
+    """
+    state = None
+    shapes = []
+    for record in _records(Path(file)):
+        changes = record["d"]
+        if record.get("k"):
+            state = {}
+            shapes = []
+        elif state is None:
+            continue
+        if "S" in record:
+            shapes.append(record["S"])
+        for section, values in changes.items():
+            if isinstance(values, dict):
+                known = state.get(section)
+                if not isinstance(known, dict):
+                    known = state[section] = {}
+                known.update(values)
+            else:
+                state[section] = values
+        shape = shapes[record.get("s", 0)]
+        response = {}
+        for section, registers in shape:
+            if registers is None:
+                values = state[section]
+                response[section] = dict(values) if isinstance(values, dict) else values
+            else:
+                values = state[section]
+                response[section] = {register: values[register] for register in registers}
+        yield record["t"], response
+
+
+class ReplayTransport:
+    """Transport answering requests with the responses of a capture, in order
+
+    With `speed` the original spacing of the records is kept, divided by `speed` (2 for
+    twice as fast). None replays as fast as requests come in. The recorded response is
+    returned whatever form was requested; EOFError is raised once the capture ends.
+    """
+
+    def __init__(self, path, speed: float = None):
+        self._records = read_capture(path)
+        self.speed = speed
+        self._start = None
+        self.timestamp = None
+
+    async def request(self, body: bytes) -> dict:
+        try:
+            timestamp, response = next(self._records)
+        except StopIteration:
+            raise EOFError("End of capture") from None
+        if self.speed:
+            if self._start is None:
+                self._start = (timestamp, monotonic())
+            first, started = self._start
+            delay = (timestamp - first) / self.speed - (monotonic() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        self.timestamp = timestamp
+        return response
+
+    async def close(self):
+        self._records.close()
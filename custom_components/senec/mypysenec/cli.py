@@ -1,15 +1,21 @@
 import argparse
 import asyncio
+import json
+from datetime import date, datetime, timezone
+from pathlib import Path
 from pprint import pprint
 
 import aiohttp
 
-import pysenec
+from . import Senec
+from .aggregate import aggregate
+from .drift import cell_drift
+from .store import HistoryStore
 
 
 async def run(host, verbose=False):
     async with aiohttp.ClientSession() as session:
-        senec = pysenec.Senec(host, session)
+        senec = Senec(host, session)
         if verbose:
             await senec.read_senec_v21_all()
         else:
@@ -36,12 +42,47 @@ async def run(host, verbose=False):
             pprint(senec.raw_status)
 
 
+def _timestamp(day: str) -> float:
+    """Epoch seconds of UTC midnight of an ISO date."""
+    return datetime.combine(date.fromisoformat(day), datetime.min.time(), timezone.utc).timestamp()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Senec Home Battery Sensor")
     parser.add_argument("--host", help="Local Senec host (or IP)")
     parser.add_argument("--all", help="Prints extended info", action="store_true")
+    commands = parser.add_subparsers(dest="command")
+    summary = commands.add_parser(
+        "aggregate", help="Daily energy balance, cell extremes and SOH trend of captures"
+    )
+    summary.add_argument("captures", nargs="+", type=Path, help="Capture files")
+    summary.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    drift = commands.add_parser(
+        "drift", help="Cell z-scores, drift, charge end divergence and SOH trend of a history"
+    )
+    drift.add_argument("history", type=Path, help="History store directory")
+    drift.add_argument("--start", type=_timestamp, help="First day (YYYY-MM-DD)")
+    drift.add_argument("--end", type=_timestamp, help="Day after the last one (YYYY-MM-DD)")
+    drift.add_argument("--bucket", type=float, default=3600, help="Seconds per cell mean")
+    drift.add_argument("--window", type=float, default=7, help="Days of the rolling z-scores")
+    drift.add_argument("--charge-end", type=float, default=95, help="Charge end (%%)")
     args = parser.parse_args()
 
+    if args.command == "aggregate":
+        print(json.dumps(aggregate(args.captures, args.workers), indent=2))
+        return
+    if args.command == "drift":
+        report = cell_drift(
+            HistoryStore(args.history),
+            args.start,
+            args.end,
+            bucket=args.bucket,
+            window=args.window * 86400,
+            charge_end=args.charge_end,
+        )
+        print(json.dumps(report, indent=2))
+        return
+
     loop = asyncio.get_event_loop()
     loop.run_until_complete(run(args.host, verbose=args.all))
 
@@ -0,0 +1,67 @@
+from collections import Counter
+
+
+class StateFilter:
+    """Decides which states of a poll are worth writing
+
+    A state is written when it differs from the last written one by more than its
+    deadband (exact equality for keys without one), or when it was last written
+    `heartbeat` seconds ago or more, so the history of slowly drifting or suppressed
+    values stays continuous. Deadbands compare with the last written value, so many
+    small steps still add up to a write.
+
+    `deadbands` maps keys to (absolute, relative) deadbands: changes up to `absolute`
+    or up to `relative` times the last written value are suppressed, either may be 0.
+    Counters in `stats`: writes, writes_suppressed, of the keys in `counted` (None for
+    all keys), e.g. the keys of the entities that are enabled.
+    """
+
+    def __init__(
+        self,
+        deadbands: dict = None,
+        heartbeat: float = 900,
+        stats: Counter = None,
+        counted=None,
+    ):
+        self.deadbands = dict(deadbands or {})
+        self.heartbeat = heartbeat
+        self.stats = Counter() if stats is None else stats
+        self.counted = counted
+        self._written = {}
+
+    def changed(self, states: dict, now: float) -> set:
+        """Keys of `states` to write at `now` (seconds), recorded as written."""
+        changed = set()
+        written = self._written
+        deadbands = self.deadbands
+        suppressed = []
+        for key, value in states.items():
+            last = written.get(key)
+            if last is not None and now - last[1] < self.heartbeat:
+                before = last[0]
+                if value == before and value.__class__ is before.__class__:
+                    suppressed.append(key)
+                    continue
+                deadband = deadbands.get(key)
+                if (
+                    deadband is not None
+                    and value.__class__ is float
+                    and before.__class__ is float
+                    and abs(value - before) <= max(deadband[0], deadband[1] * abs(before))
+                ):
+                    suppressed.append(key)
+                    continue
+            written[key] = (value, now)
+            changed.add(key)
+        counted = self.counted
+        if counted is None:
+            self.stats["writes"] += len(changed)
+            self.stats["writes_suppressed"] += len(suppressed)
+        else:
+            self.stats["writes"] += len(changed.intersection(counted))
+            self.stats["writes_suppressed"] += len(counted.intersection(suppressed))
+        return changed
+
+    def reset(self):
+        """Forget the written states, so the next poll writes everything."""
+        self._written.clear()
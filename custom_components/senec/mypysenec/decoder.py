@@ -0,0 +1,217 @@
+from struct import Struct
+
+from .util import parse, parse_value
+
+_fromhex = bytes.fromhex
+_unpack_float = Struct(">f").unpack
+_unpack_floats = {}
+
+# Returned by a conversion when a value does not carry the type it was compiled for
+_MISMATCH = object()
+
+
+def _float(value):
+    if value.__class__ is str and value[:3] == "fl_":
+        return _unpack_float(_fromhex(value[3:]))[0]
+    return _MISMATCH
+
+
+def _string(value):
+    if value.__class__ is str and value[:3] == "st_":
+        text = value[3:]
+        # parse_value leaves strings with further underscores untouched
+        return value if "_" in text else text
+    return _MISMATCH
+
+
+def _integer(prefix: str):
+    size = len(prefix)
+
+    def convert(value):
+        if value.__class__ is str and value[:size] == prefix:
+            return int(value[size:], 16)
+        return _MISMATCH
+
+    return convert
+
+
+def _generic(value):
+    if value.__class__ is str:
+        return parse_value(value)
+    if value.__class__ is list or value.__class__ is dict:
+        return _MISMATCH
+    return value
+
+
+def _nested(value):
+    if value.__class__ is dict:
+        return parse(dict(value))
+    return _MISMATCH
+
+
+def _float_payload(values) -> bytes:
+    """Big endian IEEE 754 bytes of a list of "fl_XXXXXXXX" values, None if not all are floats."""
+    if values.__class__ is not list:
+        return None
+    if not values:
+        return b""
+    joined = "".join(values)
+    count = len(values)
+    # Every element is 11 characters with its only "_" at index 2, so each "fl_" is the
+    # prefix of one element; checked on the joined string instead of element by element
+    if (
+        len(joined) != 11 * count
+        or joined.count("fl_") != count
+        or joined.count("_") != count
+        or joined[2::11] != "_" * count
+        or set(map(len, values)) != {11}
+    ):
+        return None
+    return _fromhex(joined.replace("fl_", ""))
+
+
+def _float_list(values):
+    payload = _float_payload(values)
+    if payload is None:
+        return _MISMATCH
+    count = len(values)
+    unpack = _unpack_floats.get(count)
+    if unpack is None:
+        unpack = _unpack_floats[count] = Struct(f">{count}f").unpack
+    return list(unpack(payload))
+
+
+def _float_array(numpy):
+    def convert(values):
+        payload = _float_payload(values)
+        if payload is None:
+            return _MISMATCH
+        return numpy.frombuffer(payload, dtype=">f4").astype(numpy.float32)
+
+    return convert
+
+
+def _integer_list(prefix: str):
+    size = len(prefix)
+
+    def convert(values):
+        if values.__class__ is list and "".join(values).count(prefix) == len(values):
+            return [int(value[size:], 16) for value in values]
+        return _MISMATCH
+
+    return convert
+
+
+def _empty_list(values):
+    # Compiled again for the type of the first non-empty list
+    if values.__class__ is list and not values:
+        return []
+    return _MISMATCH
+
+
+def _list(scalar):
+    def convert(values):
+        if values.__class__ is not list:
+            return _MISMATCH
+        result = []
+        append = result.append
+        for value in values:
+            out = scalar(value)
+            if out is _MISMATCH:
+                return _MISMATCH
+            append(out)
+        return result
+
+    return convert
+
+
+def _prefix(value) -> str:
+    """Type prefix (e.g. "fl_", "u8_") of an encoded value, None if it is not encoded."""
+    if value.__class__ is not str:
+        return None
+    key, sep, payload = value.partition("_")
+    if not sep or "_" in payload:
+        return None
+    return key + sep
+
+
+def _compile(value, float_list=_float_list):
+    """Conversion specialized for the type of a sample value of a register."""
+    if value.__class__ is dict:
+        return _nested
+    is_list = value.__class__ is list
+    if is_list and not value:
+        return _empty_list
+    prefix = _prefix(value[0] if is_list else value)
+    if prefix == "fl_":
+        return float_list if is_list else _float
+    if prefix == "st_":
+        return _list(_string) if is_list else _string
+    if prefix is not None and prefix[0] in "ui":
+        return _integer_list(prefix) if is_list else _integer(prefix)
+    return _list(_generic) if is_list else _generic
+
+
+class Decoder:
+    """Decodes lala.cgi responses with one conversion compiled per (section, register)
+
+    The conversion of a register is specialized to the type prefix (u/i/fl/st) of the
+    first value seen for it, so later responses are decoded without inspecting the
+    prefix of every value. If the device ever reports a different type for a register,
+    the conversion is compiled again. Results are identical to `util.parse`, but the
+    input is left untouched and a new dict is returned.
+
+    Float arrays are decoded in bulk with a single fromhex and unpack. With
+    `float_arrays="numpy"` they are returned as numpy float32 arrays instead of lists.
+    """
+
+    def __init__(self, float_arrays: str = "list"):
+        if float_arrays == "numpy":
+            try:
+                import numpy
+            except ImportError:
+                raise ImportError("numpy is required for float_arrays='numpy'") from None
+            self._float_list = _float_array(numpy)
+        elif float_arrays == "list":
+            self._float_list = _float_list
+        else:
+            raise ValueError(f"Unknown float array backend: {float_arrays}")
+        self._sections = {}
+
+    def decode(self, raw: dict) -> dict:
+        sections = self._sections
+        result = {}
+        for section, values in raw.items():
+            if values.__class__ is not dict:
+                result[section] = parse({section: values})[section]
+                continue
+            conversions = sections.get(section)
+            if conversions is None:
+                conversions = sections[section] = {}
+            decoded = {}
+            for register, value in values.items():
+                convert = conversions.get(register)
+                if convert is None:
+                    convert = conversions[register] = _compile(value, self._float_list)
+                try:
+                    out = convert(value)
+                except TypeError:
+                    # Non string values where strings were expected
+                    out = _MISMATCH
+                if out is _MISMATCH:
+                    out = self._recompile(conversions, register, value)
+                decoded[register] = out
+            result[section] = decoded
+        return result
+
+    def _recompile(self, conversions: dict, register: str, value):
+        convert = conversions[register] = _compile(value, self._float_list)
+        try:
+            out = convert(value)
+        except TypeError:
+            out = _MISMATCH
+        if out is _MISMATCH:
+            # Mixed types within one array, fall back to per value dispatch
+            convert = conversions[register] = _list(_generic)
+            out = convert(value)
+        return out
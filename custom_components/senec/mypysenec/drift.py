@@ -0,0 +1,207 @@
+from datetime import date, timedelta
+
+from .registers import MODULES
+
+CELLS = 14
+DAY = 86400.0
+MONTH = 30 * DAY
+YEAR = 365 * DAY
+
+# History columns of the analysis: cell voltages per module (mV), pack charge (%),
+# SOH per module (%)
+VOLTAGES = [f"BMS.CELL_VOLTAGES_MODULE_{module}" for module in MODULES]
+CHARGE = "battery_charge_percent"
+SOH = "BMS.SOH"
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("numpy is required for drift analysis") from None
+    return numpy
+
+
+def _slopes(numpy, x, y):
+    """Least squares slope of every column of y over x, ignoring NaN; NaN below 2 points."""
+    valid = ~numpy.isnan(y)
+    counts = valid.sum(axis=0)
+    positions = numpy.where(valid, x[:, None], 0)
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        mean_x = positions.sum(axis=0) / counts
+        mean_y = numpy.where(valid, y, 0).sum(axis=0) / counts
+        dx = numpy.where(valid, x[:, None] - mean_x, 0)
+        dy = numpy.where(valid, y - mean_y, 0)
+        slopes = (dx * dy).sum(axis=0) / (dx * dx).sum(axis=0)
+    return numpy.where(counts > 1, slopes, numpy.nan)
+
+
+def _value(value, digits: int):
+    """Rounded Python float, None for NaN and infinities."""
+    value = float(value)
+    return round(value, digits) if abs(value) < float("inf") else None
+
+
+def _day(key) -> str:
+    return str(date(1970, 1, 1) + timedelta(days=int(key)))
+
+
+def _per_module(values, digits: int = 3) -> dict:
+    values = [_value(value, digits) for value in values]
+    return {
+        module: values[index * CELLS : (index + 1) * CELLS] for index, module in enumerate(MODULES)
+    }
+
+
+def cell_drift(
+    store,
+    start: float = None,
+    end: float = None,
+    bucket: float = 3600,
+    window: float = 7 * DAY,
+    charge_end: float = 95,
+    z_limit: float = 3,
+    drift_limit: float = 5,
+) -> dict:
+    """Report of slow cell imbalance and SOH decline in a HistoryStore
+
+    The day files are reduced one at a time to `bucket` means of every cell and to
+    daily charge end and SOH sums, so the whole analysis runs on small columnar arrays:
+
+    cells: per module and cell the z-score of the cell voltage against the pack,
+    averaged over the last `window` seconds (z) and its largest magnitude over the
+    range (z_max), and the drift of the cell from the pack mean in mV per 30 days.
+    charge_end: the mean cell spread (mV) per day over records with a pack charge of
+    at least `charge_end` %, its trend in mV per 30 days, and per cell the mean
+    deviation from the pack at charge end over the last `window`.
+    soh: mean SOH (%) per module and day, and its trend in % per year.
+    flagged: cells with |z| >= `z_limit` or |drift| >= `drift_limit`, largest |z| first.
+
+    Cells reading 0 mV (modules that are not installed) are ignored. Requires numpy.
+    """
+    numpy = _numpy()
+    keys, sums, counts = [], [], []
+    days = {}
+    records, first, last = 0, None, None
+    for times, values in store.chunks(VOLTAGES + [CHARGE, SOH], start, end):
+        if not len(times):
+            continue
+        cells = numpy.concatenate(values[: len(MODULES)], axis=1)
+        charge, soh = values[len(MODULES) :]
+        # Modules that are not installed read 0 mV, missing values NaN
+        valid = cells > 0
+        records += len(times)
+        first = times[0] if first is None else min(first, times[0])
+        last = times[-1] if last is None else max(last, times[-1])
+
+        # Records of a file are in time order, so buckets are contiguous runs
+        bucket_keys = numpy.floor(times / bucket)
+        starts = numpy.flatnonzero(numpy.r_[True, bucket_keys[1:] != bucket_keys[:-1]])
+        keys.append(bucket_keys[starts])
+        sums.append(numpy.add.reduceat(numpy.where(valid, cells, 0.0), starts))
+        counts.append(numpy.add.reduceat(valid, starts))
+
+        # A file holds one UTC day: [records, spread sum, deviation sums, deviation
+        # counts, SOH sums, SOH counts]
+        totals = days.setdefault(
+            int(times[0] // DAY),
+            [0, 0.0, numpy.zeros(cells.shape[1]), numpy.zeros(cells.shape[1]), 0.0, 0.0],
+        )
+        top = charge >= charge_end
+        top[top] = valid[top].any(axis=1)
+        if top.any():
+            top_valid = valid[top]
+            top_cells = numpy.where(top_valid, cells[top], numpy.nan)
+            mean = numpy.where(top_valid, top_cells, 0).sum(axis=1) / top_valid.sum(axis=1)
+            deviation = numpy.where(top_valid, top_cells - mean[:, None], 0)
+            spread = numpy.fmax.reduce(top_cells, axis=1) - numpy.fmin.reduce(top_cells, axis=1)
+            totals[0] += len(top_cells)
+            totals[1] += spread.sum()
+            totals[2] += deviation.sum(axis=0)
+            totals[3] += top_valid.sum(axis=0)
+        soh_valid = ~numpy.isnan(soh)
+        totals[4] = totals[4] + numpy.where(soh_valid, soh, 0).sum(axis=0)
+        totals[5] = totals[5] + soh_valid.sum(axis=0)
+
+    report = {"records": records, "start": first, "end": last}
+    if not records:
+        return {**report, "cells": {}, "charge_end": {}, "soh": {}, "flagged": []}
+
+    # Cell means per bucket, buckets of files of the same day merged
+    unique, inverse = numpy.unique(numpy.concatenate(keys), return_inverse=True)
+    total = numpy.zeros((len(unique), len(VOLTAGES) * CELLS))
+    count = numpy.zeros_like(total)
+    numpy.add.at(total, inverse, numpy.concatenate(sums))
+    numpy.add.at(count, inverse, numpy.concatenate(counts))
+    times = unique * bucket
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        means = total / count
+        valid = count > 0
+        pack = numpy.where(valid, means, 0).sum(axis=1) / valid.sum(axis=1)
+        deviation = means - pack[:, None]
+        std = numpy.sqrt(numpy.where(valid, deviation**2, 0).sum(axis=1) / valid.sum(axis=1))
+        z = numpy.where(std[:, None] > 0, deviation / std[:, None], numpy.nan)
+
+        # Rolling mean of the z-scores over the buckets within `window` before each one
+        z_valid = ~numpy.isnan(z)
+        z_sums = numpy.vstack([numpy.zeros(z.shape[1]), numpy.where(z_valid, z, 0).cumsum(0)])
+        z_counts = numpy.vstack([numpy.zeros(z.shape[1]), z_valid.cumsum(0)])
+        begin = numpy.searchsorted(times, times - window, side="right")
+        stop = numpy.arange(1, len(times) + 1)
+        rolled = (z_sums[stop] - z_sums[begin]) / (z_counts[stop] - z_counts[begin])
+    magnitude = numpy.abs(rolled)
+    peak = numpy.where(numpy.isnan(magnitude), -1, magnitude).argmax(axis=0)
+    z_max = rolled[peak, numpy.arange(rolled.shape[1])]
+    drift = _slopes(numpy, times, deviation) * MONTH
+
+    z_rows, max_rows, drift_rows = _per_module(rolled[-1]), _per_module(z_max), _per_module(drift)
+    report["cells"] = {
+        module: {"z": z_rows[module], "z_max": max_rows[module], "drift": drift_rows[module]}
+        for module in MODULES
+    }
+
+    # Daily charge end spread and SOH, and the charge end deviation of the last window
+    day_keys = sorted(days)
+    day_times = numpy.array(day_keys, dtype=float) * DAY
+    tops = numpy.array([days[key][0] for key in day_keys], dtype=float)
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        spread = numpy.array([days[key][1] for key in day_keys]) / tops
+        soh = numpy.array([days[key][4] / days[key][5] for key in day_keys])
+    recent = [key for key in day_keys if key * DAY > day_times[-1] - window]
+    recent_sum = sum(days[key][2] for key in recent)
+    recent_count = sum(days[key][3] for key in recent)
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        recent_deviation = recent_sum / recent_count
+    report["charge_end"] = {
+        "records": int(tops.sum()),
+        "daily": {
+            _day(key): _value(value, 3) for key, value in zip(day_keys, spread) if value == value
+        },
+        "trend": _value(_slopes(numpy, day_times, spread[:, None])[0] * MONTH, 3),
+        "deviation": _per_module(recent_deviation),
+    }
+    report["soh"] = {
+        "daily": {
+            module: {
+                _day(key): _value(value, 2)
+                for key, value in zip(day_keys, column)
+                if value == value
+            }
+            for module, column in zip(MODULES, soh.T)
+        },
+        "trend": {
+            module: _value(slope * YEAR, 2)
+            for module, slope in zip(MODULES, _slopes(numpy, day_times, soh))
+        },
+    }
+
+    flagged = []
+    for module, cells in report["cells"].items():
+        for cell, (z_value, drift_value) in enumerate(zip(cells["z"], cells["drift"]), 1):
+            if (z_value is not None and abs(z_value) >= z_limit) or (
+                drift_value is not None and abs(drift_value) >= drift_limit
+            ):
+                flagged.append({"module": module, "cell": cell, "z": z_value, "drift": drift_value})
+    flagged.sort(key=lambda cell: -abs(cell["z"] or 0))
+    report["flagged"] = flagged
+    return report
@@ -0,0 +1,124 @@
+import asyncio
+from collections import Counter
+from time import monotonic
+
+# Registers charged for a whole section read, e.g. by read_senec_v21_all
+SECTION_COST = 100
+
+
+def request_cost(registers) -> int:
+    """Registers charged for a request of (section, register) pairs."""
+    return sum(SECTION_COST if register is None else 1 for _, register in registers)
+
+
+class Throttled(Exception):
+    """A request would wait longer than the limiter's max_wait for its budget."""
+
+
+class _Bucket:
+    """Token bucket refilled at `rate` tokens per minute."""
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = self.capacity(1.0)
+        self.updated = now
+
+    def capacity(self, scale: float) -> float:
+        return max(1.0, self.rate * scale * self.burst / 60)
+
+    def wait(self, cost: float, scale: float, now: float) -> float:
+        """Seconds until `cost` tokens are available."""
+        capacity = self.capacity(scale)
+        self.tokens = min(capacity, self.tokens + (now - self.updated) * self.rate * scale / 60)
+        self.updated = now
+        # Requests larger than the bucket are let through once it is full
+        missing = min(cost, capacity) - self.tokens
+        return max(0.0, missing * 60 / (self.rate * scale))
+
+
+class RateLimiter:
+    """Budget of requests and requested registers per minute for one Senec device
+
+    Both budgets are token buckets holding up to `burst` seconds worth of their rate.
+    The rates adapt to the device: when the smoothed lala.cgi response time exceeds
+    `latency_target` or a request fails, they are halved (down to `min_scale` of the
+    configured rates), and they double again with every fast response, so a short
+    outage does not slow polling for minutes.
+
+    A request that would wait longer than `max_wait` seconds for the budget raises
+    Throttled without waiting and is not sent, so the wait stays within the timeout of
+    the caller and the device never gets more than the budget.
+
+    Counters in `stats`: throttled (waits), throttle_seconds, rejected (Throttled),
+    slowdowns, recoveries.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 20,
+        registers_per_minute: float = 1000,
+        burst: float = 15,
+        latency_target: float = 2.0,
+        min_scale: float = 0.1,
+        max_wait: float = 10.0,
+        stats: Counter = None,
+        clock=monotonic,
+    ):
+        self._clock = clock
+        now = clock()
+        self._requests = _Bucket(requests_per_minute, burst, now)
+        self._registers = _Bucket(registers_per_minute, burst, now)
+        self.latency_target = latency_target
+        self.min_scale = min_scale
+        self.max_wait = max_wait
+        self.scale = 1.0
+        self.latency = None
+        self.stats = Counter() if stats is None else stats
+        self._lock = None
+
+    @property
+    def rates(self) -> tuple:
+        """Effective (requests, registers) per minute."""
+        return self._requests.rate * self.scale, self._registers.rate * self.scale
+
+    async def acquire(self, cost: int):
+        """Wait until one request of `cost` registers fits the budget and take it
+
+        Raises Throttled if that takes longer than `max_wait` seconds.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # Callers are served in order, so large requests are not starved by small ones
+        async with self._lock:
+            deadline = None
+            while True:
+                now = self._clock()
+                wait = max(
+                    self._requests.wait(1, self.scale, now),
+                    self._registers.wait(cost, self.scale, now),
+                )
+                if deadline is None:
+                    deadline = now + self.max_wait
+                if wait <= 0:
+                    break
+                if now + wait > deadline:
+                    self.stats["rejected"] += 1
+                    raise Throttled(f"Request budget exceeded for {wait:.0f} s")
+                self.stats["throttled"] += 1
+                self.stats["throttle_seconds"] += wait
+                await asyncio.sleep(wait)
+            self._requests.tokens -= 1
+            self._registers.tokens -= min(cost, self._registers.capacity(self.scale))
+
+    def record(self, latency: float = None):
+        """Adapt the rates to the response time of a request, None for a failed request."""
+        if latency is not None:
+            self.latency = latency if self.latency is None else 0.7 * self.latency + 0.3 * latency
+        if latency is None or self.latency > self.latency_target:
+            if self.scale > self.min_scale:
+                self.scale = max(self.min_scale, self.scale / 2)
+                self.stats["slowdowns"] += 1
+        elif self.scale < 1.0:
+            self.scale = min(1.0, self.scale * 2)
+            self.stats["recoveries"] += 1
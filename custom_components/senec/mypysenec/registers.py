@@ -0,0 +1,294 @@
+from collections import namedtuple
+
+from .constants import SYSTEM_STATE_NAME
+
+MODULES = "ABCD"
+
+# One Senec value: property key, lala.cgi section and register, index into array registers,
+# an optional transform applied when the value is read, and the name of the poll tier
+# the register is requested with (see scheduler.DEFAULT_TIERS)
+Register = namedtuple(
+    "Register",
+    "key section register index transform doc tier",
+    defaults=(None, None, None, "power"),
+)
+
+
+def _state_name(value) -> str:
+    return SYSTEM_STATE_NAME[value]
+
+
+def _positive(value) -> float:
+    return value if value > 0 else 0
+
+
+def _negative(value) -> float:
+    return abs(value) if value < 0 else 0
+
+
+def _kilo(value) -> float:
+    return value / 1000.0
+
+
+def _array(key: str, section: str, register: str, labels, tier: str = "power") -> list:
+    """One Register per array element, `key` is formatted with the element label."""
+    return [
+        Register(key.format(label), section, register, index, tier=tier)
+        for index, label in enumerate(labels)
+    ]
+
+
+REGISTERS = (
+    [
+        Register(
+            "system_state",
+            "ENERGY",
+            "STAT_STATE",
+            None,
+            _state_name,
+            "Textual descritpion of energy status",
+        ),
+        Register("house_power", "ENERGY", "GUI_HOUSE_POW", doc="Current power consumption (W)"),
+        Register(
+            "house_total_consumption",
+            "STATISTIC",
+            "LIVE_HOUSE_CONS",
+            doc="Total energy used by house (kWh), does not include Wallbox",
+            tier="statistic",
+        ),
+        Register(
+            "solar_generated_power",
+            "ENERGY",
+            "GUI_INVERTER_POWER",
+            None,
+            abs,
+            "Current power generated by solar panels (W)",
+        ),
+        Register(
+            "solar_total_generated",
+            "STATISTIC",
+            "LIVE_PV_GEN",
+            doc="Total energy generated by solar panels (kWh)",
+            tier="statistic",
+        ),
+        Register(
+            "battery_charge_percent",
+            "ENERGY",
+            "GUI_BAT_DATA_FUEL_CHARGE",
+            doc="Current battery charge value (%)",
+        ),
+        Register(
+            "battery_charge_power",
+            "ENERGY",
+            "GUI_BAT_DATA_POWER",
+            None,
+            _positive,
+            "Current battery charging power (W)",
+        ),
+        Register(
+            "battery_discharge_power",
+            "ENERGY",
+            "GUI_BAT_DATA_POWER",
+            None,
+            _negative,
+            "Current battery discharging power (W)",
+        ),
+        Register(
+            "battery_state_power",
+            "ENERGY",
+            "GUI_BAT_DATA_POWER",
+            doc="Battery charging power (W), positive when charging, negative when discharging",
+        ),
+        Register(
+            "battery_total_charged",
+            "STATISTIC",
+            "LIVE_BAT_CHARGE",
+            doc="Total energy charged to battery (kWh)",
+            tier="statistic",
+        ),
+        Register(
+            "battery_total_discharged",
+            "STATISTIC",
+            "LIVE_BAT_DISCHARGE",
+            doc="Total energy discharged from battery (kWh)",
+            tier="statistic",
+        ),
+        Register(
+            "grid_imported_power",
+            "ENERGY",
+            "GUI_GRID_POW",
+            None,
+            _positive,
+            "Current power imported from grid (W)",
+        ),
+        Register(
+            "grid_exported_power",
+            "ENERGY",
+            "GUI_GRID_POW",
+            None,
+            _negative,
+            "Current power exported to grid (W)",
+        ),
+        Register(
+            "grid_state_power",
+            "ENERGY",
+            "GUI_GRID_POW",
+            doc="Grid exchange power (W), positive when importing, negative when exporting",
+        ),
+        Register(
+            "grid_total_export",
+            "STATISTIC",
+            "LIVE_GRID_EXPORT",
+            doc="Total energy exported to grid export (kWh)",
+            tier="statistic",
+        ),
+        Register(
+            "grid_total_import",
+            "STATISTIC",
+            "LIVE_GRID_IMPORT",
+            doc="Total energy imported from grid (kWh)",
+            tier="statistic",
+        ),
+        Register(
+            "wallbox_power",
+            "WALLBOX",
+            "APPARENT_CHARGING_POWER",
+            0,
+            doc="Wallbox Total Charging Power (W)",
+        ),
+        Register("wallbox_ev_connected", "WALLBOX", "EV_CONNECTED", 0, doc="Wallbox EV Connected"),
+        Register(
+            "wallbox_energy",
+            "STATISTIC",
+            "LIVE_WB_ENERGY",
+            0,
+            _kilo,
+            "Wallbox Total Energy",
+            tier="statistic",
+        ),
+        Register(
+            "battery_temp",
+            "TEMPMEASURE",
+            "BATTERY_TEMP",
+            doc="Current battery temperature",
+            tier="statistic",
+        ),
+        Register(
+            "case_temp",
+            "TEMPMEASURE",
+            "CASE_TEMP",
+            doc="Current case temperature",
+            tier="statistic",
+        ),
+        Register(
+            "mcu_temp",
+            "TEMPMEASURE",
+            "MCU_TEMP",
+            doc="Current controller temperature",
+            tier="statistic",
+        ),
+    ]
+    + _array("mpp_power_{}", "PV1", "MPP_POWER", range(3))
+    + _array("ac_spannung_l{}", "PM1OBJ1", "U_AC", range(1, 4))
+    + _array("ac_strom_l{}", "PM1OBJ1", "I_AC", range(1, 4))
+    + _array("ac_leistung_l{}", "PM1OBJ1", "P_AC", range(1, 4))
+    + [
+        register
+        for module in MODULES
+        for register in _array(
+            f"bms_cell_temp_{module}{{}}",
+            "BMS",
+            f"CELL_TEMPERATURES_MODULE_{module}",
+            range(1, 7),
+            "cells",
+        )
+    ]
+    + [
+        register
+        for module in MODULES
+        for register in _array(
+            f"bms_cell_volt_{module}{{}}",
+            "BMS",
+            f"CELL_VOLTAGES_MODULE_{module}",
+            range(1, 15),
+            "cells",
+        )
+    ]
+    + _array("bms_soc_{}", "BMS", "SOC", MODULES, "statistic")
+    + _array("bms_soh_{}", "BMS", "SOH", MODULES, "static")
+    + _array("bms_voltage_{}", "BMS", "VOLTAGE", MODULES, "statistic")
+    + _array("bms_current_{}", "BMS", "CURRENT", MODULES, "statistic")
+    + _array("bms_cycles_{}", "BMS", "CYCLES", MODULES, "static")
+    + _array("bms_charge_limit_{}", "BMS", "CHARGE_CURRENT_LIMIT", MODULES, "statistic")
+    + _array("bms_fw_{}", "BMS", "FW", MODULES, "static")
+    + _array("socket_{}_state", "SOCKETS", "POWER_ON", range(2), "statistic")
+)
+
+# Flat value layout: every distinct (section, register, index) gets one slot
+LAYOUT = tuple(dict.fromkeys((reg.section, reg.register, reg.index) for reg in REGISTERS))
+_LAYOUT_SLOT = {source: slot for slot, source in enumerate(LAYOUT)}
+KEY_SLOT = {reg.key: _LAYOUT_SLOT[reg.section, reg.register, reg.index] for reg in REGISTERS}
+KEY_REGISTER = {reg.key: (reg.section, reg.register) for reg in REGISTERS}
+
+# Cell arrays of the battery modules: array key -> keys of the module's cells
+CELL_ARRAYS = {
+    f"bms_cell_{kind}_{module}": [
+        reg.key for reg in REGISTERS if reg.key.startswith(f"bms_cell_{kind}_{module}")
+    ]
+    for kind in ("volt", "temp")
+    for module in MODULES
+}
+
+# section -> register -> ((index, slot), ...)
+_SLOTS = {}
+for _slot, (_section, _register, _index) in enumerate(LAYOUT):
+    _SLOTS.setdefault(_section, {}).setdefault(_register, []).append((_index, _slot))
+
+
+def registers_for(keys) -> frozenset:
+    """Smallest set of (section, register) pairs needed to serve the given property keys
+
+    A key of CELL_ARRAYS stands for all cells of its module.
+    """
+    pairs = set()
+    for key in keys:
+        if key in KEY_REGISTER:
+            pairs.add(KEY_REGISTER[key])
+        elif key in CELL_ARRAYS:
+            pairs.update(KEY_REGISTER[cell] for cell in CELL_ARRAYS[key])
+    return frozenset(pairs)
+
+
+def slot_values(raw: dict):
+    """Yield (slot, value) for every LAYOUT slot present in a decoded response."""
+    for section, registers in _SLOTS.items():
+        section_values = raw.get(section)
+        if section_values is None:
+            continue
+        for register, slots in registers.items():
+            if register not in section_values:
+                continue
+            value = section_values[register]
+            for index, slot in slots:
+                if index is None:
+                    yield slot, value
+                elif value.__class__ is str:
+                    # e.g. VARIABLE_NOT_FOUND where an array is expected
+                    yield slot, None
+                else:
+                    try:
+                        yield slot, value[index]
+                    except (IndexError, TypeError):
+                        yield slot, None
+
+
+def flatten(raw: dict, values: list = None) -> list:
+    """Copy the registers of a decoded response into their LAYOUT slots
+
+    Slots of registers missing from `raw` keep their value in `values`.
+    """
+    if values is None:
+        values = [None] * len(LAYOUT)
+    for slot, value in slot_values(raw):
+        values[slot] = value
+    return values
@@ -0,0 +1,167 @@
+import math
+from array import array
+from bisect import bisect_left
+
+from .registers import KEY_SLOT, LAYOUT, REGISTERS, _kilo, _negative, _positive
+
+_TRANSFORMS = {register.key: register.transform for register in REGISTERS}
+_NUMERIC = (None, abs, _positive, _negative, _kilo)
+
+
+def _vector_transforms(numpy) -> dict:
+    """numpy equivalents of the numeric Register transforms."""
+    return {
+        abs: numpy.abs,
+        _positive: lambda values: numpy.maximum(values, 0),
+        _negative: lambda values: numpy.maximum(-values, 0),
+        _kilo: lambda values: values / 1000.0,
+    }
+
+
+class RingBuffer:
+    """Last `capacity` snapshots of every register table slot, column by column
+
+    Storage is preallocated when the buffer is created: a (capacity, slots) float64
+    numpy array, or with `backend="array"` (the default without numpy) one array('d')
+    per slot. Appending a snapshot copies its values into the oldest row, so no Python
+    object is kept per sample. Slots without a number hold NaN and are ignored by the
+    aggregates. Slower register tiers repeat their last value until they are read again.
+
+    Windows are the last `seconds` (by snapshot timestamp) or the last `count` samples,
+    default everything buffered. Aggregates apply the property transform of the key,
+    so e.g. grid_imported_power only averages imports, and return None for windows
+    without values.
+    """
+
+    def __init__(self, capacity: int = 720, backend: str = None):
+        if backend is None:
+            try:
+                import numpy  # noqa: F401
+            except ImportError:
+                backend = "array"
+            else:
+                backend = "numpy"
+        if backend == "numpy":
+            try:
+                import numpy
+            except ImportError:
+                raise ImportError("numpy is required for backend='numpy'") from None
+            self._numpy = numpy
+            self._values = numpy.full((capacity, len(LAYOUT)), numpy.nan)
+            self._times = numpy.full(capacity, numpy.nan)
+            self._transforms = _vector_transforms(numpy)
+        elif backend == "array":
+            self._numpy = None
+            self._values = [array("d", [math.nan]) * capacity for _ in LAYOUT]
+            self._times = array("d", [math.nan]) * capacity
+        else:
+            raise ValueError(f"Unknown ring buffer backend: {backend}")
+        self.backend = backend
+        self.capacity = capacity
+        self._head = 0
+        self._size = 0
+        self._seq = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, snapshot):
+        """Store a snapshot, replacing the oldest one once the buffer is full
+
+        Windows are searched by time, so snapshots without a timestamp raise ValueError.
+        """
+        if snapshot.seq == self._seq:
+            return
+        if snapshot.timestamp is None:
+            raise ValueError("Snapshots without a timestamp cannot be buffered")
+        self._seq = snapshot.seq
+        row = self._head
+        numbers = snapshot._numbers
+        if self._numpy is not None:
+            self._values[row] = numbers
+        else:
+            for column, value in zip(self._values, numbers):
+                column[row] = value
+        self._times[row] = snapshot.timestamp
+        self._head = (row + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def _rows(self, column, count: int):
+        """Last `count` entries of a column, oldest first."""
+        start = self._head - count
+        if start >= 0:
+            return column[start : self._head]
+        if self._numpy is not None:
+            return self._numpy.concatenate((column[start:], column[: self._head]))
+        return column[start:] + column[: self._head]
+
+    def _count(self, seconds: float = None, count: int = None) -> int:
+        size = self._size if count is None else min(count, self._size)
+        if seconds is None or not size:
+            return size
+        times = self._rows(self._times, size)
+        # Timestamps only grow, so the window start is found by bisection
+        if self._numpy is not None:
+            return size - int(self._numpy.searchsorted(times, times[-1] - seconds))
+        return size - bisect_left(times, times[-1] - seconds)
+
+    def window(self, key: str, seconds: float = None, count: int = None):
+        """(timestamps, values) of a key in the window, NaN where it had no value."""
+        count = self._count(seconds, count)
+        times = self._rows(self._times, count)
+        slot = KEY_SLOT[key]
+        transform = _TRANSFORMS[key]
+        if transform not in _NUMERIC:
+            raise ValueError(f"{key} is not numeric")
+        if self._numpy is not None:
+            values = self._rows(self._values[:, slot], count)
+            if transform is not None:
+                values = self._transforms[transform](values)
+            return times, values
+        values = self._rows(self._values[slot], count)
+        if transform is not None:
+            values = array("d", (value if value != value else transform(value) for value in values))
+        return times, values
+
+    def _valid(self, key, seconds, count):
+        times, values = self.window(key, seconds, count)
+        if self._numpy is not None:
+            mask = ~self._numpy.isnan(values)
+            return times[mask], values[mask]
+        pairs = [(time, value) for time, value in zip(times, values) if value == value]
+        return [time for time, _ in pairs], [value for _, value in pairs]
+
+    def mean(self, key: str, seconds: float = None, count: int = None) -> float:
+        _, values = self._valid(key, seconds, count)
+        if not len(values):
+            return None
+        return float(values.mean()) if self._numpy is not None else math.fsum(values) / len(values)
+
+    def min(self, key: str, seconds: float = None, count: int = None) -> float:
+        _, values = self._valid(key, seconds, count)
+        if not len(values):
+            return None
+        return float(values.min()) if self._numpy is not None else min(values)
+
+    def max(self, key: str, seconds: float = None, count: int = None) -> float:
+        _, values = self._valid(key, seconds, count)
+        if not len(values):
+            return None
+        return float(values.max()) if self._numpy is not None else max(values)
+
+    def std(self, key: str, seconds: float = None, count: int = None) -> float:
+        """Population standard deviation."""
+        _, values = self._valid(key, seconds, count)
+        if not len(values):
+            return None
+        if self._numpy is not None:
+            return float(values.std())
+        mean = math.fsum(values) / len(values)
+        return math.sqrt(math.fsum((value - mean) ** 2 for value in values) / len(values))
+
+    def rate(self, key: str, seconds: float = None, count: int = None) -> float:
+        """Change per second between the first and last value of the window."""
+        times, values = self._valid(key, seconds, count)
+        if len(values) < 2 or times[-1] == times[0]:
+            return None
+        return float((values[-1] - values[0]) / (times[-1] - times[0]))
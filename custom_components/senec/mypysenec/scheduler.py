@@ -0,0 +1,229 @@
+import math
+from collections import Counter, namedtuple
+from time import monotonic
+
+from .registers import REGISTERS
+
+# Registers read at a common cadence: interval in seconds, registers as {section: (names)}.
+# The default tiers request the registers of the table, by their tier field.
+Tier = namedtuple("Tier", "name interval registers")
+
+
+def _tier_registers(name: str) -> dict:
+    """{section: (registers)} of the REGISTERS of the tier `name`, in table order."""
+    registers = {}
+    for register in REGISTERS:
+        if register.tier == name:
+            names = registers.setdefault(register.section, [])
+            if register.register not in names:
+                names.append(register.register)
+    return {section: tuple(names) for section, names in registers.items()}
+
+
+POWER_TIER = Tier("power", 5, _tier_registers("power"))
+STATISTIC_TIER = Tier("statistic", 60, _tier_registers("statistic"))
+CELLS_TIER = Tier("cells", 300, _tier_registers("cells"))
+STATIC_TIER = Tier("static", 3600, _tier_registers("static"))
+
+DEFAULT_TIERS = (POWER_TIER, STATISTIC_TIER, CELLS_TIER, STATIC_TIER)
+
+
+def build_form(tiers) -> dict:
+    """Merge the registers of several tiers into a single lala.cgi request form."""
+    form = {}
+    for tier in tiers:
+        for section, registers in tier.registers.items():
+            entries = form.setdefault(section, {})
+            for register in registers:
+                entries[register] = ""
+    return form
+
+
+def form_registers(form: dict) -> frozenset:
+    """(section, register) pairs requested by a form, register None for a whole section."""
+    return frozenset(
+        (section, register)
+        for section, entries in form.items()
+        for register in (entries or (None,))
+    )
+
+
+def covers(registers: frozenset, other: frozenset) -> bool:
+    """True if a request for `registers` returns every register of a request for `other`."""
+    return all(pair in registers or (pair[0], None) in registers for pair in other)
+
+
+class PollScheduler:
+    """Decides which register tiers are due on a poll.
+
+    Tiers due at the same time are requested together, so a caller polling at the
+    cadence of the fastest tier sends exactly one request per poll.
+    """
+
+    def __init__(self, tiers=DEFAULT_TIERS, grace: float = 1.0):
+        self.available = tuple(tiers)
+        self.tiers = self.available
+        # A tier is also due when it is at most `grace` seconds early, so a caller
+        # ticking at exactly the tier interval does not skip every other tick.
+        self.grace = grace
+        self._last = {}
+
+    def due(self, now: float = None) -> list:
+        """Tiers that have to be read on a poll at `now` (monotonic seconds)."""
+        if now is None:
+            now = monotonic()
+        due = []
+        for tier in self.tiers:
+            last = self._last.get(tier.name)
+            if last is None or now - last >= tier.interval - self.grace:
+                due.append(tier)
+        return due
+
+    def mark(self, tiers, now: float):
+        """Record that `tiers` were read by a poll started at `now`."""
+        for tier in tiers:
+            self._last[tier.name] = now
+
+    def select(self, registers=None):
+        """Restrict the tiers to the given (section, register) pairs, None selects everything.
+
+        Tiers without any selected register are dropped and all remaining tiers become due.
+        """
+        if registers is None:
+            self.tiers = self.available
+        else:
+            tiers = []
+            for tier in self.available:
+                selected = {}
+                for section, names in tier.registers.items():
+                    names = tuple(name for name in names if (section, name) in registers)
+                    if names:
+                        selected[section] = names
+                if selected:
+                    tiers.append(tier._replace(registers=selected))
+            self.tiers = tuple(tiers)
+        self.reset()
+
+    def reset(self):
+        """Forget all previous reads, making every tier due again."""
+        self._last.clear()
+
+
+# STAT_STATE codes of a battery neither charging nor discharging: AKKU VOLL, AKKU LEER,
+# PASSIV, AUSGESCHALTET, EG PASSIV, SCHLAFMODUS, WARTE AUF ÜBERSCHUSS
+IDLE_STATES = frozenset((13, 15, 19, 20, 30, 41, 42))
+
+# Power flows whose changes make the system active
+ACTIVITY_KEYS = ("house_power", "solar_generated_power", "battery_state_power", "grid_state_power")
+
+# Property keys read by AdaptiveInterval, to be requested whatever entities are enabled
+ADAPTIVE_KEYS = ACTIVITY_KEYS + ("system_state",)
+
+
+class AdaptiveInterval:
+    """Poll interval following the activity of the system
+
+    When a power flow changed by at least `threshold` W since the previous snapshot the
+    interval drops to `floor`, also while idle (e.g. a load switched on at night).
+    Otherwise it is `ceiling` while idle, without PV power (below `pv_idle` W) and the
+    battery in one of the IDLE_STATES, and grows by `growth` per poll up to
+    `active_ceiling` while the flows are steady. The default floor is the interval of
+    the power tier, so changing flows are read at the cadence of the power values.
+    """
+
+    def __init__(
+        self,
+        floor: float = POWER_TIER.interval,
+        ceiling: float = 300,
+        active_ceiling: float = 60,
+        threshold: float = 300,
+        growth: float = 1.5,
+        pv_idle: float = 10,
+    ):
+        self.floor = floor
+        self.ceiling = ceiling
+        self.active_ceiling = max(floor, min(active_ceiling, ceiling))
+        self.threshold = threshold
+        self.growth = growth
+        self.pv_idle = pv_idle
+        self.interval = self.active_ceiling
+        self._previous = None
+
+    def update(self, snapshot) -> float:
+        """Interval in seconds until the poll after the one that produced `snapshot`."""
+        powers = [snapshot.get(key) for key in ACTIVITY_KEYS]
+        previous, self._previous = self._previous, powers
+        pv = powers[1]
+        if previous is not None and any(
+            value is not None and before is not None and abs(value - before) >= self.threshold
+            for value, before in zip(powers, previous)
+        ):
+            self.interval = self.floor
+        elif (
+            snapshot.get("system_state") in IDLE_STATES
+            and pv is not None
+            and abs(pv) < self.pv_idle
+        ):
+            self.interval = self.ceiling
+        else:
+            self.interval = max(self.floor, min(self.interval * self.growth, self.active_ceiling))
+        return self.interval
+
+
+# Intervals dividing a minute or an hour, whose multiples fall on clock boundaries
+CLOCK_INTERVALS = (1, 2, 3, 4, 5, 6, 10, 12, 15, 20, 30, 60)
+CLOCK_INTERVALS += (120, 180, 240, 300, 360, 600, 720, 900, 1200, 1800, 3600)
+
+
+def clock_interval(seconds: float) -> int:
+    """The clock interval closest to `seconds`."""
+    return min(CLOCK_INTERVALS, key=lambda interval: abs(interval - seconds))
+
+
+class AlignedTicks:
+    """Poll times aligned to wall clock boundaries, with jitter and missed tick metrics
+
+    Ticks fall on multiples of the interval since the epoch (plus `offset`), e.g. :00,
+    :10, :20 for 10 s, so the schedule neither drifts with request latency nor depends
+    on when polling started. Intervals are first rounded to the closest CLOCK_INTERVALS,
+    which divide a minute or an hour: an adaptive interval of 22.5 s ticks every 20 s.
+    A poll is started `lead` seconds (the measured request latency) before its tick, so
+    its sample is taken on the tick.
+
+    Counters in `stats`: ticks, missed_ticks (boundaries skipped because a poll ran
+    late), jitter_seconds (sum of the absolute sample time errors). `jitter` is the
+    error of the last sample.
+    """
+
+    def __init__(self, offset: float = 0, stats: Counter = None):
+        self.offset = offset
+        self.stats = Counter() if stats is None else stats
+        self.tick = None
+        self.interval = None
+        self.jitter = None
+
+    def next(self, now: float, interval: float, lead: float = 0) -> float:
+        """Epoch time to start the next poll for the first tick it can still make."""
+        interval = clock_interval(interval)
+        lead = min(max(lead, 0), interval / 2)
+        tick = math.floor((now + lead - self.offset) / interval + 1) * interval + self.offset
+        if self.tick is not None and tick > self.tick:
+            # Boundaries of the current interval between the previous and this tick
+            expected = math.floor((self.tick - self.offset) / interval + 1) * interval
+            missed = round((tick - self.offset - expected) / interval)
+            if missed > 0:
+                self.stats["missed_ticks"] += missed
+        self.tick = tick
+        self.interval = interval
+        return tick - lead
+
+    def sampled(self, timestamp: float):
+        """Record the time a poll took its sample, polls off the schedule are ignored."""
+        if self.tick is None or timestamp is None:
+            return
+        error = timestamp - self.tick
+        if abs(error) > self.interval / 2:
+            return
+        self.jitter = error
+        self.stats["ticks"] += 1
+        self.stats["jitter_seconds"] += abs(error)
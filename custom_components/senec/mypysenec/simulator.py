@@ -0,0 +1,391 @@
+"""Local lala.cgi simulator for offline load and latency testing.
+
+Usage: python -m mypysenec.simulator [--port 8080] [--latency 0.2] [--time-scale 60]
+
+The simulator answers lala.cgi POST requests like a Senec Home V2.1 would, with
+values in the device encoding (u8_/u1_/u3_/i3_/fl_/st_) following a simulated day:
+a PV curve with passing clouds, a house load with morning and evening peaks and a
+battery charged from the surplus, down to per-cell BMS voltages and temperatures.
+It is served over plain HTTP, point a transport at `SenecSimulator.url`.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import struct
+from collections import Counter
+from time import localtime, monotonic
+
+from aiohttp import web
+
+from .limiter import request_cost
+from .scheduler import form_registers
+
+MODULES = 4
+CELLS = 14
+CELL_SENSORS = 6
+
+
+def encode(value, kind: str) -> str:
+    """Encode a value the way lala.cgi does, e.g. encode(14, "u8") == "u8_0E"."""
+    if kind == "fl":
+        return "fl_" + struct.pack(">f", value).hex().upper()
+    if kind == "st":
+        return "st_" + value
+    digits = {"8": 2, "1": 4, "3": 8, "6": 16}[kind[1]]
+    if kind[0] == "i":
+        # Two's complement of the register width
+        value &= (1 << (4 * digits)) - 1
+    return f"{kind}_{int(value):0{digits}X}"
+
+
+def _bell(hour: float, center: float, width: float) -> float:
+    return math.exp(-(((hour - center) / width) ** 2))
+
+
+class DayModel:
+    """Deterministic household with PV, battery and house load over a day
+
+    PV and load are functions of the time of day only (seeded), battery SOC and the
+    energy counters are integrated by `advance`.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        peak_pv: float = 8000,
+        base_load: float = 350,
+        capacity: float = 10000,
+        max_power: float = 2500,
+        soc: float = 40,
+    ):
+        rng = random.Random(seed)
+        self.peak_pv = peak_pv
+        self.base_load = base_load
+        self.capacity = capacity
+        self.max_power = max_power
+        self.soc = soc
+        self.phases = [rng.uniform(0, 2 * math.pi) for _ in range(4)]
+        # Cell offsets in mV and K stay fixed, like the spread of a real battery
+        self.cell_offsets = [[rng.gauss(0, 4) for _ in range(CELLS)] for _ in range(MODULES)]
+        self.temp_offsets = [
+            [rng.gauss(0, 0.8) for _ in range(CELL_SENSORS)] for _ in range(MODULES)
+        ]
+        self.module_soc = [rng.uniform(-2, 2) for _ in range(MODULES)]
+        self.totals = {
+            "LIVE_BAT_CHARGE": 1200.0,
+            "LIVE_BAT_DISCHARGE": 1100.0,
+            "LIVE_GRID_EXPORT": 3000.0,
+            "LIVE_GRID_IMPORT": 2500.0,
+            "LIVE_HOUSE_CONS": 6000.0,
+            "LIVE_PV_GEN": 7500.0,
+        }
+        self.time = None
+        self.pv = self.load = self.battery = self.grid = 0.0
+
+    def pv_power(self, t: float) -> float:
+        hour = t / 3600 % 24
+        sun = math.sin(math.pi * (hour - 6) / 14)
+        if sun <= 0:
+            return 0.0
+        a, b = self.phases[:2]
+        clouds = 0.25 * (1 + math.sin(t / 1100 + a)) * (1 + math.sin(t / 170 + b)) / 2
+        return self.peak_pv * sun**1.3 * (1 - clouds)
+
+    def load_power(self, t: float) -> float:
+        hour = t / 3600 % 24
+        load = self.base_load
+        load += (
+            1500 * _bell(hour, 7.5, 0.8) + 600 * _bell(hour, 12.5, 1) + 2500 * _bell(hour, 19, 1.5)
+        )
+        # Kettle, oven and the like: short spikes a few times an hour
+        if math.sin(t / 97 + self.phases[2]) * math.sin(t / 1400 + self.phases[3]) > 0.85:
+            load += 2000
+        return load
+
+    def advance(self, t: float):
+        """Move the model to `t` seconds since midnight of the first day."""
+        dt = 0.0 if self.time is None else max(0.0, t - self.time)
+        self.time = t
+        self.pv = self.pv_power(t)
+        self.load = self.load_power(t)
+        battery = max(-self.max_power, min(self.max_power, self.pv - self.load))
+        if (battery > 0 and self.soc >= 100) or (battery < 0 and self.soc <= 5):
+            battery = 0.0
+        self.battery = battery
+        self.grid = self.load - self.pv + battery
+        self.soc = max(0.0, min(100.0, self.soc + battery * dt / 36 / self.capacity))
+        hours = dt / 3600 / 1000
+        totals = self.totals
+        totals["LIVE_PV_GEN"] += self.pv * hours
+        totals["LIVE_HOUSE_CONS"] += self.load * hours
+        totals["LIVE_BAT_CHARGE"] += max(battery, 0) * hours
+        totals["LIVE_BAT_DISCHARGE"] += max(-battery, 0) * hours
+        totals["LIVE_GRID_IMPORT"] += max(self.grid, 0) * hours
+        totals["LIVE_GRID_EXPORT"] += max(-self.grid, 0) * hours
+
+    @property
+    def state(self) -> int:
+        if self.battery > 0:
+            return 13 if self.soc >= 100 else 14
+        if self.battery < 0:
+            return 17 if self.pv > 0 else 16
+        return 15 if self.soc <= 5 else 19
+
+    def cell_voltages(self, module: int) -> list:
+        """Cell voltages in mV."""
+        soc = self.soc + self.module_soc[module]
+        current = self.battery / MODULES / (CELLS * 3.3)
+        base = 3200 + 1.6 * soc + 4 * current
+        return [base + offset for offset in self.cell_offsets[module]]
+
+    def cell_temperatures(self, module: int) -> list:
+        base = 21 + 4 * abs(self.battery) / self.max_power
+        return [base + offset for offset in self.temp_offsets[module]]
+
+    def registers(self) -> dict:
+        """All simulated registers as section -> register -> (kind, value)."""
+        modules = range(MODULES)
+        voltages = [sum(self.cell_voltages(module)) / 1000 for module in modules]
+        currents = [self.battery / MODULES / voltage for voltage in voltages]
+        socs = [max(0, min(100, round(self.soc + self.module_soc[m]))) for m in modules]
+        phase = [self.grid / 3] * 3
+        u_ac = [230.1, 231.4, 229.6]
+        temp = 21 + 4 * abs(self.battery) / self.max_power
+        energy = {
+            "STAT_STATE": ("u8", self.state),
+            "GUI_BAT_DATA_POWER": ("fl", self.battery),
+            "GUI_INVERTER_POWER": ("fl", -self.pv),
+            "GUI_HOUSE_POW": ("fl", self.load),
+            "GUI_GRID_POW": ("fl", self.grid),
+            "GUI_BAT_DATA_FUEL_CHARGE": ("fl", self.soc),
+            "GUI_CHARGING_INFO": ("u8", int(self.battery > 0)),
+            "GUI_BOOSTING_INFO": ("u8", 0),
+            "GUI_BAT_DATA_VOLTAGE": ("fl", sum(voltages) / MODULES),
+            "GUI_BAT_DATA_CURRENT": ("fl", sum(currents)),
+            "GUI_BAT_DATA_OA_CHARGING": ("u8", 0),
+            "STAT_LIMITED_NET_SKEW": ("u8", 0),
+        }
+        bms = {
+            "SOC": [("u1", soc) for soc in socs],
+            "SOH": [("u1", 100 - module) for module in modules],
+            "CYCLES": [("u1", 420 + module) for module in modules],
+            "FW": [("u1", 0x0307)] * MODULES,
+            "VOLTAGE": [("fl", voltage) for voltage in voltages],
+            "CURRENT": [("fl", current) for current in currents],
+            "CHARGE_CURRENT_LIMIT": [("fl", 30.0)] * MODULES,
+        }
+        for module, name in enumerate("ABCD"):
+            bms[f"CELL_VOLTAGES_MODULE_{name}"] = [("fl", v) for v in self.cell_voltages(module)]
+            bms[f"CELL_TEMPERATURES_MODULE_{name}"] = [
+                ("fl", t) for t in self.cell_temperatures(module)
+            ]
+        meter = {
+            "FREQ": ("fl", 50.0),
+            "U_AC": [("fl", u) for u in u_ac],
+            "I_AC": [("fl", p / u) for p, u in zip(phase, u_ac)],
+            "P_AC": [("fl", p) for p in phase],
+            "P_TOTAL": ("fl", self.grid),
+        }
+        registers = {
+            "ENERGY": energy,
+            "STATISTIC": {key: ("fl", value) for key, value in self.totals.items()},
+            "TEMPMEASURE": {
+                "BATTERY_TEMP": ("fl", temp),
+                "CASE_TEMP": ("fl", temp + 6),
+                "MCU_TEMP": ("fl", temp + 18),
+            },
+            "BMS": bms,
+            "PV1": {
+                "POWER_RATIO": ("fl", 100.0),
+                "MPP_POWER": [("fl", self.pv * share) for share in (0.5, 0.3, 0.2)],
+            },
+            "PWR_UNIT": {f"POWER_L{n}": ("fl", self.load / 3) for n in (1, 2, 3)},
+            "PM1OBJ1": meter,
+            "PM1OBJ2": meter,
+            "WALLBOX": {
+                "APPARENT_CHARGING_POWER": [("fl", 0.0)] * 4,
+                "L1_CHARGING_CURRENT": [("fl", 0.0)] * 4,
+                "L2_CHARGING_CURRENT": [("fl", 0.0)] * 4,
+                "L3_CHARGING_CURRENT": [("fl", 0.0)] * 4,
+                "EV_CONNECTED": [("u8", 0)] * 4,
+            },
+            "SOCKETS": {"POWER_ON": [("u8", 0)] * 2},
+            "FEATURES": {"PEAKSHAVING": ("u8", 1), "ISLAND": ("u8", 1), "HEAT": ("u8", 0)},
+            "WIZARD": {
+                "APPLICATION_VERSION": ("st", "0826"),
+                "INTERFACE_VERSION": ("st", "2.17"),
+                "SETUP_NUMBER_WALLBOXES": ("u8", 0),
+            },
+            "SYS_UPDATE": {"UPDATE_AVAILABLE": ("u8", 0), "NPU_VER": ("u3", 3)},
+        }
+        registers["STATISTIC"]["LIVE_WB_ENERGY"] = [("fl", 0.0)] * 4
+        for module in modules:
+            registers[f"BAT1OBJ{module + 1}"] = {
+                "SN": ("st", f"S{module + 1}0012345"),
+                "FW": ("u1", 0x0307),
+                "TEMP": ("fl", temp),
+                "VOLTAGE": ("fl", voltages[module]),
+                "CURRENT": ("fl", currents[module]),
+                "SOC": ("u8", socs[module]),
+            }
+        return registers
+
+
+def _encode_register(value):
+    if isinstance(value, list):
+        return [encode(item, kind) for kind, item in value]
+    kind, item = value
+    return encode(item, kind)
+
+
+def respond(form: dict, registers: dict) -> dict:
+    """lala.cgi response to a request form, an empty section requests all its registers."""
+    response = {}
+    for section, requested in form.items():
+        known = registers.get(section, {})
+        if not requested:
+            response[section] = {name: _encode_register(value) for name, value in known.items()}
+            continue
+        response[section] = {
+            name: _encode_register(known[name]) if name in known else "VARIABLE_NOT_FOUND"
+            for name in requested
+        }
+    return response
+
+
+class SenecSimulator:
+    """aiohttp server answering lala.cgi requests from a DayModel
+
+    Every request waits `latency` seconds plus up to `jitter`, and `error_rate` of them
+    fail with an HTTP 500 or a truncated body. Like the device, requests are handled
+    one at a time. The overload model is a leaky bucket of requested registers drained
+    at `capacity` registers per second: a backlog adds its drain time to the latency,
+    and beyond `overload` seconds of backlog requests are refused with HTTP 503.
+
+    Simulated time runs `time_scale` times faster than real time, starting at
+    `start_hour` (default: the current local time).
+    """
+
+    def __init__(
+        self,
+        model: DayModel = None,
+        latency: float = 0.05,
+        jitter: float = 0.02,
+        error_rate: float = 0.0,
+        capacity: float = 500,
+        overload: float = 5.0,
+        time_scale: float = 1.0,
+        start_hour: float = None,
+        seed: int = 0,
+    ):
+        self.model = model or DayModel(seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.capacity = capacity
+        self.overload = overload
+        self.time_scale = time_scale
+        if start_hour is None:
+            now = localtime()
+            start_hour = now.tm_hour + now.tm_min / 60 + now.tm_sec / 3600
+        self._start = start_hour * 3600
+        self._random = random.Random(seed)
+        self._started = monotonic()
+        self._backlog = 0.0
+        self._drained = self._started
+        self._lock = None
+        self._runner = None
+        self.url = None
+        self.stats = Counter()
+
+    def simulated_time(self) -> float:
+        """Simulated seconds since midnight of the first day."""
+        return self._start + (monotonic() - self._started) * self.time_scale
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/lala.cgi", self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.stats["requests"] += 1
+        form = await request.json()
+        cost = request_cost(form_registers(form))
+        now = monotonic()
+        self._backlog = max(0.0, self._backlog - (now - self._drained) * self.capacity)
+        self._drained = now
+        backlog = self._backlog / self.capacity
+        if backlog > self.overload:
+            self.stats["overloaded"] += 1
+            raise web.HTTPServiceUnavailable()
+        self._backlog += cost
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter) + backlog
+            await asyncio.sleep(delay)
+            self.stats["busy_seconds"] += delay
+            if self._random.random() < self.error_rate:
+                self.stats["errors"] += 1
+                if self._random.random() < 0.5:
+                    raise web.HTTPInternalServerError()
+                body = json.dumps(respond(form, self.model.registers()))
+                return web.Response(text=body[: len(body) // 2], content_type="application/json")
+            self.model.advance(self.simulated_time())
+            return web.json_response(respond(form, self.model.registers()))
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve in the running event loop and return the lala.cgi URL."""
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://{host}:{port}/lala.cgi"
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Senec lala.cgi simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.05, help="Base latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Random extra latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of failed requests")
+    parser.add_argument("--capacity", type=float, default=500, help="Registers per second")
+    parser.add_argument("--overload", type=float, default=5.0, help="Backlog refused (s)")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Simulated speed")
+    parser.add_argument("--start-hour", type=float, help="Simulated time of day at start")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    simulator = SenecSimulator(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        capacity=args.capacity,
+        overload=args.overload,
+        time_scale=args.time_scale,
+        start_hour=args.start_hour,
+        seed=args.seed,
+    )
+    web.run_app(simulator.app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
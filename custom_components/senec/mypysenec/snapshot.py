@@ -0,0 +1,189 @@
+from array import array
+from math import nan
+from sys import getsizeof
+from types import MappingProxyType
+
+from .bms import bms_analytics
+from .registers import KEY_SLOT, LAYOUT, REGISTERS, slot_values
+
+_NO_OBJECTS = MappingProxyType({})
+_UNSET = array("d", [nan]) * len(LAYOUT)
+
+
+class SenecSnapshot:
+    """Immutable state of all registers in the register table
+
+    Values are stored in an array('d') with one slot per LAYOUT entry, so a snapshot
+    costs 8 bytes per value instead of a tree of dicts, lists and boxed floats.
+    Integers are restored on access, values that are not numbers (e.g. strings)
+    are kept in a small side table and unread slots read as None.
+
+    `merge` builds the next snapshot off to the side, so one reference swap publishes a
+    consistent view to every reader. Each snapshot carries a sequence number, increased by
+    every merge, and the time its values were captured.
+    """
+
+    __slots__ = ("_numbers", "_objects", "_ints", "seq", "timestamp", "_bms")
+
+    def __init__(
+        self,
+        numbers: array = None,
+        objects=_NO_OBJECTS,
+        ints=frozenset(),
+        seq: int = 0,
+        timestamp: float = None,
+    ):
+        object.__setattr__(self, "_numbers", numbers if numbers is not None else array("d", _UNSET))
+        object.__setattr__(self, "_objects", objects)
+        object.__setattr__(self, "_ints", ints)
+        object.__setattr__(self, "seq", seq)
+        object.__setattr__(self, "timestamp", timestamp)
+        object.__setattr__(self, "_bms", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SenecSnapshot is immutable")
+
+    def __getitem__(self, slot: int):
+        number = self._numbers[slot]
+        if number != number:
+            # NaN marks slots holding no number
+            return self._objects.get(slot)
+        if slot in self._ints:
+            return int(number)
+        return number
+
+    def get(self, key: str, default=None):
+        """Value of a register table key without its transform."""
+        value = self[KEY_SLOT[key]]
+        return default if value is None else value
+
+    def merge(self, raw: dict, timestamp: float = None) -> "SenecSnapshot":
+        """New snapshot with the registers of a decoded response replaced
+
+        This snapshot is left untouched.
+        """
+        numbers = array("d", self._numbers)
+        objects = self._objects
+        ints = self._ints
+        for slot, value in slot_values(raw):
+            if value.__class__ is float:
+                numbers[slot] = value
+                if slot in ints:
+                    ints = ints - {slot}
+            elif value.__class__ is int:
+                numbers[slot] = value
+                if slot not in ints:
+                    ints = ints | {slot}
+            else:
+                try:
+                    # also takes bools and numpy scalars
+                    numbers[slot] = value
+                except TypeError:
+                    numbers[slot] = nan
+                    if value is not None:
+                        objects = dict(objects)
+                        objects[slot] = value
+                        continue
+                if slot in ints:
+                    ints = ints - {slot}
+            if slot in objects:
+                objects = dict(objects)
+                del objects[slot]
+        return SenecSnapshot(numbers, objects, ints, self.seq + 1, timestamp)
+
+    def states(self, keys, digits: int = 2, previous: tuple = None) -> dict:
+        """Values of property keys as entity states, in one pass over the slots
+
+        Values are the property values, numbers (and numeric strings) rounded to
+        `digits` as floats. `previous` is the (snapshot, states) of the last call: the
+        states of numbers that did not change since are reused instead of rounded again,
+        which leaves little work for polls that only read a few register tiers.
+
+        A value its transform rejects (e.g. a STAT_STATE code without a name) is kept
+        as read, so one unexpected value does not fail the states of every key.
+        """
+        numbers, objects, ints = self._numbers, self._objects, self._ints
+        if previous is not None:
+            before, known = previous[0]._numbers, previous[1]
+        else:
+            before, known = None, _NO_OBJECTS
+        states = {}
+        for key in keys:
+            slot, transform = _STATE_SOURCES[key]
+            number = numbers[slot]
+            if number == number:
+                if before is not None and before[slot] == number and key in known:
+                    states[key] = known[key]
+                    continue
+                if transform is None:
+                    # Slots hold floats, so integers round the same without restoring them
+                    states[key] = round(number, digits)
+                    continue
+                raw = int(number) if slot in ints else number
+                try:
+                    value = transform(raw)
+                except (KeyError, ValueError):
+                    states[key] = raw
+                    continue
+                if value.__class__ is float or value.__class__ is int:
+                    states[key] = round(float(value), digits)
+                    continue
+            else:
+                value = objects.get(slot)
+                if value is None:
+                    states[key] = None
+                    continue
+                if transform is not None:
+                    try:
+                        value = transform(value)
+                    except (KeyError, ValueError):
+                        states[key] = value
+                        continue
+            try:
+                states[key] = round(float(value), digits)
+            except (TypeError, ValueError):
+                states[key] = value
+        return states
+
+    @property
+    def bms(self):
+        """BmsAnalytics of the cell values, computed on first access (requires numpy)."""
+        if self._bms is None:
+            # A cache, the snapshot's values stay immutable
+            object.__setattr__(self, "_bms", bms_analytics(self))
+        return self._bms
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by this snapshot alone (shared int and object tables excluded)."""
+        size = getsizeof(self) + getsizeof(self._numbers)
+        if self._objects:
+            size += getsizeof(self._objects)
+        return size
+
+
+def _accessor(register) -> property:
+    slot = KEY_SLOT[register.key]
+    transform = register.transform
+    if transform is None:
+
+        def get(self):
+            return self[slot]
+
+    else:
+
+        def get(self):
+            value = self[slot]
+            return None if value is None else transform(value)
+
+    get.__name__ = register.key
+    return property(get, doc=register.doc)
+
+
+for _register in REGISTERS:
+    setattr(SenecSnapshot, _register.key, _accessor(_register))
+
+# Property key -> (slot, transform), for building entity states without the properties
+_STATE_SOURCES = {
+    register.key: (KEY_SLOT[register.key], register.transform) for register in REGISTERS
+}
@@ -0,0 +1,223 @@
+import json
+import zlib
+from array import array
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+from .registers import KEY_SLOT, LAYOUT
+from .ringbuffer import _NUMERIC, _TRANSFORMS, _vector_transforms
+
+
+def _day(timestamp: float) -> date:
+    return datetime.fromtimestamp(timestamp, timezone.utc).date()
+
+
+def _midnight(day: date) -> float:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp()
+
+
+class HistoryStore:
+    """On-disk history of snapshots in per-day columnar float32 files
+
+    Every UTC day gets a file `YYYY-MM-DD-<layout>.f32` of fixed-width float32 records:
+    the seconds since midnight followed by one column per register table slot, and a
+    sidecar `.json` with the (section, register, index) of every column. A changed
+    register table starts new files, so older ones stay readable. Records are appended
+    with plain writes; queries map the day files with numpy.memmap and run vectorized
+    over them one file at a time, without loading the history into memory.
+
+    Columns are addressed by property key (e.g. "bms_cell_volt_B3", transformed like
+    the property), by register name for all elements of an array register (e.g.
+    "CELL_VOLTAGES_MODULE_B") or as "SECTION.REGISTER". Times are epoch seconds.
+    Queries require numpy.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self._file = None
+        self._day = None
+        self._columns = [list(source) for source in LAYOUT]
+        self._layout = "%08x" % zlib.crc32(json.dumps(self._columns).encode())
+
+    def append(self, snapshot):
+        """Append a snapshot as one record to the file of its day."""
+        timestamp = snapshot.timestamp
+        if timestamp is None:
+            return
+        day = _day(timestamp)
+        if day != self._day:
+            self._open(day)
+        record = array("f", [timestamp - _midnight(day)])
+        record.fromlist(snapshot._numbers.tolist())
+        self._file.write(record.tobytes())
+        self._file.flush()
+
+    def _open(self, day: date):
+        self.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        data = self.directory / f"{day}-{self._layout}.f32"
+        index = data.with_suffix(".json")
+        if not index.exists():
+            index.write_text(json.dumps({"date": str(day), "columns": self._columns}))
+        record = 4 * (1 + len(self._columns))
+        self._file = open(data, "ab")
+        # Drop a record left incomplete by a crash, so records stay aligned
+        size = self._file.tell()
+        if size % record:
+            self._file.truncate(size - size % record)
+        self._day = day
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._day = None
+
+    def days(self, start: float = None, end: float = None):
+        """(day, data file, column list) of the stored files overlapping [start, end)."""
+        first = _day(start) if start is not None else None
+        last = _day(end) if end is not None else None
+        for index in sorted(self.directory.glob("*.json")):
+            meta = json.loads(index.read_text())
+            day = date.fromisoformat(meta["date"])
+            if (first is not None and day < first) or (last is not None and day > last):
+                continue
+            yield day, index.with_suffix(".f32"), [tuple(column) for column in meta["columns"]]
+
+    def _select(self, name: str, columns: list):
+        """Column indices (1 based, 0 is the time) and transform for a name."""
+        if name in KEY_SLOT:
+            transform = _TRANSFORMS[name]
+            if transform not in _NUMERIC:
+                raise ValueError(f"{name} is not numeric")
+            source = LAYOUT[KEY_SLOT[name]]
+            matches = [i for i, column in enumerate(columns) if column == source]
+            return matches, transform, False
+        section, _, register = name.rpartition(".")
+        matches = sorted(
+            (column[2] or 0, i)
+            for i, column in enumerate(columns)
+            if column[1] == register and (not section or column[0] == section)
+        )
+        if len({columns[i][0] for _, i in matches}) > 1:
+            raise ValueError(f"{register} is ambiguous, use SECTION.{register}")
+        return [i for _, i in matches], None, True
+
+    def _load(self, numpy, names: list, start: float, end: float):
+        """Yield (times, values) per file, one values array per name
+
+        Values of a register have one column per element. Files without one of the
+        names are skipped.
+        """
+        for name in names:
+            section, _, register = name.rpartition(".")
+            if name not in KEY_SLOT and not any(
+                column[1] == register and (not section or column[0] == section) for column in LAYOUT
+            ):
+                raise KeyError(name)
+        transforms = _vector_transforms(numpy)
+        for day, path, columns in self.days(start, end):
+            if not path.exists() or not path.stat().st_size:
+                continue
+            sources = [self._select(name, columns) for name in names]
+            if not all(selected for selected, _, _ in sources):
+                continue
+            width = 1 + len(columns)
+            data = numpy.memmap(path, dtype=numpy.float32, mode="r")
+            records = data[: len(data) // width * width].reshape(-1, width)
+            times = records[:, 0].astype(numpy.float64) + _midnight(day)
+            mask = numpy.ones(len(times), dtype=bool)
+            if start is not None:
+                mask &= times >= start
+            if end is not None:
+                mask &= times < end
+            # Only the selected columns are read from the mapped file, in one pass
+            indices = [1 + i for selected, _, _ in sources for i in selected]
+            selection = records[:, indices]
+            if not mask.all():
+                times, selection = times[mask], selection[mask]
+            selection = selection.astype(numpy.float64)
+            values = []
+            first = 0
+            for selected, transform, is_register in sources:
+                part = selection[:, first : first + len(selected)]
+                first += len(selected)
+                if transform is not None:
+                    part = transforms[transform](part)
+                values.append(part if is_register else part[:, 0])
+            yield times, values
+
+    def chunks(self, names: list, start: float = None, end: float = None):
+        """Yield (times, values) per day file in [start, end), one values array per name
+
+        Like query() for several columns or registers at once, reading each file once
+        and without concatenating the range, for analyses that reduce it day by day.
+        """
+        return self._load(_numpy(), names, start, end)
+
+    def query(self, name: str, start: float = None, end: float = None):
+        """(times, values) of a column or register in [start, end)
+
+        Values are one dimensional for a property key and (records, elements) for a
+        register name.
+        """
+        numpy = _numpy()
+        parts = list(self._load(numpy, [name], start, end))
+        if not parts:
+            return numpy.empty(0), numpy.empty(0)
+        times = numpy.concatenate([times for times, _ in parts])
+        values = numpy.concatenate([values for _, (values,) in parts])
+        if len(parts) > 1:
+            # Files of one day with different register tables
+            order = numpy.argsort(times, kind="stable")
+            times, values = times[order], values[order]
+        return times, values
+
+    def downsample(self, name: str, bucket: float = 3600, how: str = "mean", start=None, end=None):
+        """(bucket start times, aggregated values) per `bucket` seconds in [start, end)
+
+        `how` is one of mean, min, max, count. NaN values are ignored and buckets
+        without values are left out. Buckets are aligned to the epoch, so hourly and
+        daily buckets start at UTC hours and days.
+        """
+        numpy = _numpy()
+        if how not in ("mean", "min", "max", "count"):
+            raise ValueError(f"Unknown aggregate: {how}")
+        keys, sums, counts, mins, maxs = [], [], [], [], []
+        for times, (values,) in self._load(numpy, [name], start, end):
+            if not len(times):
+                continue
+            # Records of a day are in time order, so buckets are contiguous runs
+            bucket_keys = numpy.floor(times / bucket)
+            starts = numpy.flatnonzero(numpy.r_[True, bucket_keys[1:] != bucket_keys[:-1]])
+            valid = ~numpy.isnan(values)
+            keys.append(bucket_keys[starts])
+            sums.append(numpy.add.reduceat(numpy.where(valid, values, 0), starts))
+            counts.append(numpy.add.reduceat(valid, starts))
+            mins.append(numpy.fmin.reduceat(values, starts))
+            maxs.append(numpy.fmax.reduceat(values, starts))
+        if not keys:
+            return numpy.empty(0), numpy.empty(0)
+        # Merge buckets spanning several days
+        unique, inverse = numpy.unique(numpy.concatenate(keys), return_inverse=True)
+        shape = (len(unique),) + sums[0].shape[1:]
+        total = numpy.zeros(shape)
+        count = numpy.zeros(shape)
+        low = numpy.full(shape, numpy.nan)
+        high = numpy.full(shape, numpy.nan)
+        numpy.add.at(total, inverse, numpy.concatenate(sums))
+        numpy.add.at(count, inverse, numpy.concatenate(counts))
+        numpy.fmin.at(low, inverse, numpy.concatenate(mins))
+        numpy.fmax.at(high, inverse, numpy.concatenate(maxs))
+        with numpy.errstate(invalid="ignore", divide="ignore"):
+            result = {"mean": total / count, "min": low, "max": high, "count": count}[how]
+        keep = count.reshape(len(unique), -1).any(axis=1)
+        return unique[keep] * bucket, result[keep]
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("numpy is required for history queries") from None
+    return numpy
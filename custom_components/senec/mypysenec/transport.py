@@ -0,0 +1,167 @@
+import socket
+import ssl
+from collections import Counter
+from time import monotonic
+
+import aiohttp
+from aiohttp.abc import AbstractResolver
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+class SessionTransport:
+    """Posts lala.cgi requests through a session owned by the caller."""
+
+    def __init__(self, url: str, websession: aiohttp.ClientSession):
+        self.url = url
+        self.websession = websession
+
+    async def request(self, body: bytes) -> dict:
+        """POST a serialized form and return the undecoded JSON response."""
+        async with self.websession.post(self.url, data=body, headers=JSON_HEADERS) as res:
+            res.raise_for_status()
+            return await res.json()
+
+    async def close(self):
+        """The session belongs to the caller, so there is nothing to close."""
+
+
+class FallbackResolver(AbstractResolver):
+    """Resolver answering with the last good result when a lookup fails
+
+    The Senec box is usually found by its host name ("Senec") through the local router,
+    which makes a transient DNS failure a failed poll although the device is fine.
+    """
+
+    def __init__(self, resolver: AbstractResolver = None, stats: Counter = None):
+        self._resolver = resolver or aiohttp.ThreadedResolver()
+        self._known = {}
+        self.stats = Counter() if stats is None else stats
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        key = (host, port, family)
+        try:
+            hosts = await self._resolver.resolve(host, port, family)
+        except OSError:
+            if key not in self._known:
+                raise
+            self.stats["dns_fallbacks"] += 1
+            return self._known[key]
+        self._known[key] = hosts
+        return hosts
+
+    async def close(self):
+        await self._resolver.close()
+
+
+def device_ssl_context() -> ssl.SSLContext:
+    """SSL context for the self signed certificate of the Senec web interface."""
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+class SenecTransport:
+    """Transport owning one persistent keep-alive connection to a Senec device
+
+    DNS results are cached by the connector for `dns_ttl` seconds and kept as a fallback
+    beyond that, a single SSL context is reused for every handshake and at most one
+    connection is opened, so polls reuse it instead of connecting again.
+
+    `timings` holds the phases of the last request in seconds: dns, connect (TCP and
+    TLS handshake, 0 when the connection was reused) and request. `stats` sums them up
+    and counts requests, new and reused connections and DNS fallbacks.
+
+    Use it as an async context manager, or call `close` when done.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        ssl_context: ssl.SSLContext = None,
+        timeout: float = 20,
+        keepalive: float = 120,
+        dns_ttl: float = 300,
+        url: str = None,
+    ):
+        self.url = url or f"https://{host}/lala.cgi"
+        self.ssl_context = ssl_context or device_ssl_context()
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._keepalive = keepalive
+        self._dns_ttl = dns_ttl
+        self._session = None
+        self.stats = Counter()
+        self.timings = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=1,
+            keepalive_timeout=self._keepalive,
+            use_dns_cache=True,
+            ttl_dns_cache=self._dns_ttl,
+            resolver=FallbackResolver(stats=self.stats),
+            ssl=self.ssl_context,
+        )
+        trace = aiohttp.TraceConfig()
+        trace.on_dns_resolvehost_start.append(_phase_start("dns"))
+        trace.on_dns_resolvehost_end.append(_phase_end("dns"))
+        trace.on_connection_create_start.append(_phase_start("connect"))
+        trace.on_connection_create_end.append(_phase_end("connect"))
+        trace.on_connection_reuseconn.append(self._on_connection_reused)
+        return aiohttp.ClientSession(
+            connector=connector, timeout=self._timeout, trace_configs=[trace]
+        )
+
+    async def request(self, body: bytes) -> dict:
+        """POST a serialized form and return the undecoded JSON response."""
+        if self._session is None:
+            self._session = self._create_session()
+        phases = {"dns": 0.0, "connect": 0.0}
+        start = monotonic()
+        async with self._session.post(
+            self.url, data=body, headers=JSON_HEADERS, trace_request_ctx=phases
+        ) as res:
+            res.raise_for_status()
+            payload = await res.json()
+        phases.pop("started", None)
+        phases["request"] = monotonic() - start - phases["dns"] - phases["connect"]
+        self.timings = phases
+        self.stats["requests"] += 1
+        self.stats["connections"] += phases["connect"] > 0
+        for phase, seconds in phases.items():
+            self.stats[f"{phase}_seconds"] += seconds
+        return payload
+
+    async def close(self):
+        """Close the connection, a later request opens a new one."""
+        if self._session is not None:
+            session, self._session = self._session, None
+            await session.close()
+
+    async def _on_connection_reused(self, session, context, params):
+        self.stats["reused"] += 1
+
+
+def _phase_start(phase: str):
+    async def record(session, context, params):
+        context.trace_request_ctx.setdefault("started", {})[phase] = monotonic()
+
+    return record
+
+
+def _phase_end(phase: str):
+    async def record(session, context, params):
+        phases = context.trace_request_ctx
+        phases[phase] = monotonic() - phases["started"][phase]
+        if phase == "connect":
+            # Name resolution happens while the connection is created
+            phases[phase] -= phases["dns"]
+
+    return record
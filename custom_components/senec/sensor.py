@@ -5,10 +5,13 @@ import homeassistant.helpers.config_validation as cv
 from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
 from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.typing import HomeAssistantType
 
 from . import SenecDataUpdateCoordinator, SenecEntity
-from .const import DOMAIN, SENSOR_TYPES
+from .const import CELL_ARRAY_TYPES, CELL_ARRAYS, DOMAIN, SCAN_INTERVAL_SENSOR, SENSOR_TYPES
+from .mypysenec.bms import cell_array_summary
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -16,10 +19,26 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_entry(hass: HomeAssistantType, config_entry: ConfigEntry, async_add_entities):
     """Initialize sensor platform from config entry."""
     coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    cells = {cell for keys in CELL_ARRAYS.values() for cell in keys}
     entities = []
     for description in SENSOR_TYPES:
+        if coordinator.cell_arrays and description.key in cells:
+            continue
         entity = SenecSensor(coordinator, description)
         entities.append(entity)
+    if coordinator.cell_arrays:
+        for description in CELL_ARRAY_TYPES:
+            entities.append(SenecCellArraySensor(coordinator, description))
+    entities.append(SenecScanIntervalSensor(coordinator, SCAN_INTERVAL_SENSOR))
+
+    # Drop the registry entries of the cell sensors of the other mode
+    registry = er.async_get(hass)
+    for key in cells if coordinator.cell_arrays else CELL_ARRAYS:
+        entity_id = registry.async_get_entity_id(
+            SENSOR_DOMAIN, DOMAIN, f"{config_entry.title}_{key}"
+        )
+        if entity_id is not None:
+            registry.async_remove(entity_id)
 
     async_add_entities(entities)
 
@@ -40,3 +59,78 @@ class SenecSensor(SenecEntity, SensorEntity):
         name = self.entity_description.name
         self.entity_id = f"sensor.{title}_{key}"
         self._attr_name = f"{title} {name}"
+
+
+class SenecScanIntervalSensor(SenecSensor):
+    """Sensor for the scan interval currently used by the coordinator."""
+
+    @property
+    def state(self):
+        """Return the effective scan interval in seconds."""
+        # The update interval rounded to the clock by the tick schedule
+        interval = self.coordinator.ticks.interval
+        if interval is None:
+            return self.coordinator.update_interval.total_seconds()
+        return interval
+
+    @property
+    def extra_state_attributes(self):
+        """Return the scheduling and state write metrics."""
+        stats = self.coordinator.senec.stats
+        ticks = stats["ticks"]
+        return {
+            "jitter": self.coordinator.ticks.jitter,
+            "mean_jitter": stats["jitter_seconds"] / ticks if ticks else None,
+            "missed_ticks": stats["missed_ticks"],
+            "writes": stats["writes"],
+            "writes_suppressed": stats["writes_suppressed"],
+        }
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Write the metrics of every refresh."""
+        self.async_write_ha_state()
+
+
+class SenecCellArraySensor(SenecSensor):
+    """Sensor for the cells of one battery module, the cell values are attributes.
+
+    The state is the spread (max - min) of the cell voltages, or the highest cell
+    temperature.
+    """
+
+    def __init__(
+        self,
+        coordinator: SenecDataUpdateCoordinator,
+        description: SensorEntityDescription,
+    ):
+        """Initialize a battery module sensor."""
+        super().__init__(coordinator=coordinator, description=description)
+        self._cells = CELL_ARRAYS[self._key]
+        self._spread = self._key.startswith("bms_cell_volt_")
+
+    @property
+    def state(self):
+        """Return the voltage spread or highest temperature of the cells."""
+        summary = cell_array_summary(self.coordinator.states, self._key)
+        if summary is None:
+            return None
+        return summary.spread if self._spread else summary.max
+
+    @property
+    def extra_state_attributes(self):
+        """Return the summary and the value of every cell."""
+        states = self.coordinator.states
+        cells = [states.get(cell) for cell in self._cells]
+        summary = cell_array_summary(states, self._key)
+        if summary is None:
+            return {"cells": cells}
+        return {**summary._asdict(), "cells": cells}
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Write the state if one of the cells changed or availability changed."""
+        available = self.available
+        if not self.coordinator.changed.isdisjoint(self._cells) or available != self._available:
+            self._available = available
+            self.async_write_ha_state()
@@ -0,0 +1,45 @@
+"""Test the senec capture aggregation."""
+from custom_components.senec.mypysenec.aggregate import aggregate, aggregate_file, empty, merge
+from custom_components.senec.mypysenec.capture import CaptureWriter
+from custom_components.senec.mypysenec.simulator import DayModel, respond
+
+MIDNIGHT = 1704067200.0  # 2024-01-01 00:00 UTC
+
+
+def write_capture(path, model, start, end, step=600):
+    """Capture every section of the model from `start` to `end` seconds after midnight."""
+    writer = CaptureWriter(path)
+    for t in range(start, end, step):
+        model.advance(t)
+        registers = model.registers()
+        writer.write(respond({section: {} for section in registers}, registers), MIDNIGHT + t)
+    writer.close()
+
+
+def test_aggregate_files(tmp_path):
+    """Test per-file partial aggregates reduce to the balance of the whole capture."""
+    model = DayModel(seed=3)
+    model.advance(0)
+    totals = dict(model.totals)
+    write_capture(tmp_path / "first", model, 0, 86400 + 43200)
+    write_capture(tmp_path / "second", model, 86400 + 43200, 2 * 86400 + 600)
+
+    result = aggregate([tmp_path / "first", tmp_path / "second"], workers=1)
+    assert result["files"] == 2
+    assert result["records"] == 2 * 144 + 1
+    assert list(result["days"]) == ["2024-01-01", "2024-01-02", "2024-01-03"]
+    solar = sum(day["solar_generated"] for day in result["days"].values())
+    assert abs(solar - (model.totals["LIVE_PV_GEN"] - totals["LIVE_PV_GEN"])) < 0.01
+    assert result["days"]["2024-01-01"]["house_consumption"] > 0
+
+    voltage = result["cells"]["voltage"]["A"]
+    assert len(voltage["min"]) == 14
+    assert all(low <= high for low, high in zip(voltage["min"], voltage["max"]))
+    assert result["soh"]["daily"]["B"]["2024-01-02"] == 99
+    assert result["soh"]["trend"]["B"] == 0
+
+    # The reduction does not depend on how files are grouped or ordered
+    first = aggregate_file(tmp_path / "first")
+    second = aggregate_file(tmp_path / "second")
+    assert merge(first, second) == merge(second, merge(empty(), first))
+    assert aggregate([tmp_path / "second", tmp_path / "first"], workers=2) == result
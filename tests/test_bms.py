@@ -0,0 +1,54 @@
+"""Test the senec BMS cell analytics."""
+import pytest
+
+from custom_components.senec.mypysenec.snapshot import SenecSnapshot
+
+pytest.importorskip("numpy")
+
+
+def cells():
+    voltages = {module: [3300.0 + index for index in range(14)] for module in ("A", "B", "C", "D")}
+    voltages["B"][6] = 3250.0
+    temperatures = {module: [20.0 + 0.5 * index for index in range(6)] for module in "ABCD"}
+    registers = {f"CELL_VOLTAGES_MODULE_{module}": values for module, values in voltages.items()}
+    registers.update(
+        {f"CELL_TEMPERATURES_MODULE_{module}": values for module, values in temperatures.items()}
+    )
+    # A system with three modules
+    registers["CELL_VOLTAGES_MODULE_D"] = "VARIABLE_NOT_FOUND"
+    return {"BMS": registers}
+
+
+def test_bms_analytics():
+    """Test module and pack summaries, weakest cells, outliers and gradients."""
+    snapshot = SenecSnapshot().merge(cells())
+    bms = snapshot.bms
+
+    assert bms.voltage[0] == (3300.0, 3313.0, 3306.5, 13.0)
+    assert bms.voltage[3] is None
+    assert bms.pack_voltage.min == 3250.0
+    assert bms.pack_voltage.spread == 63.0
+    assert bms.weakest == (("A", 1), ("B", 7), ("C", 1), None)
+    assert bms.pack_weakest == ("B", 7)
+    assert bms.outliers == (("B", 7, -56.0),)
+    assert bms.temperature[2].max == 22.5
+    assert bms.temperature_gradient == pytest.approx((0.5, 0.5, 0.5, 0.5))
+    # Computed once per snapshot
+    assert snapshot.bms is bms
+    assert SenecSnapshot().bms.pack_voltage is None
+
+
+def test_bms_analytics_missing_module():
+    """Test a module reading 0 mV is not installed and left out of the pack."""
+    raw = cells()
+    raw["BMS"]["CELL_VOLTAGES_MODULE_D"] = [0.0] * 14
+    raw["BMS"]["CELL_TEMPERATURES_MODULE_D"] = [0.0] * 6
+    bms = SenecSnapshot().merge(raw).bms
+
+    assert bms.voltage[3] is None
+    assert bms.temperature[3] is None
+    assert bms.weakest[3] is None
+    assert bms.temperature_gradient[3] is None
+    assert bms.pack_voltage == (3250.0, 3313.0, pytest.approx(3305.17, abs=0.01), 63.0)
+    assert bms.pack_weakest == ("B", 7)
+    assert bms.pack_temperature.min == 20.0
@@ -0,0 +1,83 @@
+"""Test the senec burst sampling."""
+from custom_components.senec.mypysenec import Senec
+from custom_components.senec.mypysenec.burst import BurstSampler
+from custom_components.senec.mypysenec.limiter import RateLimiter
+from custom_components.senec.mypysenec.simulator import encode
+from custom_components.senec.mypysenec.snapshot import SenecSnapshot
+
+
+class Clock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def power(house, grid=0.0):
+    return SenecSnapshot().merge({"ENERGY": {"GUI_HOUSE_POW": house, "GUI_GRID_POW": grid}})
+
+
+def test_burst_window():
+    """Test a jump starts a bounded burst that is extended and then falls back."""
+    clock = Clock()
+    sampler = BurstSampler(duration=10, max_duration=25, cooldown=30, clock=clock)
+    assert sampler.observe(power(300)) == 10
+    clock.now = 10
+    assert sampler.observe(power(2500)) == 2
+    assert sampler.bursting
+    for _ in range(10):
+        clock.now += 2
+        # Every jump extends the burst, but not beyond max_duration
+        sampler.observe(power(300 if clock.now % 4 else 2500))
+    assert clock.now == 30
+    clock.now = 35
+    assert sampler.observe(power(300)) == 10
+    assert not sampler.bursting
+    # Within the cooldown a jump does not start another burst
+    clock.now = 45
+    assert sampler.observe(power(2500)) == 10
+    assert sampler.stats["bursts"] == 1
+    assert sampler.stats["bursts_skipped"] == 1
+
+
+def test_no_burst_while_throttled():
+    """Test no burst starts while the rate limiter has slowed down."""
+    sampler = BurstSampler(clock=Clock())
+    sampler.observe(power(300))
+    assert sampler.observe(power(3000), scale=0.5) == 10
+    assert sampler.stats["bursts_skipped"] == 1
+
+
+class Transport:
+    """Transport answering with a series of house power values."""
+
+    def __init__(self, values):
+        self.values = iter(values)
+        self.bodies = []
+
+    async def request(self, body):
+        self.bodies.append(body)
+        house = encode(next(self.values), "fl")
+        return {"ENERGY": {"GUI_HOUSE_POW": house, "GUI_GRID_POW": encode(0.0, "fl")}}
+
+    async def close(self):
+        pass
+
+
+async def test_watch():
+    """Test watch only requests the watched registers, at the sampler's interval."""
+    transport = Transport([300.0, 300.0, 2800.0, 2800.0])
+    senec = Senec("senec", transport=transport, limiter=RateLimiter(60000, 10000000))
+    sampler = BurstSampler(interval=0.05, burst_interval=0.01, stats=senec.stats)
+    houses = []
+    async for snapshot in senec.watch(sampler):
+        houses.append(snapshot.house_power)
+        if len(houses) == 4:
+            break
+    assert houses == [300.0, 300.0, 2800.0, 2800.0]
+    assert transport.bodies[0] == b'{"ENERGY": {"GUI_HOUSE_POW": "", "GUI_GRID_POW": ""}}'
+    assert senec.stats["bursts"] == 1
+    assert senec.stats["requests"] == 4
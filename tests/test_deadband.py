@@ -0,0 +1,39 @@
+"""Test the senec state write filter."""
+from custom_components.senec.mypysenec.deadband import StateFilter
+
+
+def test_unchanged_states_suppressed():
+    """Test only changed states are written, and all again after the heartbeat."""
+    states = StateFilter(heartbeat=300)
+    assert states.changed({"bms_fw_A": 775, "system_state": "LADEN"}, 0) == {
+        "bms_fw_A",
+        "system_state",
+    }
+    assert states.changed({"bms_fw_A": 775, "system_state": "ENTLADEN"}, 10) == {"system_state"}
+    assert states.changed({"bms_fw_A": 775, "system_state": "ENTLADEN"}, 20) == set()
+    assert states.changed({"bms_fw_A": 775, "system_state": "ENTLADEN"}, 305) == {"bms_fw_A"}
+    assert states.stats["writes"] == 4
+    assert states.stats["writes_suppressed"] == 4
+
+
+def test_counted_keys():
+    """Test only the counted keys add to the write statistics."""
+    states = StateFilter(heartbeat=300, counted=frozenset(["house_power"]))
+    states.changed({"house_power": 300.0, "bms_cell_volt_A1": 3300.0}, 0)
+    states.changed({"house_power": 300.0, "bms_cell_volt_A1": 3300.0}, 5)
+    assert states.stats["writes"] == 1
+    assert states.stats["writes_suppressed"] == 1
+
+
+def test_deadbands():
+    """Test absolute and relative deadbands against the last written value."""
+    deadbands = {"house_power": (10, 0), "bms_cell_volt_A1": (0, 0.001)}
+    states = StateFilter(deadbands, heartbeat=300)
+    states.changed({"house_power": 300.0, "bms_cell_volt_A1": 3300.0}, 0)
+    assert states.changed({"house_power": 306.0, "bms_cell_volt_A1": 3302.0}, 5) == set()
+    # Small steps add up against the last written value
+    assert states.changed({"house_power": 312.0, "bms_cell_volt_A1": 3304.0}, 10) == {
+        "house_power",
+        "bms_cell_volt_A1",
+    }
+    assert states.changed({"house_power": None, "bms_cell_volt_A1": 3304.0}, 15) == {"house_power"}
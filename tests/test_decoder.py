@@ -0,0 +1,72 @@
+"""Test the senec response decoder."""
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+from custom_components.senec.mypysenec.decoder import Decoder
+from custom_components.senec.mypysenec.util import parse
+
+PAYLOADS = sorted((Path(__file__).parent.parent / "benchmarks" / "payloads").glob("*.json"))
+
+
+@pytest.mark.parametrize("path", PAYLOADS, ids=lambda path: path.stem)
+def test_decode_matches_parse(path):
+    """Test the compiled decoder returns the same values as util.parse."""
+    raw = json.loads(path.read_text())
+    untouched = copy.deepcopy(raw)
+    decoder = Decoder()
+
+    assert decoder.decode(raw) == parse(copy.deepcopy(raw))
+    # Second pass runs on the compiled conversions
+    assert decoder.decode(raw) == parse(copy.deepcopy(raw))
+    assert raw == untouched
+
+
+def test_decode_type_change():
+    """Test a register is recompiled when the device reports another type."""
+    decoder = Decoder()
+
+    assert decoder.decode({"ENERGY": {"STAT_STATE": "u8_0E"}}) == {"ENERGY": {"STAT_STATE": 14}}
+    assert decoder.decode({"ENERGY": {"STAT_STATE": "fl_41600000"}}) == {
+        "ENERGY": {"STAT_STATE": 14.0}
+    }
+    assert decoder.decode({"ENERGY": {"STAT_STATE": "VARIABLE_NOT_FOUND"}}) == {
+        "ENERGY": {"STAT_STATE": "VARIABLE_NOT_FOUND"}
+    }
+    assert decoder.decode({"BMS": {"SOC": ["u8_01", "fl_41600000"]}}) == {"BMS": {"SOC": [1, 14.0]}}
+
+
+def test_decode_malformed_floats():
+    """Test malformed elements of float arrays decode like util.parse or raise like it."""
+    decoder = Decoder()
+    raw = {"BMS": {"SOC": ["fl_43960000", "fl_12fl_456"]}}
+    assert decoder.decode(raw) == parse(copy.deepcopy(raw))
+    raw = {"BMS": {"SOC": ["fl_43960000", "43960000fl_"]}}
+    assert decoder.decode(raw) == parse(copy.deepcopy(raw))
+    raw = {"BMS": {"SOC": ["fl_4396000", "0fl_43960000"]}}
+    with pytest.raises(ValueError):
+        parse(copy.deepcopy(raw))
+    with pytest.raises(ValueError):
+        decoder.decode(raw)
+
+
+def test_decode_empty_list_recompiled():
+    """Test a register first seen as empty list is compiled for its later values."""
+    decoder = Decoder()
+    assert decoder.decode({"BMS": {"SOC": []}}) == {"BMS": {"SOC": []}}
+    assert decoder.decode({"BMS": {"SOC": ["fl_43960000"]}}) == {"BMS": {"SOC": [300.0]}}
+    assert decoder._sections["BMS"]["SOC"] is decoder._float_list
+
+
+def test_decode_float_arrays_numpy():
+    """Test float arrays decode to numpy float32 arrays with the numpy backend."""
+    numpy = pytest.importorskip("numpy")
+    decoder = Decoder(float_arrays="numpy")
+
+    decoded = decoder.decode({"PM1OBJ1": {"U_AC": ["fl_43680000", "fl_43690000", "fl_436A0000"]}})
+
+    values = decoded["PM1OBJ1"]["U_AC"]
+    assert values.dtype == numpy.float32
+    assert values.tolist() == [232.0, 233.0, 234.0]
@@ -0,0 +1,61 @@
+"""Test the senec cell drift analysis."""
+import pytest
+
+from custom_components.senec.mypysenec.drift import cell_drift
+from custom_components.senec.mypysenec.snapshot import SenecSnapshot
+from custom_components.senec.mypysenec.store import HistoryStore
+
+MIDNIGHT = 1709251200.0  # 2024-03-01 00:00 UTC
+
+
+def test_cell_drift(tmp_path):
+    """Test z-scores, drift, charge end spread and SOH trend of a drifting cell."""
+    pytest.importorskip("numpy")
+    store = HistoryStore(tmp_path)
+    snapshot = SenecSnapshot()
+    # Every 30 minutes for 10 days: cell B7 sinks by 2 mV per day, the pack charges to
+    # 100 % in the first hour of each day, SOH declines by 0.01 % per day
+    for index in range(480):
+        days = index / 48
+        cells = [3300.0] * 14
+        response = {
+            "ENERGY": {"GUI_BAT_DATA_FUEL_CHARGE": 100.0 if index % 48 < 2 else 50.0},
+            "BMS": {
+                "CELL_VOLTAGES_MODULE_A": cells,
+                "CELL_VOLTAGES_MODULE_B": cells[:6] + [3300.0 - 2 * days] + cells[7:],
+                "CELL_VOLTAGES_MODULE_C": cells,
+                "CELL_VOLTAGES_MODULE_D": [0.0] * 14,
+                "SOH": [100.0 - 0.01 * days] * 3 + [0.0],
+            },
+        }
+        snapshot = snapshot.merge(response, MIDNIGHT + 1800 * index)
+        store.append(snapshot)
+    store.close()
+
+    report = cell_drift(store, z_limit=3, drift_limit=5)
+
+    assert report["records"] == 480
+    # One cell off a pack of 42 equal cells is sqrt(41) standard deviations away
+    assert report["cells"]["B"]["z"][6] == pytest.approx(-(41**0.5), abs=0.01)
+    assert report["cells"]["A"]["z"][0] == pytest.approx(41**-0.5, abs=0.01)
+    assert report["cells"]["D"]["z"] == [None] * 14
+    assert report["cells"]["B"]["drift"][6] == pytest.approx(-60 * 41 / 42, abs=0.01)
+    assert [(cell["module"], cell["cell"]) for cell in report["flagged"]] == [("B", 7)]
+
+    charge_end = report["charge_end"]
+    assert charge_end["records"] == 20
+    assert len(charge_end["daily"]) == 10
+    assert charge_end["trend"] == pytest.approx(60, abs=0.01)
+    assert charge_end["deviation"]["B"][6] < -10
+
+    assert report["soh"]["trend"]["A"] == pytest.approx(-3.65, abs=0.01)
+    assert report["soh"]["daily"]["A"]["2024-03-01"] == pytest.approx(99.995, abs=0.006)
+    assert report["soh"]["trend"]["D"] == 0
+
+
+def test_cell_drift_empty(tmp_path):
+    """Test the report of a store without records."""
+    pytest.importorskip("numpy")
+    report = cell_drift(HistoryStore(tmp_path))
+    assert report["records"] == 0
+    assert report["flagged"] == []
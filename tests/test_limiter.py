@@ -0,0 +1,92 @@
+"""Test the senec rate limiter."""
+import asyncio
+
+import pytest
+
+from custom_components.senec.mypysenec.limiter import RateLimiter, Throttled
+
+
+class Clock:
+    """Fake monotonic clock advanced by the limiter's sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleep = asyncio.sleep
+
+    def __call__(self):
+        return self.now
+
+    async def advance(self, seconds):
+        self.now += seconds
+        await self.sleep(0)
+
+
+async def test_token_buckets(monkeypatch):
+    """Test requests and registers are held to their budgets."""
+    clock = Clock()
+    monkeypatch.setattr(asyncio, "sleep", clock.advance)
+    limiter = RateLimiter(requests_per_minute=6, registers_per_minute=60, burst=20, clock=clock)
+
+    # Buckets start full with 2 requests, the request bucket refills every 10 seconds
+    await limiter.acquire(1)
+    await limiter.acquire(1)
+    assert clock.now == 0
+    await limiter.acquire(1)
+    assert clock.now == 10
+    assert limiter.stats["throttled"] == 1
+
+    limiter = RateLimiter(requests_per_minute=60, registers_per_minute=60, burst=20, clock=clock)
+
+    # 20 registers, refilled at one per second
+    await limiter.acquire(15)
+    await limiter.acquire(10)
+    assert clock.now == 15
+    assert limiter.stats["throttle_seconds"] == 5
+
+
+def test_latency_adaptation():
+    """Test rates are halved on slow or failed requests and doubled on fast ones."""
+    limiter = RateLimiter(requests_per_minute=20, latency_target=1.0, min_scale=0.25)
+
+    limiter.record(0.5)
+    assert limiter.rates == (20, 1000)
+
+    limiter.record(3.0)
+    limiter.record(None)
+    limiter.record(None)
+    assert limiter.scale == 0.25
+    assert limiter.stats["slowdowns"] == 2
+
+    for _ in range(10):
+        limiter.record(0.1)
+    assert limiter.scale == 1.0
+    assert limiter.stats["recoveries"] == 2
+
+
+async def test_outage_recovery(monkeypatch):
+    """Test requests over max_wait are refused after an outage and the rates recover."""
+    clock = Clock()
+    monkeypatch.setattr(asyncio, "sleep", clock.advance)
+    limiter = RateLimiter(requests_per_minute=20, max_wait=10, clock=clock)
+    await limiter.acquire(50)
+    for _ in range(5):
+        limiter.record(None)
+    assert limiter.scale == 0.1
+    assert limiter.rates[0] == 2
+
+    # At 2 requests per minute a request would wait 30 s once the last token is used,
+    # it is refused without waiting and without taking tokens
+    await limiter.acquire(50)
+    for _ in range(2):
+        with pytest.raises(Throttled):
+            await limiter.acquire(50)
+    assert clock.now == 0
+    assert limiter.stats["rejected"] == 2
+    await clock.advance(30)
+    await limiter.acquire(50)
+    assert clock.now == 30
+
+    # The device answers quickly again: full rates after 4 responses
+    for expected in (0.2, 0.4, 0.8, 1.0):
+        limiter.record(0.5)
+        assert limiter.scale == expected
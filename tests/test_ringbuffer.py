@@ -0,0 +1,44 @@
+"""Test the senec snapshot ring buffer."""
+import pytest
+
+from custom_components.senec.mypysenec.ringbuffer import RingBuffer
+from custom_components.senec.mypysenec.snapshot import SenecSnapshot
+
+
+def fill(buffer, grid_powers):
+    """Append one snapshot per grid power, 10 seconds apart."""
+    snapshot = SenecSnapshot()
+    for index, power in enumerate(grid_powers):
+        snapshot = snapshot.merge({"ENERGY": {"GUI_GRID_POW": power}}, 1000.0 + 10 * index)
+        buffer.append(snapshot)
+
+
+@pytest.mark.parametrize("backend", ["array", "numpy"])
+def test_window_aggregates(backend):
+    """Test windowed aggregates over the newest samples after wrapping around."""
+    if backend == "numpy":
+        pytest.importorskip("numpy")
+    buffer = RingBuffer(capacity=4, backend=backend)
+    fill(buffer, [900.0, 100.0, -200.0, 300.0, -400.0, 500.0])
+
+    assert len(buffer) == 4
+    assert buffer.mean("grid_state_power") == 50.0
+    assert buffer.min("grid_state_power") == -400.0
+    assert buffer.max("grid_state_power", count=2) == 500.0
+    assert buffer.mean("grid_imported_power", seconds=20) == pytest.approx(800 / 3)
+    assert buffer.std("grid_state_power", count=2) == 450.0
+    assert buffer.rate("grid_state_power", seconds=10) == 90.0
+    assert buffer.mean("house_power") is None
+    with pytest.raises(ValueError):
+        buffer.mean("system_state")
+
+
+def test_append_without_timestamp():
+    """Test snapshots without a timestamp are rejected instead of breaking the windows."""
+    buffer = RingBuffer(capacity=4, backend="array")
+    snapshot = SenecSnapshot().merge({"ENERGY": {"GUI_GRID_POW": 100.0}}, 1000.0)
+    buffer.append(snapshot)
+    with pytest.raises(ValueError):
+        buffer.append(snapshot.merge({"ENERGY": {"GUI_GRID_POW": 200.0}}))
+    assert len(buffer) == 1
+    assert buffer.mean("grid_state_power") == 100.0
@@ -0,0 +1,152 @@
+"""Test the senec poll scheduling."""
+from custom_components.senec.mypysenec.registers import REGISTERS, registers_for
+from custom_components.senec.mypysenec.scheduler import (
+    ADAPTIVE_KEYS,
+    DEFAULT_TIERS,
+    POWER_TIER,
+    STATISTIC_TIER,
+    AdaptiveInterval,
+    AlignedTicks,
+    PollScheduler,
+    clock_interval,
+)
+from custom_components.senec.mypysenec.snapshot import SenecSnapshot
+
+
+def energy(state, pv=0.0, house=300.0, battery=0.0, grid=300.0):
+    values = {
+        "STAT_STATE": state,
+        "GUI_INVERTER_POWER": -pv,
+        "GUI_HOUSE_POW": house,
+        "GUI_BAT_DATA_POWER": battery,
+        "GUI_GRID_POW": grid,
+    }
+    return SenecSnapshot().merge({"ENERGY": values})
+
+
+def names(tiers):
+    return [tier.name for tier in tiers]
+
+
+def test_tiers_match_registers():
+    """Test the default tiers request exactly the registers of the table, each in its tier."""
+    requested = {
+        (tier.name, section, name)
+        for tier in DEFAULT_TIERS
+        for section, names in tier.registers.items()
+        for name in names
+    }
+    assert requested == {(reg.tier, reg.section, reg.register) for reg in REGISTERS}
+
+
+def test_tier_cadence():
+    """Test every tier is due first, then at its own interval."""
+    scheduler = PollScheduler(grace=0)
+    assert names(scheduler.due(0)) == ["power", "statistic", "cells", "static"]
+    scheduler.mark(scheduler.due(0), 0)
+    assert scheduler.due(4) == []
+
+    reads = {}
+    for now in range(5, 3601, 5):
+        tiers = scheduler.due(now)
+        scheduler.mark(tiers, now)
+        for name in names(tiers):
+            reads[name] = reads.get(name, 0) + 1
+    assert reads == {"power": 720, "statistic": 60, "cells": 12, "static": 1}
+
+
+def test_tier_grace():
+    """Test a tier is due up to the grace period early, not earlier."""
+    scheduler = PollScheduler([POWER_TIER, STATISTIC_TIER], grace=1.0)
+    scheduler.mark(scheduler.due(100.0), 100.0)
+    assert scheduler.due(103.9) == []
+    # A tick of the poll loop arriving slightly early still reads the power tier
+    assert scheduler.due(104.0) == [POWER_TIER]
+    assert scheduler.due(159.0) == [POWER_TIER, STATISTIC_TIER]
+    # Only the tiers marked are read again
+    scheduler.mark([POWER_TIER], 159.0)
+    assert scheduler.due(160.0) == [STATISTIC_TIER]
+
+    scheduler.reset()
+    assert scheduler.due(160.0) == [POWER_TIER, STATISTIC_TIER]
+
+
+def test_adaptive_interval():
+    """Test the interval is long when idle, short on changes and grows while steady."""
+    adaptive = AdaptiveInterval(floor=10, ceiling=300, active_ceiling=60)
+    # Night, battery empty: idle
+    assert adaptive.update(energy(15)) == 300
+    # A load switched on at night is activity although the battery stays idle
+    assert adaptive.update(energy(15, house=2300, grid=2300)) == 10
+    assert adaptive.update(energy(15, house=2300, grid=2300)) == 300
+    # Morning, PV starts and the battery charges: a jump
+    assert adaptive.update(energy(14, pv=1500, battery=1200)) == 10
+    assert adaptive.update(energy(14, pv=1520, battery=1220)) == 15
+    assert adaptive.update(energy(14, pv=1540, battery=1240)) == 22.5
+    for _ in range(5):
+        adaptive.update(energy(14, pv=1540, battery=1240))
+    assert adaptive.interval == 60
+    # Kettle
+    assert adaptive.update(energy(16, pv=1540, house=2300, battery=-500)) == 10
+    # Battery full but PV still producing is not idle
+    assert adaptive.update(energy(13, pv=1540, house=2300, battery=-500)) == 15
+
+
+def test_adaptive_tier_cadence():
+    """Test changing flows are polled on 5 s ticks, reading the power tier every tick."""
+    adaptive = AdaptiveInterval(ceiling=300, active_ceiling=60)
+    ticks = AlignedTicks()
+    scheduler = PollScheduler()
+    adaptive.update(energy(14, pv=1500))
+    now, reads = 0.0, []
+    for poll in range(13):
+        tiers = scheduler.due(now)
+        scheduler.mark(tiers, now)
+        reads.append((now, names(tiers)))
+        # A load switching on and off on every poll
+        interval = adaptive.update(energy(14, pv=1500, house=700 - 400 * (poll % 2)))
+        now = ticks.next(now, interval)
+
+    assert adaptive.interval == POWER_TIER.interval
+    assert [now for now, _ in reads] == [5.0 * poll for poll in range(13)]
+    assert all("power" in tiers for _, tiers in reads)
+    assert [now for now, tiers in reads if "statistic" in tiers] == [0.0, 60.0]
+
+
+def test_adaptive_registers():
+    """Test the registers the adaptive interval reads are the ones it is given."""
+    assert registers_for(ADAPTIVE_KEYS) == {
+        ("ENERGY", "STAT_STATE"),
+        ("ENERGY", "GUI_HOUSE_POW"),
+        ("ENERGY", "GUI_INVERTER_POWER"),
+        ("ENERGY", "GUI_BAT_DATA_POWER"),
+        ("ENERGY", "GUI_GRID_POW"),
+    }
+
+
+def test_aligned_ticks():
+    """Test polls start on clock boundaries ahead by the latency and count misses."""
+    ticks = AlignedTicks()
+    assert ticks.next(1003.2, 10) == 1010
+    assert ticks.next(1010.4, 10, lead=0.5) == 1019.5
+    ticks.sampled(1020.1)
+    assert abs(ticks.jitter - 0.1) < 1e-9
+    # A poll finishing late skips the boundaries it can no longer make
+    assert ticks.next(1045.0, 10) == 1050
+    assert ticks.stats["missed_ticks"] == 2
+    # A longer interval is no miss
+    assert ticks.next(1051.0, 60) == 1080
+    assert ticks.stats["missed_ticks"] == 2
+    # A sample far off the schedule, e.g. a manual refresh, is not counted
+    ticks.sampled(1045.0)
+    assert ticks.stats["ticks"] == 1
+
+
+def test_clock_intervals():
+    """Test adaptive intervals are rounded to intervals aligned with the clock."""
+    intervals = (10, 15, 22.5, 33.75, 50.625, 300)
+    assert [clock_interval(interval) for interval in intervals] == [10, 15, 20, 30, 60, 300]
+    assert clock_interval(7200) == 3600
+    ticks = AlignedTicks()
+    assert ticks.next(1700000003.0, 22.5) == 1700000020
+    assert ticks.interval == 20
@@ -0,0 +1,260 @@
+"""Test the senec client."""
+import asyncio
+import json
+
+import pytest
+
+from custom_components.senec.mypysenec import Senec
+from custom_components.senec.mypysenec.bms import Summary, cell_array_summary, summarize
+from custom_components.senec.mypysenec.limiter import RateLimiter, Throttled
+from custom_components.senec.mypysenec.registers import CELL_ARRAYS, registers_for
+from custom_components.senec.mypysenec.scheduler import PollScheduler
+
+
+class MockResponse:
+    """lala.cgi response echoing the requested form with fixed values."""
+
+    def __init__(self, session, form):
+        self._session = session
+        self._form = form
+
+    async def __aenter__(self):
+        await asyncio.sleep(self._session.delay)
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def raise_for_status(self):
+        if self._session.error:
+            raise self._session.error
+
+    async def json(self):
+        return {
+            section: {register: "u8_01" for register in registers} or {"STAT_STATE": "u8_0E"}
+            for section, registers in self._form.items()
+        }
+
+
+class MockSession:
+    """Session recording the forms posted to it."""
+
+    def __init__(self, delay=0.01, error=None):
+        self.delay = delay
+        self.error = error
+        self.forms = []
+
+    def post(self, url, data=None, headers=None):
+        form = json.loads(data)
+        self.forms.append(form)
+        return MockResponse(self, form)
+
+
+def test_registers_for():
+    """Test property keys map to the registers behind them, unknown keys are skipped."""
+    assert registers_for(["house_power", "bms_cell_volt_B3", "bms_cell_volt_B4", "nope"]) == {
+        ("ENERGY", "GUI_HOUSE_POW"),
+        ("BMS", "CELL_VOLTAGES_MODULE_B"),
+    }
+    assert registers_for([]) == frozenset()
+
+
+def test_cell_arrays():
+    """Test a cell array key stands for the cells of its module and their register."""
+    assert CELL_ARRAYS["bms_cell_temp_B"] == [f"bms_cell_temp_B{cell}" for cell in range(1, 7)]
+    assert len(CELL_ARRAYS["bms_cell_volt_D"]) == 14
+    assert registers_for(["bms_cell_volt_A", "bms_cell_temp_C", "bms_soh_A"]) == {
+        ("BMS", "CELL_VOLTAGES_MODULE_A"),
+        ("BMS", "CELL_TEMPERATURES_MODULE_C"),
+        ("BMS", "SOH"),
+    }
+
+
+def test_summarize():
+    """Test the cell summary skips missing cells and rounds mean and spread."""
+    summary = summarize([3301.0, None, 3312.456, 3305.0])
+    assert summary == Summary(3301.0, 3312.456, 3306.15, 11.46)
+    assert summarize([None, None]) is None
+    assert summarize([]) is None
+
+
+def test_cell_array_summary():
+    """Test the cell array sensors of a pack with modules A and B, D reading 0 mV."""
+    states = {f"bms_cell_volt_A{cell}": 3300.0 + cell for cell in range(1, 15)}
+    states.update({f"bms_cell_volt_B{cell}": 3310.0 for cell in range(1, 15)})
+    states["bms_cell_volt_B3"] = 0.0
+    states.update({f"bms_cell_volt_D{cell}": 0.0 for cell in range(1, 15)})
+    states.update({f"bms_cell_temp_{module}1": 21.5 for module in "ABD"})
+    states.update({f"bms_cell_temp_D{sensor}": 0.0 for sensor in range(2, 7)})
+
+    assert cell_array_summary(states, "bms_cell_volt_A") == Summary(3301.0, 3314.0, 3307.5, 13.0)
+    # A single cell reading 0 mV is missing, the module is installed
+    assert cell_array_summary(states, "bms_cell_volt_B") == Summary(3310.0, 3310.0, 3310.0, 0.0)
+    assert cell_array_summary(states, "bms_cell_temp_B") == Summary(21.5, 21.5, 21.5, 0.0)
+    # Not installed, or not read yet
+    assert cell_array_summary(states, "bms_cell_volt_D") is None
+    assert cell_array_summary(states, "bms_cell_temp_D") is None
+    assert cell_array_summary(states, "bms_cell_volt_C") is None
+
+
+def test_scheduler_select():
+    """Test selecting registers narrows the tiers, drops empty ones and resets them."""
+    scheduler = PollScheduler()
+    scheduler.mark(scheduler.due(0), 0)
+    scheduler.select(registers_for(["house_power", "bms_soh_A"]))
+    assert [(tier.name, tier.registers) for tier in scheduler.tiers] == [
+        ("power", {"ENERGY": ("GUI_HOUSE_POW",)}),
+        ("static", {"BMS": ("SOH",)}),
+    ]
+    assert scheduler.due(1) == list(scheduler.tiers)
+
+    scheduler.select(None)
+    assert scheduler.tiers == scheduler.available
+
+
+async def test_set_registers():
+    """Test only the selected registers are requested and request bodies are cached."""
+    session = MockSession()
+    senec = Senec("senec", session, limiter=RateLimiter(registers_per_minute=100000))
+
+    senec.set_registers(registers_for(["house_power", "grid_imported_power"]))
+    await senec.update()
+    assert session.forms[-1] == {"ENERGY": {"GUI_HOUSE_POW": "", "GUI_GRID_POW": ""}}
+    body = senec._bodies[("power",)]
+    await senec.read_senec_v21()
+    assert senec._bodies[("power",)] is body
+
+    # The same selection again keeps the cache, a new one rebuilds it
+    senec.set_registers(registers_for(["grid_imported_power", "house_power"]))
+    assert senec._bodies
+    senec.set_registers(registers_for(["bms_soh_A"]))
+    assert not senec._bodies
+    await senec.update()
+    assert session.forms[-1] == {"BMS": {"SOH": ""}}
+
+    senec.set_registers(None)
+    await senec.update()
+    assert len(session.forms[-1]) > 2
+
+
+async def test_raw_status():
+    """Test raw_status merges the latest responses on access, snapshots keep no raw data."""
+    session = MockSession()
+    senec = Senec("senec", session, limiter=RateLimiter(registers_per_minute=100000))
+    assert senec.raw_status == {}
+
+    senec.set_registers(registers_for(["house_power", "bms_soh_A"]))
+    await senec.update()
+    assert senec.raw_status == {"ENERGY": {"GUI_HOUSE_POW": 1}, "BMS": {"SOH": 1}}
+    assert senec.raw_status is senec.raw_status
+    assert not hasattr(senec.snapshot, "raw")
+
+    await senec.read_senec_v21_all()
+    raw = senec.raw_status
+    assert raw["ENERGY"] == {"GUI_HOUSE_POW": 1, "STAT_STATE": 14}
+    assert raw["BMS"] == {"SOH": 1, "STAT_STATE": 14}
+    assert raw["PV1"] == {"STAT_STATE": 14}
+
+
+async def test_concurrent_reads_coalesced():
+    """Test concurrent reads covered by a request in flight share its POST."""
+    session = MockSession()
+    senec = Senec("senec", session, limiter=RateLimiter(registers_per_minute=100000))
+
+    await asyncio.gather(senec.read_senec_v21(), senec.update(), senec.read_senec_v21())
+
+    assert len(session.forms) == 1
+    assert senec.stats["reads"] == 3
+    assert senec.stats["coalesced"] == 2
+
+    # Not covered by a read of the tiers, so it gets its own request
+    await asyncio.gather(senec.read_senec_v21(), senec.read_senec_v21_all())
+    assert len(session.forms) == 3
+    assert senec.stats["coalesced"] == 2
+
+
+async def test_reads_rate_limited():
+    """Test reads beyond the request budget are delayed instead of sent."""
+    session = MockSession(delay=0)
+    senec = Senec("senec", session, limiter=RateLimiter(60, 100000, burst=2))
+
+    await senec.read_senec_v21()
+    await senec.read_senec_v21()
+    assert senec.stats["throttled"] == 0
+
+    await asyncio.wait_for(senec.read_senec_v21(), 5)
+    assert senec.stats["throttled"] == 1
+    assert senec.stats["requests"] == 3
+
+
+async def test_update_over_budget_skipped():
+    """Test a poll over the budget is skipped, not sent, and its tiers stay due."""
+    session = MockSession(delay=0)
+    senec = Senec("senec", session, limiter=RateLimiter(1, 100000, burst=60, max_wait=0))
+
+    await senec.update()
+    snapshot = senec.snapshot
+    senec.scheduler.reset()
+    await senec.update()
+    assert senec.snapshot is snapshot
+    assert senec.stats["requests"] == 1
+    assert senec.stats["rejected"] == 1
+    assert len(senec.scheduler.due()) == len(senec.scheduler.tiers)
+    with pytest.raises(Throttled):
+        await senec.read_senec_v21()
+
+
+async def test_coalesced_read_error():
+    """Test every coalesced caller sees the error of the shared request."""
+    senec = Senec("senec", MockSession(error=ValueError("broken")))
+
+    results = await asyncio.gather(
+        senec.read_senec_v21(), senec.read_senec_v21(), return_exceptions=True
+    )
+
+    assert [str(result) for result in results] == ["broken", "broken"]
+    assert senec.stats["requests"] == 1
+
+
+async def test_streams_share_poll():
+    """Test streams share one poll and slow consumers skip to the latest snapshot."""
+    session = MockSession(delay=0)
+    senec = Senec("senec", session, limiter=RateLimiter(60000, 10000000))
+    # Every tier is due on every poll
+    senec.scheduler.grace = 3600
+
+    fast = senec.stream(interval=0.01)
+    slow = senec.stream(interval=0.01)
+    first = await fast.__anext__()
+    assert (await slow.__anext__()) is first
+
+    await asyncio.sleep(0.1)
+    latest = await slow.__anext__()
+    assert latest.seq > first.seq + 1
+    assert latest is senec.snapshot
+
+    await fast.aclose()
+    await slow.aclose()
+    assert senec._poller is None
+    # A read the poll started before it was cancelled still completes
+    while senec._inflight:
+        await asyncio.sleep(0)
+    requests = len(session.forms)
+    await asyncio.sleep(0.05)
+    assert len(session.forms) == requests
+
+
+async def test_stream_changes_only():
+    """Test a changes only stream yields changed fields once."""
+    senec = Senec("senec", MockSession(delay=0), limiter=RateLimiter(60000, 10000000))
+    senec.scheduler.grace = 3600
+    stream = senec.stream(interval=0.01, fields=["system_state", "house_power"], changes_only=True)
+
+    assert await stream.__anext__() == {
+        "system_state": "KEINE KOMMUNIKATION LADEGERAET",
+        "house_power": 1,
+    }
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(stream.__anext__(), 0.1)
+    assert senec.stats["reads"] > 2
+    await stream.aclose()
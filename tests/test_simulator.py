@@ -0,0 +1,56 @@
+"""Test the senec lala.cgi simulator."""
+import aiohttp
+import pytest
+
+from custom_components.senec.mypysenec import Senec
+from custom_components.senec.mypysenec.limiter import RateLimiter
+from custom_components.senec.mypysenec.simulator import SenecSimulator, encode
+from custom_components.senec.mypysenec.transport import SessionTransport
+from custom_components.senec.mypysenec.util import parse_value
+
+
+def test_encode():
+    """Test values are encoded like the device does."""
+    assert encode(14, "u8") == "u8_0E"
+    assert encode(0x0307, "u1") == "u1_0307"
+    assert encode(-1, "i3") == "i3_FFFFFFFF"
+    assert encode("0826", "st") == "st_0826"
+    assert parse_value(encode(-1448.25, "fl")) == -1448.25
+
+
+async def test_simulated_day():
+    """Test a Senec client reads plausible values from the simulator."""
+    async with SenecSimulator(start_hour=12, latency=0) as simulator:
+        async with aiohttp.ClientSession() as session:
+            senec = Senec(
+                "simulator",
+                transport=SessionTransport(simulator.url, session),
+                limiter=RateLimiter(600, 100000),
+            )
+            await senec.read_senec_v21()
+
+    assert senec.solar_generated_power > 0
+    assert 0 <= senec.battery_charge_percent <= 100
+    assert senec.house_power == pytest.approx(
+        senec.solar_generated_power - senec.battery_state_power + senec.grid_state_power,
+        abs=0.01,
+    )
+    assert 3000 < senec.bms_cell_volt_D14 < 3500
+    assert senec.bms_cycles_A == 420
+    assert simulator.stats["requests"] == 1
+
+
+async def test_injected_errors():
+    """Test injected errors reach the client."""
+    async with SenecSimulator(latency=0, error_rate=1) as simulator:
+        async with aiohttp.ClientSession() as session:
+            senec = Senec(
+                "simulator",
+                transport=SessionTransport(simulator.url, session),
+                limiter=RateLimiter(60000, 10000000),
+            )
+            for _ in range(4):
+                with pytest.raises((aiohttp.ClientError, ValueError)):
+                    await senec.read_senec_v21()
+
+    assert simulator.stats["errors"] == 4
@@ -0,0 +1,92 @@
+"""Test the senec value snapshot."""
+import pytest
+
+from custom_components.senec.mypysenec.snapshot import SenecSnapshot
+
+
+def test_snapshot_merge():
+    """Test merging keeps value types and leaves the previous snapshot untouched."""
+    empty = SenecSnapshot()
+    first = empty.merge(
+        {
+            "ENERGY": {"STAT_STATE": 14, "GUI_GRID_POW": -250.5},
+            "BMS": {"SOC": [80, 81, 82, 83], "CYCLES": "VARIABLE_NOT_FOUND"},
+        }
+    )
+
+    assert empty.system_state is None
+    assert first.system_state == "LADEN"
+    assert first.get("system_state") == 14
+    assert isinstance(first.get("system_state"), int)
+    assert first.grid_exported_power == 250.5
+    assert first.grid_imported_power == 0
+    assert first.bms_soc_C == 82
+    assert first.bms_cycles_A is None
+
+    second = first.merge({"ENERGY": {"STAT_STATE": "st_TEST", "GUI_GRID_POW": 10.0}})
+
+    assert second.get("system_state") == "st_TEST"
+    assert second.grid_imported_power == 10.0
+    assert second.bms_soc_C == 82
+    assert first.get("system_state") == 14
+
+
+def test_snapshot_immutable():
+    """Test snapshots can not be modified."""
+    with pytest.raises(AttributeError):
+        SenecSnapshot().house_power = 1
+
+
+def test_snapshot_versions():
+    """Test every merge publishes a new version and keeps earlier versions intact."""
+    first = SenecSnapshot().merge(
+        {"ENERGY": {"STAT_STATE": 14}, "BMS": {"SOC": [80, 81, 82, 83]}}, 1000.0
+    )
+    second = first.merge({"ENERGY": {"GUI_HOUSE_POW": 300.0}}, 1005.0)
+
+    assert (first.seq, first.timestamp) == (1, 1000.0)
+    assert (second.seq, second.timestamp) == (2, 1005.0)
+    assert first.house_power is None
+    assert (second.house_power, second.bms_soc_D) == (300.0, 83)
+
+
+def test_snapshot_states():
+    """Test the state table matches rounding every property on its own."""
+    snapshot = SenecSnapshot().merge(
+        {
+            "ENERGY": {"STAT_STATE": 14, "GUI_GRID_POW": -250.456, "GUI_HOUSE_POW": 300},
+            "BMS": {"SOC": [80, 81, 82, 83], "CYCLES": "VARIABLE_NOT_FOUND"},
+        }
+    )
+    keys = ["system_state", "grid_exported_power", "house_power", "bms_soc_A", "bms_cycles_A"]
+    keys.append("battery_temp")
+
+    assert snapshot.states(keys) == {
+        "system_state": "LADEN",
+        "grid_exported_power": 250.46,
+        "house_power": 300.0,
+        "bms_soc_A": 80.0,
+        "bms_cycles_A": None,
+        "battery_temp": None,
+    }
+
+
+def test_snapshot_states_unknown_value():
+    """Test a value its transform rejects is kept as read, other states still build."""
+    snapshot = SenecSnapshot().merge({"ENERGY": {"STAT_STATE": 250, "GUI_HOUSE_POW": 300.0}})
+
+    assert snapshot.states(["system_state", "house_power"]) == {
+        "system_state": 250,
+        "house_power": 300.0,
+    }
+
+
+def test_snapshot_states_reused():
+    """Test states reused from the previous poll equal freshly rounded ones."""
+    first = SenecSnapshot().merge({"ENERGY": {"GUI_HOUSE_POW": 300.123, "GUI_GRID_POW": -20.0}})
+    keys = ["house_power", "grid_imported_power", "grid_exported_power", "battery_temp"]
+    previous = (first, first.states(keys))
+    second = first.merge({"ENERGY": {"GUI_GRID_POW": 35.5}})
+
+    assert second.states(keys, previous=previous) == second.states(keys)
+    assert second.states(keys, previous=previous)["grid_imported_power"] == 35.5
@@ -0,0 +1,40 @@
+"""Test the senec on-disk history store."""
+import pytest
+
+from custom_components.senec.mypysenec.snapshot import SenecSnapshot
+from custom_components.senec.mypysenec.store import HistoryStore
+
+MIDNIGHT = 1709251200.0  # 2024-03-01 00:00 UTC
+
+
+def test_store_queries(tmp_path):
+    """Test range and downsampling queries across day files."""
+    numpy = pytest.importorskip("numpy")
+    store = HistoryStore(tmp_path)
+    snapshot = SenecSnapshot()
+    # Every 30 minutes for two days, the module B cell voltages rise by 1 mV per sample
+    for index in range(96):
+        response = {
+            "ENERGY": {"GUI_GRID_POW": -100.0 if index % 2 else 300.0},
+            "BMS": {"CELL_VOLTAGES_MODULE_B": [3300.0 + index] * 14},
+        }
+        snapshot = snapshot.merge(response, MIDNIGHT + 1800 * index)
+        store.append(snapshot)
+    store.close()
+
+    assert len(list(store.days())) == 2
+    times, values = store.query("grid_imported_power", MIDNIGHT + 3600, MIDNIGHT + 7200)
+    assert times.tolist() == [MIDNIGHT + 3600, MIDNIGHT + 5400]
+    assert values.tolist() == [300.0, 0.0]
+
+    starts, means = store.downsample("CELL_VOLTAGES_MODULE_B", start=MIDNIGHT + 86400)
+    assert len(starts) == 24
+    assert starts[0] == MIDNIGHT + 86400
+    assert means.shape == (24, 14)
+    numpy.testing.assert_allclose(means[0], 3348.5)
+
+    starts, highs = store.downsample("bms_cell_volt_B1", bucket=86400, how="max")
+    assert highs.tolist() == [3347.0, 3395.0]
+
+    with pytest.raises(KeyError):
+        store.query("NO_SUCH_REGISTER")
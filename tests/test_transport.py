@@ -0,0 +1,37 @@
+"""Test the senec transports."""
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from custom_components.senec.mypysenec import Senec
+from custom_components.senec.mypysenec.transport import SenecTransport
+
+
+async def lala(request):
+    """Answer every requested register with one."""
+    form = await request.json()
+    return web.json_response(
+        {
+            section: {register: "u8_01" for register in registers}
+            for section, registers in form.items()
+        }
+    )
+
+
+async def test_transport_reuses_connection():
+    """Test consecutive reads share one connection and report their phases."""
+    app = web.Application()
+    app.router.add_post("/lala.cgi", lala)
+    async with TestServer(app) as server:
+        transport = SenecTransport("senec", url=str(server.make_url("/lala.cgi")))
+        async with Senec("senec", transport=transport) as senec:
+            for _ in range(3):
+                await senec.read_senec_v21()
+
+            assert senec.battery_charge_percent == 1
+            assert transport.stats["requests"] == 3
+            assert transport.stats["connections"] == 1
+            assert transport.stats["reused"] == 2
+            assert set(transport.timings) == {"dns", "connect", "request"}
+            assert transport.timings["connect"] == 0
+
+        assert transport._session is None